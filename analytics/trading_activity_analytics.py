@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from analytics.trading_activity_log_loader import TradingActivityLog
+
+
+class TradingActivityAnalytics:
+    """
+    Performance of every policy in a TradingActivityLog, computed over all runs at once. A step return is the change
+    in equity between consecutive logged rows of a run, and a run's daily return is its last logged equity over its
+    first. Daily returns of a policy are averaged over its runs on that date before Sharpe and Sortino ratios are
+    annualized with TRADING_DAYS_PER_YEAR. Turnover is the number of shares bought and sold between logged rows.
+    """
+
+    TRADING_DAYS_PER_YEAR: int = 252
+
+    def __init__(self, trading_activity_log: TradingActivityLog) -> None:
+        self._ticker_symbol_list: list[str] = trading_activity_log.ticker_symbol_list
+        self._metric_dataframe: pd.DataFrame = self._get_metric_dataframe(
+            activity_dataframe=trading_activity_log.activity_dataframe)
+
+    def _get_metric_dataframe(self, activity_dataframe: pd.DataFrame) -> pd.DataFrame:
+
+        run_code_array: np.ndarray = activity_dataframe["run_id"].cat.codes.to_numpy()
+        is_run_start_array: np.ndarray = np.ones(len(run_code_array), dtype=bool)
+        is_run_start_array[1:] = run_code_array[1:] != run_code_array[:-1]
+
+        equity_array: np.ndarray = activity_dataframe["equity"].to_numpy(dtype=np.float64)
+        quantity_array: np.ndarray = activity_dataframe[self._ticker_symbol_list].to_numpy(dtype=np.float64)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step_return_array: np.ndarray = np.empty_like(equity_array)
+            step_return_array[1:] = equity_array[1:] / equity_array[:-1] - 1.0
+
+            running_max_equity_array: np.ndarray = activity_dataframe.groupby(
+                "run_id", observed=True, sort=False)["equity"].cummax().to_numpy(dtype=np.float64)
+            drawdown_array: np.ndarray = equity_array / running_max_equity_array - 1.0
+
+        turnover_shares_array: np.ndarray = np.empty_like(equity_array)
+        turnover_shares_array[1:] = np.abs(np.diff(quantity_array, axis=0)).sum(axis=1)
+
+        # Rows that open a run have nothing before them to compare against
+        step_return_array[is_run_start_array] = np.nan
+        turnover_shares_array[is_run_start_array] = np.nan
+
+        return activity_dataframe.assign(step_return=step_return_array, drawdown=drawdown_array,
+                                         turnover_shares=turnover_shares_array)
+
+    def get_equity_curve_dataframe(self) -> pd.DataFrame:
+        return self._metric_dataframe[["policy", "run_id", "timestamp", "equity", "drawdown"]]
+
+    def get_step_return_dataframe(self) -> pd.DataFrame:
+        return self._metric_dataframe[["policy", "run_id", "timestamp", "step_return", "turnover_shares"]]
+
+    def get_position_history_dataframe(self, policy_name: str | None = None) -> pd.DataFrame:
+
+        position_history_dataframe: pd.DataFrame = self._metric_dataframe[
+            ["policy", "run_id", "timestamp"] + self._ticker_symbol_list]
+
+        if policy_name is None:
+            return position_history_dataframe
+
+        return position_history_dataframe[position_history_dataframe["policy"] == policy_name]
+
+    def get_run_summary_dataframe(self) -> pd.DataFrame:
+
+        run_summary_dataframe: pd.DataFrame = self._metric_dataframe.groupby("run_id", observed=True, sort=False).agg(
+            policy=("policy", "first"),
+            session_date=("session_date", "first"),
+            num_steps=("equity", "size"),
+            start_equity=("equity", "first"),
+            end_equity=("equity", "last"),
+            max_drawdown=("drawdown", "min"),
+            step_return_std=("step_return", "std"),
+            turnover_shares=("turnover_shares", "sum"),
+        )
+
+        run_summary_dataframe["daily_return"] = (run_summary_dataframe["end_equity"] /
+                                                 run_summary_dataframe["start_equity"] - 1.0)
+
+        return run_summary_dataframe
+
+    def get_daily_return_dataframe(self) -> pd.DataFrame:
+        return self.get_run_summary_dataframe().groupby(["policy", "session_date"], observed=True).agg(
+            daily_return=("daily_return", "mean"),
+            num_runs=("daily_return", "size"),
+        ).reset_index()
+
+    def get_policy_summary_dataframe(self) -> pd.DataFrame:
+        """
+        One row per policy, to compare PPO against the random baseline side by side.
+        """
+
+        run_summary_dataframe: pd.DataFrame = self.get_run_summary_dataframe()
+        daily_return_dataframe: pd.DataFrame = self.get_daily_return_dataframe()
+        daily_return_dataframe["squared_downside_return"] = np.minimum(daily_return_dataframe["daily_return"],
+                                                                       0.0) ** 2
+
+        policy_summary_dataframe: pd.DataFrame = daily_return_dataframe.groupby("policy", observed=True).agg(
+            num_days=("session_date", "nunique"),
+            mean_daily_return=("daily_return", "mean"),
+            daily_return_std=("daily_return", "std"),
+            downside_deviation=("squared_downside_return", "mean"),
+        )
+        policy_summary_dataframe["downside_deviation"] **= 0.5
+
+        step_summary_dataframe: pd.DataFrame = self._metric_dataframe.groupby("policy", observed=True).agg(
+            num_steps=("equity", "size"),
+            mean_step_return=("step_return", "mean"),
+            step_return_std=("step_return", "std"),
+            mean_turnover_shares=("turnover_shares", "mean"),
+        )
+
+        run_statistics_dataframe: pd.DataFrame = run_summary_dataframe.groupby("policy", observed=True).agg(
+            num_runs=("num_steps", "size"),
+            max_drawdown=("max_drawdown", "min"),
+            mean_max_drawdown=("max_drawdown", "mean"),
+        )
+
+        policy_summary_dataframe = policy_summary_dataframe.join([step_summary_dataframe, run_statistics_dataframe])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            annualization_factor: float = np.sqrt(self.TRADING_DAYS_PER_YEAR)
+            policy_summary_dataframe["sharpe_ratio"] = (policy_summary_dataframe["mean_daily_return"] /
+                                                        policy_summary_dataframe["daily_return_std"] *
+                                                        annualization_factor)
+            policy_summary_dataframe["sortino_ratio"] = (policy_summary_dataframe["mean_daily_return"] /
+                                                         policy_summary_dataframe["downside_deviation"] *
+                                                         annualization_factor)
+            policy_summary_dataframe["step_sharpe_ratio"] = (policy_summary_dataframe["mean_step_return"] /
+                                                             policy_summary_dataframe["step_return_std"])
+
+        return policy_summary_dataframe
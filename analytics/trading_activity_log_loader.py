@@ -0,0 +1,355 @@
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from logger.logger import AppLogger
+from utils.constants import Constants
+from utils.trading_activity_csv_writer import TradingActivityCsvWriter
+
+
+@dataclass(frozen=True)
+class TradingActivityLog:
+    """
+    Every logged step of every run in one frame. A run is one log file, and its rows are contiguous and in
+    timestep order. Columns: policy, session_date, run_id, timestep, timestamp, equity, cash and the quantity of each
+    ticker.
+    """
+    ticker_symbol_list: list[str]
+    activity_dataframe: pd.DataFrame
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.activity_dataframe)
+
+    @property
+    def num_runs(self) -> int:
+        return len(self.activity_dataframe["run_id"].cat.categories)
+
+
+@dataclass(frozen=True)
+class _DateDirectory:
+    policy_name: str
+    session_date: date
+    directory_key: str
+    source_path_list: list[Path]
+    source_fingerprint_list: list[list[Any]]
+
+
+class TradingActivityLogLoader:
+    """
+    Reads the logs under <logs>/<policy>_trading_activity/<YYYY-MM-DD>/. Every CSV that needs parsing goes through a
+    single read_csv call, and each date directory is cached as one file of NumPy columns keyed by the size and
+    modification time of its logs, so repeated reports only parse directories that have changed.
+    """
+
+    POLICY_DIRECTORY_SUFFIX: str = "_trading_activity"
+    CACHE_MANIFEST_FILE_NAME: str = "manifest.json"
+    CACHE_MANIFEST_VERSION: int = 1
+
+    def __init__(self, logs_directory_path: Path = Path("logs"), cache_directory_path: Path | None = None,
+                 ticker_symbol_list: list[str] | None = None) -> None:
+        self._logs_directory_path: Path = logs_directory_path
+        self._cache_directory_path: Path = cache_directory_path or logs_directory_path / ".analytics_cache"
+        self._cache_manifest_path: Path = self._cache_directory_path / self.CACHE_MANIFEST_FILE_NAME
+        self._ticker_symbol_list: list[str] = ticker_symbol_list or Constants.TICKER_SYMBOL_LIST
+        self._column_list: list[str] = ["timestep", "timestamp", "equity", "cash"] + self._ticker_symbol_list
+        self._cache_manifest_dict: dict[str, Any] = self._load_cache_manifest_dict()
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    def get_policy_name_list(self) -> list[str]:
+        return sorted(policy_directory_path.name.removesuffix(self.POLICY_DIRECTORY_SUFFIX) for policy_directory_path
+                      in self._logs_directory_path.glob(f"*{self.POLICY_DIRECTORY_SUFFIX}") if
+                      policy_directory_path.is_dir())
+
+    def load(self, start_date: date | None = None, end_date: date | None = None,
+             policy_name_list: list[str] | None = None) -> TradingActivityLog:
+        """
+        Loads every log of the given policies (all by default) whose date directory falls within start_date and
+        end_date inclusive.
+        """
+
+        policy_name_list = policy_name_list or self.get_policy_name_list()
+        date_directory_list: list[_DateDirectory] = self._get_date_directory_list(
+            policy_name_list=policy_name_list, start_date=start_date, end_date=end_date)
+
+        column_array_dict_dict: dict[str, dict[str, np.ndarray]] = {}
+        stale_date_directory_list: list[_DateDirectory] = []
+
+        for date_directory in date_directory_list:
+            cached_column_array_dict: dict[str, np.ndarray] | None = self._read_cached_column_array_dict(
+                date_directory=date_directory)
+
+            if cached_column_array_dict is None:
+                stale_date_directory_list.append(date_directory)
+
+            else:
+                column_array_dict_dict[date_directory.directory_key] = cached_column_array_dict
+
+        if stale_date_directory_list:
+            column_array_dict_dict.update(
+                self._parse_and_cache_date_directories(date_directory_list=stale_date_directory_list))
+
+        trading_activity_log: TradingActivityLog = self._get_trading_activity_log(
+            policy_name_list=policy_name_list, date_directory_list=date_directory_list,
+            column_array_dict_dict=column_array_dict_dict)
+
+        self.logger.info(f"Loaded {trading_activity_log.num_rows:,} rows from {trading_activity_log.num_runs:,} logs "
+                         f"in {len(date_directory_list):,} date directories "
+                         f"({len(stale_date_directory_list):,} parsed, "
+                         f"{len(date_directory_list) - len(stale_date_directory_list):,} cached)")
+
+        return trading_activity_log
+
+    def _get_date_directory_list(self, policy_name_list: list[str], start_date: date | None,
+                                 end_date: date | None) -> list[_DateDirectory]:
+
+        suffix_set: set[str] = set(TradingActivityCsvWriter.OUTPUT_FORMAT_SUFFIX_DICT.values())
+        date_directory_list: list[_DateDirectory] = []
+
+        for policy_name in policy_name_list:
+            policy_directory_path: Path = self._logs_directory_path / f"{policy_name}{self.POLICY_DIRECTORY_SUFFIX}"
+
+            for date_directory_path in sorted(policy_directory_path.glob("*")):
+                try:
+                    session_date: date = date.fromisoformat(date_directory_path.name)
+
+                except ValueError:
+                    continue
+
+                if (start_date is not None and session_date < start_date) or (
+                        end_date is not None and session_date > end_date):
+                    continue
+
+                source_path_list: list[Path] = [source_path for source_path in
+                                                sorted(date_directory_path.glob("trading_activity_*")) if
+                                                source_path.suffix in suffix_set]
+                source_stat_list: list[os.stat_result] = [source_path.stat() for source_path in source_path_list]
+
+                date_directory_list.append(_DateDirectory(
+                    policy_name=policy_name, session_date=session_date,
+                    directory_key=date_directory_path.relative_to(self._logs_directory_path).as_posix(),
+                    source_path_list=source_path_list,
+                    source_fingerprint_list=[[source_path.name, source_stat.st_size, source_stat.st_mtime_ns] for
+                                             source_path, source_stat in zip(source_path_list, source_stat_list)]))
+
+        return date_directory_list
+
+    def _read_cached_column_array_dict(self, date_directory: _DateDirectory) -> dict[str, np.ndarray] | None:
+
+        cache_entry_dict: dict[str, Any] | None = self._cache_manifest_dict["entries"].get(
+            date_directory.directory_key)
+
+        if (cache_entry_dict is None or cache_entry_dict["columns"] != self._column_list
+                or cache_entry_dict["source_files"] != date_directory.source_fingerprint_list):
+            return None
+
+        with np.load(self._cache_directory_path / cache_entry_dict["cache_file_name"]) as cache_npz_file:
+            return {column: cache_npz_file[column] for column in self._column_list + ["num_rows_per_file"]}
+
+    def _parse_and_cache_date_directories(self, date_directory_list: list[_DateDirectory]) -> dict[
+        str, dict[str, np.ndarray]]:
+
+        source_path_list: list[Path] = [source_path for date_directory in date_directory_list for source_path in
+                                        date_directory.source_path_list]
+        column_array_dict, num_rows_per_file = self._parse_source_path_list(source_path_list=source_path_list)
+
+        column_array_dict_dict: dict[str, dict[str, np.ndarray]] = {}
+        file_start_index: int = 0
+        row_start_index: int = 0
+
+        self._cache_directory_path.mkdir(parents=True, exist_ok=True)
+
+        for date_directory in date_directory_list:
+            directory_num_rows_per_file: np.ndarray = num_rows_per_file[
+                file_start_index:file_start_index + len(date_directory.source_path_list)]
+            row_end_index: int = row_start_index + int(directory_num_rows_per_file.sum())
+
+            directory_column_array_dict: dict[str, np.ndarray] = {
+                column: column_array[row_start_index:row_end_index] for column, column_array in
+                column_array_dict.items()}
+            directory_column_array_dict["num_rows_per_file"] = directory_num_rows_per_file
+
+            self._write_cache_entry(date_directory=date_directory, column_array_dict=directory_column_array_dict)
+
+            column_array_dict_dict[date_directory.directory_key] = directory_column_array_dict
+            file_start_index += len(date_directory.source_path_list)
+            row_start_index = row_end_index
+
+        self._save_cache_manifest_dict()
+
+        return column_array_dict_dict
+
+    def _parse_source_path_list(self, source_path_list: list[Path]) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """
+        Parses every log into concatenated columns, file by file in order, and returns them with the number of rows
+        each file contributed.
+        """
+
+        activity_dataframe_list: list[pd.DataFrame] = []
+        file_code_array_list: list[np.ndarray] = []
+        csv_body_list_dict: dict[bytes, tuple[list[int], list[bytes], list[int]]] = {}
+
+        for file_code, source_path in enumerate(source_path_list):
+            try:
+                if source_path.suffix == ".csv":
+                    header_bytes, _, body_bytes = source_path.read_bytes().partition(b"\n")
+
+                    if body_bytes and not body_bytes.endswith(b"\n"):
+                        body_bytes += b"\n"
+
+                    file_code_list, body_list, num_lines_list = csv_body_list_dict.setdefault(
+                        header_bytes.rstrip(b"\r"), ([], [], []))
+                    file_code_list.append(file_code)
+                    body_list.append(body_bytes)
+                    num_lines_list.append(sum(1 for line in body_bytes.splitlines() if line.strip()))
+                    continue
+
+                if source_path.suffix == ".parquet":
+                    activity_dataframe: pd.DataFrame = pd.read_parquet(source_path)
+
+                else:
+                    import pyarrow as pa
+
+                    with pa.ipc.open_stream(str(source_path)) as arrow_stream_reader:
+                        activity_dataframe = arrow_stream_reader.read_pandas()
+
+            # A Parquet log still being written has no footer yet
+            except Exception as e:
+                self.logger.warning(f"Exception Thrown: {e}")
+                continue
+
+            activity_dataframe_list.append(activity_dataframe)
+            file_code_array_list.append(np.full(len(activity_dataframe), file_code))
+
+        # Logs sharing a header are parsed together in one pass
+        for header_bytes, (file_code_list, body_list, num_lines_list) in csv_body_list_dict.items():
+            activity_dataframe = pd.read_csv(io.BytesIO(header_bytes + b"\n" + b"".join(body_list)))
+
+            if len(activity_dataframe) != sum(num_lines_list):
+                self.logger.warning(f"Skipping {len(file_code_list)} logs whose rows could not be attributed to files")
+                continue
+
+            activity_dataframe_list.append(activity_dataframe)
+            file_code_array_list.append(np.repeat(file_code_list, num_lines_list))
+
+        activity_dataframe = pd.concat(activity_dataframe_list, ignore_index=True) if activity_dataframe_list else \
+            pd.DataFrame(columns=Constants.CSV_ACCOUNT_COLUMNS_LIST)
+        activity_dataframe = activity_dataframe.rename(
+            columns=dict(zip(Constants.CSV_ACCOUNT_COLUMNS_LIST, ["timestep", "timestamp", "equity", "cash"])))
+        activity_dataframe["file_code"] = np.concatenate(file_code_array_list or [np.empty(0, dtype=np.int64)])
+
+        # A run that died mid-write can leave a partial last row behind
+        activity_dataframe = activity_dataframe.dropna(subset=["timestep", "timestamp", "equity", "cash"])
+        activity_dataframe = activity_dataframe.sort_values(["file_code", "timestep"], kind="stable")
+
+        column_array_dict: dict[str, np.ndarray] = {
+            "timestep": activity_dataframe["timestep"].to_numpy(dtype=np.int64),
+            "timestamp": pd.DatetimeIndex(pd.to_datetime(activity_dataframe["timestamp"], utc=True,
+                                                         format="ISO8601")).as_unit("ns").asi8.copy(),
+            "equity": activity_dataframe["equity"].to_numpy(dtype=np.float64),
+            "cash": activity_dataframe["cash"].to_numpy(dtype=np.float64),
+        }
+
+        for ticker_symbol in self._ticker_symbol_list:
+            column_array_dict[ticker_symbol] = activity_dataframe[ticker_symbol].fillna(0.0).to_numpy(
+                dtype=np.float64) if ticker_symbol in activity_dataframe else np.zeros(len(activity_dataframe))
+
+        num_rows_per_file: np.ndarray = np.bincount(activity_dataframe["file_code"].to_numpy(dtype=np.int64),
+                                                    minlength=len(source_path_list))
+
+        return column_array_dict, num_rows_per_file
+
+    def _write_cache_entry(self, date_directory: _DateDirectory, column_array_dict: dict[str, np.ndarray]) -> None:
+
+        cache_file_name: str = date_directory.directory_key.replace("/", "__") + ".npz"
+        temporary_cache_path: Path = self._cache_directory_path / f".{cache_file_name}.tmp"
+
+        with temporary_cache_path.open(mode="wb") as f:
+            np.savez(f, **column_array_dict)
+
+        os.replace(temporary_cache_path, self._cache_directory_path / cache_file_name)
+
+        self._cache_manifest_dict["entries"][date_directory.directory_key] = {
+            "columns": self._column_list,
+            "source_files": date_directory.source_fingerprint_list,
+            "cache_file_name": cache_file_name,
+        }
+
+    def _get_trading_activity_log(self, policy_name_list: list[str], date_directory_list: list[_DateDirectory],
+                                  column_array_dict_dict: dict[str, dict[str, np.ndarray]]) -> TradingActivityLog:
+
+        run_id_list: list[str] = []
+        policy_code_list: list[int] = []
+        session_date_code_list: list[int] = []
+        num_rows_list: list[int] = []
+
+        session_date_list: list[date] = sorted({date_directory.session_date for date_directory in date_directory_list})
+        policy_code_dict: dict[str, int] = {policy_name: policy_code for policy_code, policy_name in
+                                            enumerate(policy_name_list)}
+        session_date_code_dict: dict[date, int] = {session_date: session_date_code for session_date_code, session_date
+                                                   in enumerate(session_date_list)}
+
+        for date_directory in date_directory_list:
+            num_rows_per_file: np.ndarray = column_array_dict_dict[date_directory.directory_key]["num_rows_per_file"]
+
+            # Logs that could not be read or hold no rows yet are left out rather than kept as empty runs
+            for source_path, num_rows in zip(date_directory.source_path_list, num_rows_per_file.tolist()):
+                if num_rows == 0:
+                    continue
+
+                run_id_list.append(f"{date_directory.directory_key}/{source_path.name}")
+                policy_code_list.append(policy_code_dict[date_directory.policy_name])
+                session_date_code_list.append(session_date_code_dict[date_directory.session_date])
+                num_rows_list.append(num_rows)
+
+        run_code_array: np.ndarray = np.repeat(np.arange(len(run_id_list)), num_rows_list)
+
+        activity_column_dict: dict[str, Any] = {
+            "policy": pd.Categorical.from_codes(np.array(policy_code_list, dtype=np.int64)[run_code_array],
+                                                categories=policy_name_list),
+            "session_date": pd.Categorical.from_codes(np.array(session_date_code_list, dtype=np.int64)[run_code_array],
+                                                      categories=session_date_list),
+            "run_id": pd.Categorical.from_codes(run_code_array, categories=run_id_list),
+        }
+
+        for column in self._column_list:
+            activity_column_dict[column] = np.concatenate(
+                [column_array_dict_dict[date_directory.directory_key][column] for date_directory in
+                 date_directory_list] or [np.empty(0, dtype=np.int64 if column in ("timestep", "timestamp") else
+                                                   np.float64)])
+
+        activity_column_dict["timestamp"] = pd.DatetimeIndex(activity_column_dict["timestamp"].astype(
+            "datetime64[ns]"), tz="UTC")
+
+        return TradingActivityLog(ticker_symbol_list=self._ticker_symbol_list,
+                                  activity_dataframe=pd.DataFrame(activity_column_dict))
+
+    def _load_cache_manifest_dict(self) -> dict[str, Any]:
+
+        if not self._cache_manifest_path.exists():
+            return {"version": self.CACHE_MANIFEST_VERSION, "entries": {}}
+
+        with self._cache_manifest_path.open(mode="r", encoding="utf-8") as f:
+            cache_manifest_dict: dict[str, Any] = json.load(f)
+
+        if cache_manifest_dict.get("version") != self.CACHE_MANIFEST_VERSION:
+            return {"version": self.CACHE_MANIFEST_VERSION, "entries": {}}
+
+        return cache_manifest_dict
+
+    def _save_cache_manifest_dict(self) -> None:
+
+        self._cache_directory_path.mkdir(parents=True, exist_ok=True)
+        temporary_manifest_path: Path = self._cache_manifest_path.with_suffix(".json.tmp")
+
+        with temporary_manifest_path.open(mode="w", encoding="utf-8") as f:
+            json.dump(self._cache_manifest_dict, f, indent=2, sort_keys=True)
+
+        os.replace(temporary_manifest_path, self._cache_manifest_path)
@@ -0,0 +1,41 @@
+import argparse
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from analytics.trading_activity_analytics import TradingActivityAnalytics
+from analytics.trading_activity_log_loader import TradingActivityLog, TradingActivityLogLoader
+from logger.logger import AppLogger
+
+
+def main() -> None:
+    argument_parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Compare the logged trading activity of each policy over a date range")
+    argument_parser.add_argument("--logs-directory", type=Path, default=Path("logs"))
+    argument_parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+    argument_parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    argument_parser.add_argument("--policy", action="append", dest="policy_name_list",
+                                 help="repeat to select several policies, all by default")
+    arguments: argparse.Namespace = argument_parser.parse_args()
+
+    logger = AppLogger.get_logger(__name__)
+
+    trading_activity_log: TradingActivityLog = TradingActivityLogLoader(
+        logs_directory_path=arguments.logs_directory).load(start_date=arguments.start_date,
+                                                           end_date=arguments.end_date,
+                                                           policy_name_list=arguments.policy_name_list)
+
+    if trading_activity_log.num_rows == 0:
+        logger.info(f"No trading activity found in {arguments.logs_directory}")
+        return
+
+    policy_summary_dataframe: pd.DataFrame = TradingActivityAnalytics(
+        trading_activity_log=trading_activity_log).get_policy_summary_dataframe()
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        logger.info(f"Policy summary:\n{policy_summary_dataframe.T.to_string(float_format='{:,.6f}'.format)}")
+
+
+if __name__ == "__main__":
+    main()
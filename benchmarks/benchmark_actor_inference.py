@@ -0,0 +1,80 @@
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+from tensordict import TensorDict
+from torch import Tensor
+from torchrl.envs.utils import ExplorationType, set_exploration_type
+
+import benchmarks._placeholder_credentials  # noqa: F401
+from benchmarks.benchmark_fixtures import get_replay_environment
+from inference.actor_exporter import ActorExporter
+from inference.actor_inference_runner import ActorInferenceRunner
+from logger.logger import AppLogger
+from models.alpaca_trading_environment_ppo import AlpacaTradingEnvironmentPPO
+from models.alpaca_trading_ppo_neural_network import AlpacaTradingPPONeuralNetwork
+from models.ppo_config import PPOConfig
+from tracing.latency_histogram import LatencyHistogram
+
+
+def benchmark_actor_inference(num_calls: int = 5_000) -> dict[str, float]:
+    """
+    Median per-decision latency of the ProbabilisticActor against the exported artifacts, one observation per call
+    as in live trading.
+    """
+
+    logger = AppLogger.get_logger(__name__)
+    torch.set_num_threads(1)
+
+    with tempfile.TemporaryDirectory() as data_directory_str:
+        data_directory_path: Path = Path(data_directory_str)
+        trading_environment: AlpacaTradingEnvironmentPPO = get_replay_environment(
+            data_directory_path=data_directory_path)
+        ppo_config: PPOConfig = trading_environment._config
+
+        torch.manual_seed(0)
+        actor_module = AlpacaTradingPPONeuralNetwork(env=trading_environment, config=ppo_config).build_actor_module()
+        observation_tensor: Tensor = trading_environment.reset()["observation"]
+        actor_latency_histogram: LatencyHistogram = LatencyHistogram()
+
+        with set_exploration_type(ExplorationType.DETERMINISTIC), torch.inference_mode():
+            for _ in range(100):
+                expected_action_tensor: Tensor = actor_module(
+                    TensorDict({"observation": observation_tensor}, batch_size=[]))["action"]
+
+            for _ in range(num_calls):
+                start_time_ns: int = time.perf_counter_ns()
+                actor_module(TensorDict({"observation": observation_tensor}, batch_size=[]))
+                actor_latency_histogram.record((time.perf_counter_ns() - start_time_ns) / 1e9)
+
+        median_seconds_dict: dict[str, float] = {
+            "probabilistic_actor": actor_latency_histogram.get_percentile_seconds(percentile=50.0)}
+
+        for artifact_name, quantize_int8 in (("ppo_actor.pt", False), ("ppo_actor_int8.pt", True),
+                                             ("ppo_actor.pt2", False)):
+            artifact_path: Path = ActorExporter().export(actor_module=actor_module,
+                                                         export_path=data_directory_path / artifact_name,
+                                                         observation_dimension=observation_tensor.shape[-1],
+                                                         action_dimension=ppo_config.action_dimension,
+                                                         quantize_int8=quantize_int8)
+            actor_inference_runner: ActorInferenceRunner = ActorInferenceRunner(artifact_path=artifact_path)
+
+            for _ in range(num_calls):
+                action_tensor: Tensor = actor_inference_runner.get_action_tensor(observation=observation_tensor)
+
+            median_seconds_dict[artifact_name] = actor_inference_runner.latency_histogram.get_percentile_seconds(
+                percentile=50.0)
+
+            logger.info(f"{artifact_name:<20} max |action - actor mean action| "
+                        f"{float((action_tensor - expected_action_tensor).abs().max()):.2e}")
+
+    for artifact_name, median_seconds in median_seconds_dict.items():
+        logger.info(f"{artifact_name:<20} {median_seconds * 1e6:>9,.1f}us per decision "
+                    f"({median_seconds_dict['probabilistic_actor'] / median_seconds:,.1f}x)")
+
+    return median_seconds_dict
+
+
+if __name__ == "__main__":
+    benchmark_actor_inference()
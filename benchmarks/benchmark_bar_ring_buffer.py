@@ -0,0 +1,109 @@
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable
+
+import numpy as np
+from alpaca.data.models.bars import Bar, BarSet
+
+from benchmarks.benchmark_fixtures import get_month_bar_set
+from logger.logger import AppLogger
+from market_data.bar_ring_buffer import BarRingBuffer
+from utils.constants import Constants
+
+
+def _fill_bar_deque_dict(bar_list: list[Bar], capacity: int) -> dict[str, deque[dict]]:
+
+    bar_deque_dict: dict[str, deque[dict]] = {symbol: deque(maxlen=capacity) for symbol in
+                                              Constants.TICKER_SYMBOL_LIST}
+
+    for bar in bar_list:
+        bar_deque_dict[bar.symbol].append(bar.model_dump())
+
+    return bar_deque_dict
+
+
+def _fill_bar_ring_buffer(bar_list: list[Bar], capacity: int) -> BarRingBuffer:
+
+    bar_ring_buffer: BarRingBuffer = BarRingBuffer(symbol_list=Constants.TICKER_SYMBOL_LIST, capacity=capacity)
+
+    for bar in bar_list:
+        bar_ring_buffer.append_bar(bar=bar)
+
+    return bar_ring_buffer
+
+
+def _get_retained_bytes(fill_function: Callable[[list[Bar], int], Any], bar_list: list[Bar],
+                        capacity: int) -> tuple[Any, int]:
+
+    tracemalloc.start()
+    bar_storage: Any = fill_function(bar_list, capacity)
+    retained_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return bar_storage, retained_bytes
+
+
+def benchmark_bar_ring_buffer(capacity: int = 5_000, num_sessions: int = 8, window_size: int = 60,
+                              num_window_reads: int = 20_000) -> dict[str, float]:
+    """
+    Bar history as the environments used to keep it, a deque of model_dump dicts per symbol, against the NumPy ring
+    buffer: memory retained once full, append throughput and the cost of reading the last window_size closes.
+    """
+
+    logger = AppLogger.get_logger(__name__)
+
+    bar_set: BarSet = get_month_bar_set(num_sessions=num_sessions)
+    bar_list: list[Bar] = [bar for bar_tuple in zip(*bar_set.data.values()) for bar in bar_tuple]
+
+    bar_deque_dict, deque_retained_bytes = _get_retained_bytes(_fill_bar_deque_dict, bar_list, capacity)
+    bar_ring_buffer, ring_buffer_retained_bytes = _get_retained_bytes(_fill_bar_ring_buffer, bar_list, capacity)
+
+    start_time: float = time.perf_counter()
+    _fill_bar_deque_dict(bar_list=bar_list, capacity=capacity)
+    deque_bars_per_second: float = len(bar_list) / (time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    _fill_bar_ring_buffer(bar_list=bar_list, capacity=capacity)
+    ring_buffer_bars_per_second: float = len(bar_list) / (time.perf_counter() - start_time)
+
+    symbol: str = Constants.TICKER_SYMBOL_LIST[0]
+    deque_close_array: np.ndarray = np.empty(0)
+    start_time = time.perf_counter()
+
+    for _ in range(num_window_reads):
+        bar_deque: deque[dict] = bar_deque_dict[symbol]
+        deque_close_array = np.array([bar_deque[bar_index]["close"] for bar_index in range(-window_size, 0)])
+
+    deque_window_seconds: float = (time.perf_counter() - start_time) / num_window_reads
+
+    ring_buffer_close_array: np.ndarray = np.empty(0)
+    start_time = time.perf_counter()
+
+    for _ in range(num_window_reads):
+        ring_buffer_close_array = bar_ring_buffer.get_field_window(symbol=symbol, field="close", num_bars=window_size)
+
+    ring_buffer_window_seconds: float = (time.perf_counter() - start_time) / num_window_reads
+
+    if not np.array_equal(deque_close_array, ring_buffer_close_array):
+        raise AssertionError("Ring buffer window does not match the deque history")
+
+    logger.info(f"{len(bar_list):,} bars over {len(Constants.TICKER_SYMBOL_LIST)} symbols, capacity {capacity:,}")
+    logger.info(f"Retained memory: deque {deque_retained_bytes / 2 ** 20:,.1f} MiB, "
+                f"ring buffer {ring_buffer_retained_bytes / 2 ** 20:,.1f} MiB "
+                f"({deque_retained_bytes / ring_buffer_retained_bytes:,.1f}x smaller)")
+    logger.info(f"Append: deque {deque_bars_per_second:,.0f} bars/sec, "
+                f"ring buffer {ring_buffer_bars_per_second:,.0f} bars/sec "
+                f"({ring_buffer_bars_per_second / deque_bars_per_second:,.1f}x)")
+    logger.info(f"Last {window_size} closes: deque {deque_window_seconds * 1e6:,.2f}us, "
+                f"ring buffer {ring_buffer_window_seconds * 1e6:,.2f}us "
+                f"({deque_window_seconds / ring_buffer_window_seconds:,.1f}x)")
+
+    return {"deque_retained_bytes": deque_retained_bytes, "ring_buffer_retained_bytes": ring_buffer_retained_bytes,
+            "deque_bars_per_second": deque_bars_per_second,
+            "ring_buffer_bars_per_second": ring_buffer_bars_per_second,
+            "deque_window_seconds": deque_window_seconds, "ring_buffer_window_seconds": ring_buffer_window_seconds}
+
+
+if __name__ == "__main__":
+    benchmark_bar_ring_buffer()
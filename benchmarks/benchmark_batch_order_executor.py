@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+from alpaca.trading.client import TradingClient
+from alpaca.trading.enums import OrderSide, TimeInForce, OrderType
+from alpaca.trading.requests import MarketOrderRequest
+
+from benchmarks.synthetic_market_data import build_synthetic_market_data
+from local_alpaca.local_alpaca_server import LocalAlpacaServer
+from logger.logger import AppLogger
+from trading_account.batch_order_executor import BatchOrderExecutor, OrderSubmissionResult
+from utils.constants import Constants
+
+
+def benchmark_batch_order_executor(latency_seconds: float = 0.05, num_steps: int = 5,
+                                   rejected_symbol_list: list[str] | None = None) -> None:
+    logger = AppLogger.get_logger(__name__)
+    rejected_symbol_list = rejected_symbol_list or ["TSLA"]
+
+    market_order_request_list: list[MarketOrderRequest] = [
+        MarketOrderRequest(symbol=ticker_symbol_str, qty=1, side=OrderSide.BUY, order_type=OrderType.MARKET,
+                           time_in_force=TimeInForce.DAY)
+        for ticker_symbol_str in Constants.TICKER_SYMBOL_LIST
+    ]
+
+    with LocalAlpacaServer(market_data=build_synthetic_market_data(num_sessions=1), initial_cash=1e9,
+                           latency_seconds=latency_seconds, rejected_symbol_list=rejected_symbol_list,
+                           bar_interval_seconds=None) as local_alpaca_server:
+        trading_client: TradingClient = TradingClient(api_key="local", secret_key="local", paper=True,
+                                                      url_override=local_alpaca_server.rest_url)
+
+        start_time: float = time.perf_counter()
+
+        for _ in range(num_steps):
+            for market_order_request in market_order_request_list:
+                try:
+                    trading_client.submit_order(order_data=market_order_request)
+                except Exception:
+                    pass
+
+        sequential_seconds: float = (time.perf_counter() - start_time) / num_steps
+
+        batch_order_executor: BatchOrderExecutor = BatchOrderExecutor(trading_client=trading_client)
+        latency_list: list[float] = []
+        order_submission_result_list: list[OrderSubmissionResult] = []
+
+        start_time = time.perf_counter()
+
+        for _ in range(num_steps):
+            order_submission_result_list = batch_order_executor.submit_orders(
+                order_request_list=market_order_request_list)
+            latency_list.extend(result.latency_seconds for result in order_submission_result_list)
+
+        batch_seconds: float = (time.perf_counter() - start_time) / num_steps
+        batch_order_executor.shutdown()
+
+        failed_symbol_list: list[str] = [result.order_request.symbol for result in order_submission_result_list if
+                                         not result.is_successful]
+
+        if failed_symbol_list != rejected_symbol_list:
+            raise ValueError(f"Expected only {rejected_symbol_list} to fail, got {failed_symbol_list}")
+
+        latency_array: np.ndarray = np.array(latency_list) * 1e3
+
+        logger.info(f"{len(market_order_request_list)} orders per step at {latency_seconds * 1e3:,.0f}ms endpoint "
+                    f"latency -> sequential {sequential_seconds * 1e3:,.1f}ms, batched {batch_seconds * 1e3:,.1f}ms "
+                    f"({sequential_seconds / batch_seconds:,.1f}x)")
+        logger.info(f"Submit-to-ack latency p50 {np.percentile(latency_array, 50):,.1f}ms, "
+                    f"p99 {np.percentile(latency_array, 99):,.1f}ms, peak concurrent requests "
+                    f"{local_alpaca_server.max_concurrent_requests}, rejected {failed_symbol_list}")
+
+
+if __name__ == "__main__":
+    benchmark_batch_order_executor()
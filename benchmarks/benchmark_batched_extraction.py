@@ -0,0 +1,47 @@
+import filecmp
+import tempfile
+import time
+from pathlib import Path
+
+import benchmarks._placeholder_credentials  # noqa: F401
+from data_extraction.alpaca_historic_data_extraction import AlpacaHistoricDataExtraction
+from data_extraction.fake_stock_historical_data_client import FakeStockHistoricalDataClient
+from logger.logger import AppLogger
+
+
+def benchmark_batched_extraction(latency_seconds: float = 0.05, minutes_per_bar: int = 5) -> None:
+    logger = AppLogger.get_logger(__name__)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        per_symbol_directory_path: Path = Path(temporary_directory) / "per_symbol"
+        batched_directory_path: Path = Path(temporary_directory) / "batched"
+
+        per_symbol_client: FakeStockHistoricalDataClient = FakeStockHistoricalDataClient(
+            latency_seconds=latency_seconds, minutes_per_bar=minutes_per_bar)
+        per_symbol_extraction: AlpacaHistoricDataExtraction = AlpacaHistoricDataExtraction(
+            stock_historical_data_client=per_symbol_client, export_directory_path=per_symbol_directory_path)
+
+        start_time: float = time.perf_counter()
+        per_symbol_extraction.export_historical_stock_data(list_of_years_to_collect=[2024])
+        per_symbol_seconds: float = time.perf_counter() - start_time
+
+        batched_client: FakeStockHistoricalDataClient = FakeStockHistoricalDataClient(
+            latency_seconds=latency_seconds, minutes_per_bar=minutes_per_bar)
+        batched_extraction: AlpacaHistoricDataExtraction = AlpacaHistoricDataExtraction(
+            stock_historical_data_client=batched_client, export_directory_path=batched_directory_path)
+
+        start_time = time.perf_counter()
+        batched_extraction.export_historical_stock_data_batched(list_of_years_to_collect=[2024])
+        batched_seconds: float = time.perf_counter() - start_time
+
+        file_name_list: list[str] = sorted(path.name for path in per_symbol_directory_path.glob("*.csv"))
+        _, mismatch_list, error_list = filecmp.cmpfiles(per_symbol_directory_path, batched_directory_path,
+                                                        file_name_list, shallow=False)
+
+        logger.info(f"Per symbol: {per_symbol_client.num_requests} requests in {per_symbol_seconds:.2f}s")
+        logger.info(f"Batched:    {batched_client.num_requests} requests in {batched_seconds:.2f}s")
+        logger.info(f"Identical output files: {not mismatch_list and not error_list} ({len(file_name_list)} compared)")
+
+
+if __name__ == "__main__":
+    benchmark_batched_extraction()
@@ -0,0 +1,52 @@
+import filecmp
+import tempfile
+import time
+from pathlib import Path
+
+import benchmarks._placeholder_credentials  # noqa: F401
+from data_extraction.alpaca_historic_data_extraction import AlpacaHistoricDataExtraction
+from data_extraction.fake_stock_historical_data_client import FakeStockHistoricalDataClient
+from logger.logger import AppLogger
+
+
+def benchmark_concurrent_extraction(latency_seconds: float = 0.05, throttle_probability: float = 0.1,
+                                    max_workers: int = 8) -> None:
+    logger = AppLogger.get_logger(__name__)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        sequential_directory_path: Path = Path(temporary_directory) / "sequential"
+        concurrent_directory_path: Path = Path(temporary_directory) / "concurrent"
+
+        sequential_client: FakeStockHistoricalDataClient = FakeStockHistoricalDataClient(
+            latency_seconds=latency_seconds, minutes_per_bar=30)
+        sequential_extraction: AlpacaHistoricDataExtraction = AlpacaHistoricDataExtraction(
+            stock_historical_data_client=sequential_client, export_directory_path=sequential_directory_path)
+
+        start_time: float = time.perf_counter()
+        sequential_extraction.export_historical_stock_data(list_of_years_to_collect=[2024])
+        sequential_seconds: float = time.perf_counter() - start_time
+
+        concurrent_client: FakeStockHistoricalDataClient = FakeStockHistoricalDataClient(
+            latency_seconds=latency_seconds, throttle_probability=throttle_probability, minutes_per_bar=30)
+        concurrent_extraction: AlpacaHistoricDataExtraction = AlpacaHistoricDataExtraction(
+            stock_historical_data_client=concurrent_client, export_directory_path=concurrent_directory_path)
+
+        start_time = time.perf_counter()
+        concurrent_extraction.export_historical_stock_data_concurrently(list_of_years_to_collect=[2024],
+                                                                        max_workers=max_workers,
+                                                                        requests_per_minute=6_000,
+                                                                        retry_base_wait_seconds=0.05)
+        concurrent_seconds: float = time.perf_counter() - start_time
+
+        file_name_list: list[str] = sorted(path.name for path in sequential_directory_path.glob("*.csv"))
+        _, mismatch_list, error_list = filecmp.cmpfiles(sequential_directory_path, concurrent_directory_path,
+                                                        file_name_list, shallow=False)
+
+        logger.info(f"Sequential: {sequential_client.num_requests} requests in {sequential_seconds:.2f}s")
+        logger.info(f"Concurrent: {concurrent_client.num_requests} requests "
+                    f"({concurrent_client.num_throttled_requests} throttled) in {concurrent_seconds:.2f}s")
+        logger.info(f"Identical output files: {not mismatch_list and not error_list} ({len(file_name_list)} compared)")
+
+
+if __name__ == "__main__":
+    benchmark_concurrent_extraction()
@@ -0,0 +1,114 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from alpaca.data.models.bars import BarSet
+from alpaca.trading import Position
+
+from benchmarks.synthetic_market_data import build_synthetic_market_data
+from data_extraction.historical_stock_data_loader import HistoricalMarketData
+from utils.constants import Constants
+
+
+def get_positions_list(ticker_symbol_list: list[str] | None = None, seed: int = 0) -> list[Position]:
+    ticker_symbol_list = ticker_symbol_list or Constants.TICKER_SYMBOL_LIST
+
+    random_generator: np.random.Generator = np.random.default_rng(seed)
+    all_positions_list: list[Position] = []
+
+    # Every other ticker is held so the missing-ticker path is exercised too
+    for ticker_symbol in ticker_symbol_list[::2]:
+        quantity: int = int(random_generator.integers(low=1, high=100))
+        current_price: float = float(random_generator.uniform(low=10.0, high=500.0))
+        cost_basis: float = quantity * current_price * float(random_generator.uniform(low=0.8, high=1.2))
+
+        all_positions_list.append(Position(
+            asset_id=uuid.UUID(int=int(random_generator.integers(low=0, high=2 ** 63))), symbol=ticker_symbol,
+            exchange="NASDAQ", asset_class="us_equity", avg_entry_price=str(cost_basis / quantity), qty=str(quantity),
+            side="long", market_value=str(quantity * current_price), cost_basis=str(cost_basis),
+            unrealized_pl=str(quantity * current_price - cost_basis), current_price=str(current_price),
+            lastday_price=str(current_price), change_today=str(random_generator.normal(scale=0.01)),
+            qty_available=str(quantity)))
+
+    return all_positions_list
+
+
+def get_account_dict(portfolio_value: float = 100_000.0) -> dict[str, float]:
+    return {"cash": portfolio_value / 4, "buying_power": portfolio_value / 2, "portfolio_value": portfolio_value,
+            "equity": portfolio_value}
+
+
+def get_month_bar_set(ticker_symbol_list: list[str] | None = None, num_sessions: int = 21,
+                      seed: int = 0) -> BarSet:
+    """
+    A month of minute bars per symbol as Alpaca returns them, extended hours (04:00 to 20:00 New York) included.
+    """
+
+    ticker_symbol_list = ticker_symbol_list or Constants.TICKER_SYMBOL_LIST
+
+    random_generator: np.random.Generator = np.random.default_rng(seed)
+    bars_per_session: int = 16 * 60
+    session_start_datetime: datetime = datetime(2024, 1, 2, 9, tzinfo=timezone.utc)
+
+    timestamp_str_list: list[str] = [
+        (session_start_datetime + timedelta(days=session_index, minutes=minute_index)).isoformat()
+        for session_index in range(num_sessions) for minute_index in range(bars_per_session)
+    ]
+
+    raw_bar_dict: dict[str, list[dict]] = {}
+
+    for ticker_symbol in ticker_symbol_list:
+        close_prices: np.ndarray = 100.0 * np.exp(np.cumsum(random_generator.normal(scale=1e-3,
+                                                                                    size=len(timestamp_str_list))))
+        volumes: np.ndarray = random_generator.integers(low=100, high=10_000, size=len(timestamp_str_list))
+
+        raw_bar_dict[ticker_symbol] = [
+            {"t": timestamp_str, "o": close_price, "h": close_price * 1.0005, "l": close_price * 0.9995,
+             "c": close_price, "v": float(volume), "n": 1, "vw": close_price}
+            for timestamp_str, close_price, volume in zip(timestamp_str_list, close_prices.tolist(), volumes.tolist())
+        ]
+
+    return BarSet(raw_data=raw_bar_dict)
+
+
+def write_market_data_csv_directory(market_data: HistoricalMarketData, data_directory_path: Path) -> Path:
+    """
+    Writes synthetic market data in the per-ticker CSV layout HistoricalStockDataLoader reads.
+    """
+
+    data_directory_path.mkdir(parents=True, exist_ok=True)
+
+    for ticker_index, ticker_symbol in enumerate(market_data.ticker_symbol_list):
+        pd.DataFrame({
+            "timestamp": pd.to_datetime(market_data.timestamps, utc=True),
+            "open": market_data.open_prices[:, ticker_index],
+            "close": market_data.close_prices[:, ticker_index],
+            "high": market_data.high_prices[:, ticker_index],
+            "low": market_data.low_prices[:, ticker_index],
+            "volume": market_data.volumes[:, ticker_index],
+        }).to_csv(data_directory_path / f"{ticker_symbol}_synthetic.csv", index=False)
+
+    return data_directory_path
+
+
+def get_replay_environment(data_directory_path: Path, num_sessions: int = 5,
+                           **config_kwargs: Any) -> "AlpacaTradingEnvironmentPPO":
+    """
+    A historical replay PPO environment over synthetic sessions written to data_directory_path.
+    """
+
+    # Imported here so the other fixtures do not need API key settings to be present
+    from models.alpaca_trading_environment_ppo import AlpacaTradingEnvironmentPPO
+    from models.ppo_config import PPOConfig
+
+    write_market_data_csv_directory(market_data=build_synthetic_market_data(num_sessions=num_sessions),
+                                    data_directory_path=data_directory_path)
+
+    trading_environment: AlpacaTradingEnvironmentPPO = AlpacaTradingEnvironmentPPO(
+        config=PPOConfig(historical_data_directory=str(data_directory_path), **config_kwargs))
+    trading_environment.set_seed(0)
+
+    return trading_environment
@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import torch
+from tensordict import TensorDict
+
+import benchmarks._placeholder_credentials  # noqa: F401
+from benchmarks.synthetic_market_data import build_synthetic_market_data
+from config.config import settings
+from local_alpaca.local_alpaca_server import LocalAlpacaServer
+from logger.logger import AppLogger
+
+
+def benchmark_live_step_latency(num_steps: int = 50, latency_seconds: float = 0.01, error_rate: float = 0.0,
+                                seed: int = 0) -> None:
+    from models.alpaca_trading_environment_ppo import AlpacaTradingEnvironmentPPO
+    from models.ppo_config import PPOConfig
+
+    logger = AppLogger.get_logger(__name__)
+    torch.manual_seed(seed)
+
+    with LocalAlpacaServer(market_data=build_synthetic_market_data(num_sessions=1, seed=seed),
+                           latency_seconds=latency_seconds, error_rate=error_rate, bar_interval_seconds=0.05,
+                           seed=seed) as local_alpaca_server:
+        settings.alpaca_url_override = local_alpaca_server.rest_url
+        settings.alpaca_stream_url_override = local_alpaca_server.stream_url
+
+        ppo_config: PPOConfig = PPOConfig()
+        trading_environment: AlpacaTradingEnvironmentPPO = AlpacaTradingEnvironmentPPO(config=ppo_config)
+
+        # The first step connects both streams and waits for a bar, it is not part of the steady state
+        trading_environment._step(TensorDict({"action": torch.randn(ppo_config.action_dimension)}, batch_size=[]))
+        num_warmup_requests: int = local_alpaca_server.num_requests
+
+        step_latency_list: list[float] = []
+
+        for _ in range(num_steps):
+            action_tensordict: TensorDict = TensorDict({"action": torch.randn(ppo_config.action_dimension)},
+                                                       batch_size=[])
+
+            start_time: float = time.perf_counter()
+            trading_environment._step(action_tensordict)
+            step_latency_list.append(time.perf_counter() - start_time)
+
+        step_latency_array: np.ndarray = np.array(step_latency_list) * 1e3
+        num_requests_per_step: float = (local_alpaca_server.num_requests - num_warmup_requests) / num_steps
+
+        logger.info(f"{num_steps} live steps against the local Alpaca server at {latency_seconds * 1e3:,.0f}ms "
+                    f"endpoint latency and {error_rate:.0%} error rate -> p50 "
+                    f"{np.percentile(step_latency_array, 50):,.1f}ms, p99 {np.percentile(step_latency_array, 99):,.1f}"
+                    f"ms, {num_requests_per_step:,.1f} REST requests per step")
+
+        trading_environment._market_data_stream_service.stop()
+        trading_environment._portfolio_state_cache.stop()
+        trading_environment.close()
+
+
+if __name__ == "__main__":
+    benchmark_live_step_latency()
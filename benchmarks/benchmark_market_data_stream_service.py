@@ -0,0 +1,61 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from alpaca.data.models.bars import Bar
+
+from logger.logger import AppLogger
+from market_data.fake_stock_data_stream import FakeStockDataStream
+from market_data.market_data_stream_service import MarketDataStreamService, MarketDataSubscription
+from utils.constants import Constants
+
+
+async def _consume_bars(subscription: MarketDataSubscription, num_bars: int) -> list[float]:
+
+    delivery_latency_list: list[float] = []
+
+    for _ in range(num_bars):
+        bar: Bar = await subscription.get()
+        delivery_latency_list.append((datetime.now(tz=timezone.utc) - bar.timestamp).total_seconds())
+
+    return delivery_latency_list
+
+
+async def benchmark_market_data_stream_service(num_consumers: int = 3, num_bars: int = 700,
+                                               num_reads: int = 100_000) -> None:
+    logger = AppLogger.get_logger(__name__)
+
+    fake_data_stream: FakeStockDataStream = FakeStockDataStream(bar_interval_seconds=0.01)
+    market_data_stream_service: MarketDataStreamService = MarketDataStreamService(data_stream=fake_data_stream)
+
+    subscription_list: list[MarketDataSubscription] = [market_data_stream_service.subscribe() for _ in
+                                                       range(num_consumers)]
+
+    market_data_stream_service.start()
+
+    try:
+        delivery_latency_lists: list[list[float]] = await asyncio.gather(
+            *[_consume_bars(subscription=subscription, num_bars=num_bars) for subscription in subscription_list])
+
+        start_time: float = time.perf_counter()
+
+        for _ in range(num_reads):
+            market_data_stream_service.get_latest_bar_dict()
+
+        read_seconds: float = (time.perf_counter() - start_time) / num_reads
+
+    finally:
+        market_data_stream_service.stop()
+
+    delivery_latency_array: np.ndarray = np.array(delivery_latency_lists) * 1e6
+
+    logger.info(f"{num_consumers} consumers x {num_bars} bars over {len(Constants.TICKER_SYMBOL_LIST)} symbols "
+                f"on {fake_data_stream.num_connections} stream connection(s)")
+    logger.info(f"Fan-out delivery latency: p50 {np.percentile(delivery_latency_array, 50):,.0f}us, "
+                f"p99 {np.percentile(delivery_latency_array, 99):,.0f}us")
+    logger.info(f"Latest-bar buffer read: {read_seconds * 1e6:,.2f}us per step")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_market_data_stream_service())
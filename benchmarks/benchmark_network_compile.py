@@ -0,0 +1,83 @@
+import time
+
+import torch
+from torch import nn, Tensor
+
+from logger.logger import AppLogger
+from market_data.rolling_feature_engine import RollingFeatureEngine
+from models.ppo_config import PPOConfig
+from models.ppo_network_builder import PPONetworkBuilder
+
+
+def _get_samples_per_second(ppo_config: PPOConfig, num_iterations: int, num_warmup_iterations: int) -> tuple[
+    float, float]:
+
+    torch.manual_seed(0)
+    observation_dimension: int = ppo_config.observation_dimension + RollingFeatureEngine(
+        num_symbols=ppo_config.action_dimension,
+        window_size_tuple=ppo_config.rolling_feature_window_tuple).num_features
+    ppo_network_builder: PPONetworkBuilder = PPONetworkBuilder(config=ppo_config, device=torch.device("cpu"))
+    actor_network: nn.Sequential = ppo_network_builder.build_actor_network(input_dimension=observation_dimension)
+    critic_network: nn.Sequential = ppo_network_builder.build_critic_network(input_dimension=observation_dimension)
+    parameter_list: list[nn.Parameter] = list({id(parameter): parameter for parameter in [
+        *actor_network.parameters(), *critic_network.parameters()]}.values())
+
+    observation_tensor: Tensor = torch.randn(ppo_config.sub_batch_size, observation_dimension)
+
+    def run_iteration() -> None:
+        loc_tensor, scale_tensor = actor_network(observation_tensor)
+        value_tensor: Tensor = critic_network(observation_tensor)
+
+        (loc_tensor.square().mean() + scale_tensor.mean() + value_tensor.square().mean()).backward()
+
+        for parameter in parameter_list:
+            parameter.grad = None
+
+    # The first compiled calls trace and generate code, which is reported separately from the steady state
+    warmup_start_time: float = time.perf_counter()
+
+    for _ in range(num_warmup_iterations):
+        run_iteration()
+
+    warmup_seconds: float = time.perf_counter() - warmup_start_time
+    start_time: float = time.perf_counter()
+
+    for _ in range(num_iterations):
+        run_iteration()
+
+    return num_iterations * ppo_config.sub_batch_size / (time.perf_counter() - start_time), warmup_seconds
+
+
+def benchmark_network_compile(num_iterations: int = 500, num_warmup_iterations: int = 20) -> dict[str, float]:
+    """
+    Forward and backward throughput of the actor and critic at PPOConfig.sub_batch_size, eager against
+    torch.compile, with separate and shared trunks.
+    """
+
+    logger = AppLogger.get_logger(__name__)
+    samples_per_second_dict: dict[str, float] = {}
+
+    for share_actor_critic_trunk in (False, True):
+        for compile_mode in (None, "default", "max-autotune-no-cudagraphs"):
+            ppo_config: PPOConfig = PPOConfig(share_actor_critic_trunk=share_actor_critic_trunk,
+                                              compile_mode=compile_mode)
+            case_name: str = f"{'shared' if share_actor_critic_trunk else 'separate'}/{compile_mode or 'eager'}"
+
+            samples_per_second, warmup_seconds = _get_samples_per_second(
+                ppo_config=ppo_config, num_iterations=num_iterations, num_warmup_iterations=num_warmup_iterations)
+            samples_per_second_dict[case_name] = samples_per_second
+
+            eager_samples_per_second: float = samples_per_second_dict[
+                f"{'shared' if share_actor_critic_trunk else 'separate'}/eager"]
+
+            logger.info(f"{case_name:<38} {samples_per_second:>11,.0f} samples/sec "
+                        f"({samples_per_second / eager_samples_per_second:,.2f}x), warmup {warmup_seconds:,.1f}s")
+
+    logger.info(f"{PPOConfig.num_hidden_layers} x {PPOConfig.hidden_size} {PPOConfig.activation} layers, "
+                f"batch {PPOConfig.sub_batch_size}, {torch.get_num_threads()} thread(s)")
+
+    return samples_per_second_dict
+
+
+if __name__ == "__main__":
+    benchmark_network_compile()
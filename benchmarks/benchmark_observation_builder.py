@@ -0,0 +1,119 @@
+import time
+from typing import Any, Callable
+
+import torch
+from alpaca.trading import Position
+from torch import Tensor
+
+from benchmarks.benchmark_fixtures import get_positions_list
+from logger.logger import AppLogger
+from trading_account.portfolio_observation_builder import PortfolioObservationBuilder
+from utils.constants import Constants
+
+
+def _get_legacy_observation_tensor(all_positions_list: list[Position], account_dict: dict[str, float],
+                                   ticker_symbol_to_id_dict: dict[str, int]) -> Tensor:
+    """
+    The dict, list and torch.tensor path AlpacaTradingPortfolio used before PortfolioObservationBuilder.
+    """
+
+    cash: float = account_dict.get("cash", 0.0)
+    buying_power: float = account_dict.get("buying_power", 0.0)
+    portfolio_value: float = account_dict.get("portfolio_value", 0.0)
+
+    positions_dict: dict[int, dict[str, float]] = {}
+    positions_str_list: list[str] = [x.symbol for x in all_positions_list]
+
+    for ticker_symbol_str in ticker_symbol_to_id_dict:
+        if ticker_symbol_str not in positions_str_list:
+            positions_dict[ticker_symbol_to_id_dict[ticker_symbol_str]] = {
+                "qty_available": 0.0,
+                "position_value": 0.0,
+                "portfolio_weight": 0.0,
+                "portfolio_value": portfolio_value,
+                "cost_basis_to_portfolio_value": 0.0,
+                "unrealized_pl_to_portfolio_value": 0.0,
+                "cash_to_portfolio_value": cash / portfolio_value,
+                "buying_power_to_portfolio_value": buying_power / portfolio_value,
+                "change_today": 0.0,
+            }
+
+    for position_obj in all_positions_list:
+        positions_dict[ticker_symbol_to_id_dict.get(position_obj.symbol, 99_999)] = {
+            "qty_available": float(position_obj.qty_available),
+            "portfolio_value": portfolio_value,
+            "portfolio_weight": float(position_obj.market_value) / portfolio_value,
+            "cash_to_portfolio_value": cash / portfolio_value,
+            "cost_basis_to_portfolio_value": float(position_obj.cost_basis) / portfolio_value,
+            "buying_power_to_portfolio_value": buying_power / portfolio_value,
+            "unrealized_pl_to_portfolio_value": float(position_obj.unrealized_pl) / portfolio_value,
+            "change_today": float(position_obj.change_today),
+        }
+
+    matrix_list: list[list[float]] = []
+
+    for ticker_id_num in ticker_symbol_to_id_dict.values():
+        ticker_dict: dict[str, float] = positions_dict.get(ticker_id_num, {})
+        matrix_list.append([float(ticker_dict.get(feature_str, 0.0)) for feature_str in Constants.TICKER_FEATURES_LIST])
+
+    return torch.tensor(matrix_list).view(-1)
+
+
+def _get_microseconds_per_call(observation_function: Callable[[], Tensor], num_iterations: int) -> float:
+
+    for _ in range(num_iterations // 10):
+        observation_function()
+
+    start_time: float = time.perf_counter()
+
+    for _ in range(num_iterations):
+        observation_function()
+
+    return (time.perf_counter() - start_time) / num_iterations * 1e6
+
+
+def benchmark_observation_builder(num_tickers_list: list[int], num_iterations: int = 2_000) -> dict[int, Any]:
+    logger = AppLogger.get_logger(__name__)
+
+    result_dict: dict[int, Any] = {}
+
+    for num_tickers in num_tickers_list:
+        ticker_symbol_list: list[str] = Constants.TICKER_SYMBOL_LIST if num_tickers == len(
+            Constants.TICKER_SYMBOL_LIST) else [f"SYM{ticker_num:04d}" for ticker_num in range(num_tickers)]
+        ticker_symbol_to_id_dict: dict[str, int] = {ticker_symbol: 1_001 + ticker_num for ticker_num, ticker_symbol in
+                                                    enumerate(ticker_symbol_list)}
+
+        all_positions_list: list[Position] = get_positions_list(ticker_symbol_list=ticker_symbol_list)
+        account_dict: dict[str, float] = {"cash": 50_000.0, "buying_power": 50_000.0, "portfolio_value": 250_000.0}
+        portfolio_observation_builder: PortfolioObservationBuilder = PortfolioObservationBuilder(
+            ticker_symbol_list=ticker_symbol_list)
+
+        legacy_observation_tensor: Tensor = _get_legacy_observation_tensor(
+            all_positions_list=all_positions_list, account_dict=account_dict,
+            ticker_symbol_to_id_dict=ticker_symbol_to_id_dict)
+        observation_tensor: Tensor = portfolio_observation_builder.get_observation_tensor(
+            all_positions_list=all_positions_list, account_dict=account_dict)
+
+        if not torch.allclose(legacy_observation_tensor, observation_tensor, rtol=1e-6, atol=0.0):
+            raise ValueError(f"Observation mismatch against the legacy path at {num_tickers} tickers")
+
+        legacy_microseconds: float = _get_microseconds_per_call(
+            lambda: _get_legacy_observation_tensor(all_positions_list=all_positions_list, account_dict=account_dict,
+                                                   ticker_symbol_to_id_dict=ticker_symbol_to_id_dict),
+            num_iterations=num_iterations)
+        builder_microseconds: float = _get_microseconds_per_call(
+            lambda: portfolio_observation_builder.get_observation_tensor(all_positions_list=all_positions_list,
+                                                                         account_dict=account_dict),
+            num_iterations=num_iterations)
+
+        result_dict[num_tickers] = {"legacy_microseconds": legacy_microseconds,
+                                    "builder_microseconds": builder_microseconds}
+
+        logger.info(f"{num_tickers:>4,} tickers -> legacy {legacy_microseconds:>9,.1f}us, "
+                    f"builder {builder_microseconds:>7,.1f}us ({legacy_microseconds / builder_microseconds:,.1f}x)")
+
+    return result_dict
+
+
+if __name__ == "__main__":
+    benchmark_observation_builder(num_tickers_list=[7, 500])
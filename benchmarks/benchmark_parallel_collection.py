@@ -0,0 +1,73 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+from tensordict import TensorDictBase
+from torchrl.collectors import BaseCollector
+
+import benchmarks._placeholder_credentials  # noqa: F401
+from benchmarks.benchmark_fixtures import get_replay_environment
+from logger.logger import AppLogger
+from models.alpaca_trading_environment_ppo import AlpacaTradingEnvironmentPPO
+from models.alpaca_trading_ppo_neural_network import AlpacaTradingPPONeuralNetwork
+
+
+def _get_frames_per_second(data_directory_path: Path, num_collector_workers: int, collector_mode: str,
+                           num_batches: int, frames_per_batch: int) -> float:
+
+    trading_environment: AlpacaTradingEnvironmentPPO = get_replay_environment(
+        data_directory_path=data_directory_path, num_collector_workers=num_collector_workers,
+        collector_mode=collector_mode, max_batch_size=frames_per_batch,
+        max_batches=(num_batches + 1) * frames_per_batch)
+    ppo_neural_network: AlpacaTradingPPONeuralNetwork = AlpacaTradingPPONeuralNetwork(
+        env=trading_environment, config=trading_environment._config)
+
+    collector: BaseCollector = ppo_neural_network.build_collector(
+        actor_module=ppo_neural_network.build_actor_module())
+
+    try:
+        collector_iterator = iter(collector)
+
+        # Worker start-up and the first reset are not part of the steady state
+        next(collector_iterator)
+
+        num_frames: int = 0
+        start_time: float = time.perf_counter()
+
+        for _ in range(num_batches):
+            tensordict_data: TensorDictBase = next(collector_iterator)
+            num_frames += tensordict_data.numel()
+
+        return num_frames / (time.perf_counter() - start_time)
+
+    finally:
+        collector.shutdown()
+
+
+def benchmark_parallel_collection(num_collector_workers_list: list[int], num_batches: int = 10,
+                                  frames_per_batch: int = 1024) -> dict[str, dict[int, float]]:
+    logger = AppLogger.get_logger(__name__)
+    logger.info(f"{os.cpu_count()} CPU core(s) available")
+
+    frames_per_second_dict: dict[str, dict[int, float]] = {"sync": {}, "async": {}}
+
+    with tempfile.TemporaryDirectory() as data_directory_str:
+        for collector_mode in frames_per_second_dict:
+            for num_collector_workers in num_collector_workers_list:
+                frames_per_second: float = _get_frames_per_second(
+                    data_directory_path=Path(data_directory_str), num_collector_workers=num_collector_workers,
+                    collector_mode=collector_mode, num_batches=num_batches, frames_per_batch=frames_per_batch)
+
+                frames_per_second_dict[collector_mode][num_collector_workers] = frames_per_second
+
+                logger.info(f"{collector_mode:<5} K={num_collector_workers:>2} -> {frames_per_second:>10,.0f} "
+                            f"frames/sec ({frames_per_second / frames_per_second_dict[collector_mode][1]:,.2f}x)")
+
+    return frames_per_second_dict
+
+
+if __name__ == "__main__":
+    torch.set_num_threads(1)
+    benchmark_parallel_collection(num_collector_workers_list=[1, 2, 4])
@@ -0,0 +1,82 @@
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+from tensordict import TensorDictBase
+from torchrl.data import ReplayBuffer, SamplerWithoutReplacement, LazyTensorStorage
+
+import benchmarks._placeholder_credentials  # noqa: F401
+from benchmarks.benchmark_fixtures import get_replay_environment
+from logger.logger import AppLogger
+from models.alpaca_trading_environment_ppo import AlpacaTradingEnvironmentPPO
+from models.alpaca_trading_ppo_neural_network import AlpacaTradingPPONeuralNetwork
+from models.ppo_config import PPOConfig
+
+
+def _get_updates_per_second(trading_environment: AlpacaTradingEnvironmentPPO, tensordict_data: TensorDictBase,
+                            device_resident_rollouts: bool, num_batches: int) -> float:
+
+    ppo_config: PPOConfig = PPOConfig(historical_data_directory=trading_environment._config.historical_data_directory,
+                                      device_resident_rollouts=device_resident_rollouts)
+    ppo_neural_network: AlpacaTradingPPONeuralNetwork = AlpacaTradingPPONeuralNetwork(env=trading_environment,
+                                                                                      config=ppo_config)
+    torch.manual_seed(0)
+
+    actor_module = ppo_neural_network.build_actor_module()
+    critic_module = ppo_neural_network.build_critic_module()
+    advantage_module = ppo_neural_network.build_advantage_module(critic_module=critic_module)
+    loss_module = ppo_neural_network.build_loss_module(actor_module=actor_module, critic_module=critic_module)
+    optimizer: torch.optim.Optimizer = torch.optim.Adam(loss_module.parameters(), lr=ppo_config.learning_rate)
+    replay_buffer: ReplayBuffer = ReplayBuffer(storage=LazyTensorStorage(max_size=ppo_config.max_batch_size),
+                                               sampler=SamplerWithoutReplacement())
+
+    # The first update allocates optimizer state and buffer storage
+    ppo_neural_network._update_policy(tensordict_data=tensordict_data.clone(), advantage_module=advantage_module,
+                                      loss_module=loss_module, optimizer=optimizer, replay_buffer=replay_buffer)
+
+    start_time: float = time.perf_counter()
+
+    for _ in range(num_batches):
+        ppo_neural_network._update_policy(tensordict_data=tensordict_data.clone(), advantage_module=advantage_module,
+                                          loss_module=loss_module, optimizer=optimizer, replay_buffer=replay_buffer)
+
+    elapsed_seconds: float = time.perf_counter() - start_time
+    num_updates_per_batch: int = ppo_config.num_epochs * (ppo_config.max_batch_size // ppo_config.sub_batch_size)
+
+    return num_batches * num_updates_per_batch / elapsed_seconds
+
+
+def benchmark_ppo_update(num_batches: int = 5) -> dict[str, float]:
+    logger = AppLogger.get_logger(__name__)
+
+    with tempfile.TemporaryDirectory() as data_directory_str:
+        trading_environment: AlpacaTradingEnvironmentPPO = get_replay_environment(
+            data_directory_path=Path(data_directory_str))
+        ppo_config: PPOConfig = trading_environment._config
+
+        actor_module = AlpacaTradingPPONeuralNetwork(env=trading_environment, config=ppo_config).build_actor_module()
+
+        with torch.no_grad():
+            tensordict_data: TensorDictBase = trading_environment.rollout(
+                max_steps=ppo_config.max_batch_size, policy=actor_module, break_when_any_done=False)
+
+        updates_per_second_dict: dict[str, float] = {
+            "replay_buffer": _get_updates_per_second(trading_environment=trading_environment,
+                                                     tensordict_data=tensordict_data,
+                                                     device_resident_rollouts=False, num_batches=num_batches),
+            "device_resident": _get_updates_per_second(trading_environment=trading_environment,
+                                                       tensordict_data=tensordict_data,
+                                                       device_resident_rollouts=True, num_batches=num_batches),
+        }
+
+    logger.info(f"{ppo_config.max_batch_size:,} frames x {ppo_config.num_epochs} epochs on "
+                f"{trading_environment.device} -> replay buffer {updates_per_second_dict['replay_buffer']:,.0f} "
+                f"updates/sec, device resident {updates_per_second_dict['device_resident']:,.0f} updates/sec "
+                f"({updates_per_second_dict['device_resident'] / updates_per_second_dict['replay_buffer']:,.2f}x)")
+
+    return updates_per_second_dict
+
+
+if __name__ == "__main__":
+    benchmark_ppo_update()
@@ -0,0 +1,38 @@
+import time
+
+from benchmarks.synthetic_market_data import build_synthetic_market_data
+from data_extraction.historical_stock_data_loader import HistoricalMarketData
+from logger.logger import AppLogger
+from models.random_policy_backtester import RandomPolicyBacktester, RandomPolicyBacktestResult
+
+
+def benchmark_random_policy_backtest(num_portfolios_list: list[int], num_sessions: int = 1) -> dict[int, float]:
+    """
+    Seconds to replay num_sessions synthetic sessions of minute bars for a growing number of random portfolios.
+    """
+
+    logger = AppLogger.get_logger(__name__)
+    market_data: HistoricalMarketData = build_synthetic_market_data(num_sessions=num_sessions)
+    seconds_dict: dict[int, float] = {}
+
+    for num_portfolios in num_portfolios_list:
+        random_policy_backtester: RandomPolicyBacktester = RandomPolicyBacktester(market_data=market_data,
+                                                                                  num_portfolios=num_portfolios)
+
+        start_time: float = time.perf_counter()
+        random_policy_backtest_result: RandomPolicyBacktestResult = random_policy_backtester.run()
+        seconds_dict[num_portfolios] = time.perf_counter() - start_time
+
+        num_portfolio_steps: int = num_portfolios * market_data.num_timesteps * market_data.num_tickers
+        summary_dict: dict[str, float] = random_policy_backtest_result.get_summary_dict()
+
+        logger.info(f"N={num_portfolios:>7,} -> {seconds_dict[num_portfolios]:>7,.2f}s "
+                    f"({num_portfolio_steps / seconds_dict[num_portfolios]:>14,.0f} portfolio steps/sec), "
+                    f"terminal return p05/p50/p95 {summary_dict['terminal_return_p05']:+.4%}/"
+                    f"{summary_dict['terminal_return_p50']:+.4%}/{summary_dict['terminal_return_p95']:+.4%}")
+
+    return seconds_dict
+
+
+if __name__ == "__main__":
+    benchmark_random_policy_backtest(num_portfolios_list=[1, 100, 1_000, 10_000])
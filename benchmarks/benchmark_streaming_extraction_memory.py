@@ -0,0 +1,67 @@
+import gc
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import benchmarks._placeholder_credentials  # noqa: F401
+from data_extraction.alpaca_historic_data_extraction import AlpacaHistoricDataExtraction
+from data_extraction.fake_stock_historical_data_client import FakeStockHistoricalDataClient
+from logger.logger import AppLogger
+from utils.constants import Constants
+
+
+def _export_years(export_directory_path: Path, num_years: int, minutes_per_bar: int) -> None:
+
+    extraction: AlpacaHistoricDataExtraction = AlpacaHistoricDataExtraction(
+        stock_historical_data_client=FakeStockHistoricalDataClient(minutes_per_bar=minutes_per_bar),
+        export_directory_path=export_directory_path)
+
+    extraction.export_historical_stock_data(list_of_years_to_collect=list(range(2024 - num_years + 1, 2025)))
+
+
+def benchmark_streaming_extraction_memory(num_years_list: list[int], minutes_per_bar: int = 390,
+                                          max_growth_ratio: float = 1.5) -> dict[int, int]:
+    """
+    Peak traced memory of a sequential export against the fake client for a growing number of years, failing if it
+    grows with the amount of data written rather than staying at one month's working set. The repo has no test
+    runner, so this is a manual regression check, run after touching the export path.
+    """
+
+    logger = AppLogger.get_logger(__name__)
+    peak_bytes_dict: dict[int, int] = {}
+
+    # Lazy imports and interpreter-wide caches such as the interned string table grow once with the number of files
+    # written, warm them for the largest run so only the export's own working set is traced
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        _export_years(export_directory_path=Path(temporary_directory), num_years=max(num_years_list),
+                      minutes_per_bar=minutes_per_bar)
+
+    for num_years in num_years_list:
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            # Start every run from the same collector state so earlier garbage is not charged to it
+            gc.collect()
+            tracemalloc.start()
+            _export_years(export_directory_path=Path(temporary_directory), num_years=num_years,
+                          minutes_per_bar=minutes_per_bar)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            total_bytes_written: int = sum(path.stat().st_size for path in Path(temporary_directory).glob("*.csv"))
+            peak_bytes_dict[num_years] = peak_bytes
+
+            logger.info(f"{num_years:>2} year(s) x {len(Constants.TICKER_SYMBOL_LIST)} tickers -> "
+                        f"peak traced {peak_bytes / 2 ** 20:,.1f} MiB, output {total_bytes_written / 2 ** 20:,.1f} MiB")
+
+    growth_ratio: float = peak_bytes_dict[num_years_list[-1]] / peak_bytes_dict[num_years_list[0]]
+
+    if growth_ratio > max_growth_ratio:
+        raise AssertionError(f"Peak memory grew {growth_ratio:.2f}x from {num_years_list[0]} to "
+                             f"{num_years_list[-1]} years, expected at most {max_growth_ratio:.2f}x")
+
+    logger.info(f"Peak memory growth from {num_years_list[0]} to {num_years_list[-1]} years: {growth_ratio:.2f}x")
+
+    return peak_bytes_dict
+
+
+if __name__ == "__main__":
+    benchmark_streaming_extraction_memory(num_years_list=[1, 10])
@@ -0,0 +1,342 @@
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import numpy as np
+import torch
+from alpaca.data.models.bars import BarSet
+from alpaca.trading import Position
+from tensordict import TensorDict, TensorDictBase
+from torch import Tensor
+from torchrl.data import ReplayBuffer, SamplerWithoutReplacement, LazyTensorStorage
+
+import benchmarks._placeholder_credentials  # noqa: F401
+from benchmarks.benchmark_fixtures import get_positions_list, get_account_dict, get_month_bar_set, \
+    get_replay_environment
+from benchmarks.synthetic_market_data import build_synthetic_market_data
+from config.config import settings
+from data_extraction.alpaca_historic_data_extraction import AlpacaHistoricDataExtraction
+from data_extraction.fake_stock_historical_data_client import FakeStockHistoricalDataClient
+from local_alpaca.local_alpaca_server import LocalAlpacaServer
+from logger.logger import AppLogger
+from models.alpaca_trading_environment_ppo import AlpacaTradingEnvironmentPPO
+from models.alpaca_trading_ppo_neural_network import AlpacaTradingPPONeuralNetwork
+from models.ppo_config import PPOConfig
+from trading_account.alpaca_trading_portfolio import AlpacaTradingPortfolio
+from tracing.latency_tracer import LatencyTracer
+from utils.alpaca_client_factory import AlpacaClientFactory
+from utils.trading_activity_csv_writer import TradingActivityCsvWriter
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    num_rounds: int
+    iterations_per_round: int
+    min_seconds: float
+    median_seconds: float
+    mean_seconds: float
+    stdev_seconds: float
+
+
+def _setup_observation_tensor(exit_stack: ExitStack) -> Callable[[], Any]:
+
+    alpaca_trading_portfolio: AlpacaTradingPortfolio = AlpacaTradingPortfolio(
+        device=torch.device("cpu"),
+        trading_client=AlpacaClientFactory.get_trading_client(api_key="local", secret_key="local"))
+    all_positions_list: list[Position] = get_positions_list()
+    account_dict: dict[str, float] = get_account_dict()
+
+    return lambda: alpaca_trading_portfolio.get_observation_tensor(all_positions_list=all_positions_list,
+                                                                   account_dict=account_dict)
+
+
+def _setup_reward_tensor(exit_stack: ExitStack) -> Callable[[], Any]:
+
+    trading_environment: AlpacaTradingEnvironmentPPO = AlpacaTradingEnvironmentPPO(config=PPOConfig())
+    random_generator: torch.Generator = torch.Generator().manual_seed(0)
+    device: torch.device = trading_environment.device
+
+    current_portfolio_value_tensor: Tensor = torch.tensor(100_000.0, device=device)
+    new_portfolio_value_tensor: Tensor = torch.tensor(100_250.0, device=device)
+    portfolio_weights_tensor_t: Tensor = torch.softmax(torch.randn(7, generator=random_generator), dim=-1).to(device)
+    portfolio_weights_tensor_t_1: Tensor = torch.softmax(torch.randn(7, generator=random_generator), dim=-1).to(device)
+
+    return lambda: trading_environment._get_reward_tensor(
+        current_portfolio_value_tensor=current_portfolio_value_tensor,
+        new_portfolio_value_tensor=new_portfolio_value_tensor,
+        portfolio_weights_tensor_t=portfolio_weights_tensor_t,
+        portfolio_weights_tensor_t_1=portfolio_weights_tensor_t_1)
+
+
+def _setup_environment_step_replay(exit_stack: ExitStack) -> Callable[[], Any]:
+
+    trading_environment: AlpacaTradingEnvironmentPPO = get_replay_environment(
+        data_directory_path=Path(exit_stack.enter_context(tempfile.TemporaryDirectory())))
+    trading_environment.reset()
+    action_tensordict: TensorDict = TensorDict({"action": torch.randn(7)}, batch_size=[])
+
+    def step() -> None:
+        if trading_environment._step(action_tensordict)["done"].item():
+            trading_environment.reset()
+
+    return step
+
+
+def _setup_environment_step_live(exit_stack: ExitStack) -> Callable[[], Any]:
+
+    local_alpaca_server: LocalAlpacaServer = exit_stack.enter_context(
+        LocalAlpacaServer(market_data=build_synthetic_market_data(num_sessions=1), bar_interval_seconds=0.05))
+
+    settings.alpaca_url_override = local_alpaca_server.rest_url
+    settings.alpaca_stream_url_override = local_alpaca_server.stream_url
+    exit_stack.callback(setattr, settings, "alpaca_url_override", None)
+    exit_stack.callback(setattr, settings, "alpaca_stream_url_override", None)
+
+    trading_environment: AlpacaTradingEnvironmentPPO = AlpacaTradingEnvironmentPPO(config=PPOConfig())
+    exit_stack.callback(trading_environment.close)
+    exit_stack.callback(trading_environment._portfolio_state_cache.stop)
+    exit_stack.callback(trading_environment._market_data_stream_service.stop)
+
+    # Alternating between two allocations makes every step rebalance and submit orders
+    action_tensordict_cycle: Iterator[TensorDict] = itertools.cycle(
+        [TensorDict({"action": 3.0 * torch.randn(7)}, batch_size=[]) for _ in range(2)])
+
+    # Connects both streams and waits for the first bar outside the timed region
+    trading_environment._step(next(action_tensordict_cycle))
+
+    return lambda: trading_environment._step(next(action_tensordict_cycle))
+
+
+def _setup_ppo_update(exit_stack: ExitStack) -> Callable[[], Any]:
+
+    trading_environment: AlpacaTradingEnvironmentPPO = get_replay_environment(
+        data_directory_path=Path(exit_stack.enter_context(tempfile.TemporaryDirectory())))
+    ppo_config: PPOConfig = trading_environment._config
+    ppo_neural_network: AlpacaTradingPPONeuralNetwork = AlpacaTradingPPONeuralNetwork(env=trading_environment,
+                                                                                      config=ppo_config)
+
+    actor_module = ppo_neural_network.build_actor_module()
+    critic_module = ppo_neural_network.build_critic_module()
+    advantage_module = ppo_neural_network.build_advantage_module(critic_module=critic_module)
+    loss_module = ppo_neural_network.build_loss_module(actor_module=actor_module, critic_module=critic_module)
+    optimizer: torch.optim.Optimizer = torch.optim.Adam(loss_module.parameters(), lr=ppo_config.learning_rate)
+    replay_buffer: ReplayBuffer = ReplayBuffer(storage=LazyTensorStorage(max_size=ppo_config.max_batch_size),
+                                               sampler=SamplerWithoutReplacement())
+
+    with torch.no_grad():
+        tensordict_data: TensorDictBase = trading_environment.rollout(
+            max_steps=ppo_config.max_batch_size, policy=actor_module, break_when_any_done=False)
+
+    return lambda: ppo_neural_network._update_policy(tensordict_data=tensordict_data,
+                                                     advantage_module=advantage_module, loss_module=loss_module,
+                                                     optimizer=optimizer, replay_buffer=replay_buffer)
+
+
+def _setup_clean_stock_dataframe(exit_stack: ExitStack) -> Callable[[], Any]:
+
+    alpaca_historic_data_extraction: AlpacaHistoricDataExtraction = AlpacaHistoricDataExtraction(
+        stock_historical_data_client=FakeStockHistoricalDataClient(),
+        export_directory_path=Path(exit_stack.enter_context(tempfile.TemporaryDirectory())))
+    bars_set: BarSet = get_month_bar_set()
+
+    return lambda: alpaca_historic_data_extraction._clean_stock_dataframe(bars_set=bars_set)
+
+
+def _setup_append_row_to_csv(exit_stack: ExitStack) -> Callable[[], Any]:
+
+    logs_directory_path: Path = Path(exit_stack.enter_context(tempfile.TemporaryDirectory()))
+    trading_activity_csv_writer: TradingActivityCsvWriter = TradingActivityCsvWriter(_base_dir=logs_directory_path)
+    exit_stack.callback(trading_activity_csv_writer.close)
+    all_positions_list: list[Position] = get_positions_list()
+    current_datetime: datetime = datetime(2024, 1, 2, 15, 0, tzinfo=timezone.utc)
+
+    return lambda: trading_activity_csv_writer.append_row_to_csv(
+        logs_directory_path=logs_directory_path, timestep=0, current_datetime=current_datetime,
+        portfolio_equity=100_000.0, portfolio_cash_available=25_000.0, all_positions_list=all_positions_list)
+
+
+def _setup_latency_span(is_enabled: bool) -> Callable[[ExitStack], Callable[[], Any]]:
+
+    def setup(exit_stack: ExitStack) -> Callable[[], Any]:
+
+        latency_tracer: LatencyTracer = LatencyTracer(is_enabled=is_enabled)
+
+        def enter_span() -> None:
+            with latency_tracer.span("benchmark.span"):
+                pass
+
+        return enter_span
+
+    return setup
+
+
+BENCHMARK_SETUP_DICT: dict[str, Callable[[ExitStack], Callable[[], Any]]] = {
+    "observation_tensor": _setup_observation_tensor,
+    "reward_tensor": _setup_reward_tensor,
+    "environment_step_replay": _setup_environment_step_replay,
+    "environment_step_live": _setup_environment_step_live,
+    "ppo_update": _setup_ppo_update,
+    "clean_stock_dataframe": _setup_clean_stock_dataframe,
+    "append_row_to_csv": _setup_append_row_to_csv,
+    "latency_span_disabled": _setup_latency_span(is_enabled=False),
+    "latency_span_enabled": _setup_latency_span(is_enabled=True),
+}
+
+
+class BenchmarkSuite:
+    """
+    Times each hot path over stable synthetic fixtures. Every round runs enough iterations to last at least
+    min_round_seconds, and the per-call statistics over num_rounds are written to JSON keyed by commit so runs can
+    be compared.
+    """
+
+    def __init__(self, num_rounds: int = 7, min_round_seconds: float = 0.2, num_warmup_calls: int = 3) -> None:
+        self._num_rounds: int = num_rounds
+        self._min_round_seconds: float = min_round_seconds
+        self._num_warmup_calls: int = num_warmup_calls
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    def run(self, benchmark_name_list: list[str] | None = None) -> dict[str, Any]:
+
+        benchmark_name_list = benchmark_name_list or list(BENCHMARK_SETUP_DICT)
+        benchmark_result_list: list[BenchmarkResult] = []
+
+        for benchmark_name in benchmark_name_list:
+            with ExitStack() as exit_stack:
+                benchmark_function: Callable[[], Any] = BENCHMARK_SETUP_DICT[benchmark_name](exit_stack)
+                benchmark_result: BenchmarkResult = self._time_benchmark(benchmark_name=benchmark_name,
+                                                                         benchmark_function=benchmark_function)
+
+            benchmark_result_list.append(benchmark_result)
+
+            self.logger.info(f"{benchmark_name:<24} median {benchmark_result.median_seconds * 1e6:>12,.1f}us, "
+                             f"min {benchmark_result.min_seconds * 1e6:>12,.1f}us, "
+                             f"stdev {benchmark_result.stdev_seconds * 1e6:>10,.1f}us "
+                             f"({benchmark_result.num_rounds} x {benchmark_result.iterations_per_round:,})")
+
+        return {
+            "commit": self._get_commit_hash(),
+            "created_at": datetime.now(tz=timezone.utc).isoformat(),
+            "machine": {"platform": platform.platform(), "processor": platform.processor(),
+                        "python_version": platform.python_version(), "torch_version": torch.__version__,
+                        "num_threads": torch.get_num_threads()},
+            "results": {benchmark_result.name: asdict(benchmark_result) for benchmark_result in benchmark_result_list},
+        }
+
+    def _time_benchmark(self, benchmark_name: str, benchmark_function: Callable[[], Any]) -> BenchmarkResult:
+
+        for _ in range(self._num_warmup_calls):
+            benchmark_function()
+
+        # Calibrate like timeit.autorange so fast calls are not dominated by timer resolution
+        iterations_per_round: int = 1
+
+        while True:
+            round_seconds: float = self._time_round(benchmark_function=benchmark_function,
+                                                    iterations_per_round=iterations_per_round)
+
+            if round_seconds >= self._min_round_seconds:
+                break
+
+            iterations_per_round *= 2
+
+        seconds_per_call_list: list[float] = [
+            self._time_round(benchmark_function=benchmark_function,
+                             iterations_per_round=iterations_per_round) / iterations_per_round
+            for _ in range(self._num_rounds)
+        ]
+
+        return BenchmarkResult(name=benchmark_name, num_rounds=self._num_rounds,
+                               iterations_per_round=iterations_per_round,
+                               min_seconds=min(seconds_per_call_list),
+                               median_seconds=statistics.median(seconds_per_call_list),
+                               mean_seconds=statistics.fmean(seconds_per_call_list),
+                               stdev_seconds=statistics.stdev(seconds_per_call_list) if self._num_rounds > 1 else 0.0)
+
+    @staticmethod
+    def _time_round(benchmark_function: Callable[[], Any], iterations_per_round: int) -> float:
+
+        start_time: float = time.perf_counter()
+
+        for _ in range(iterations_per_round):
+            benchmark_function()
+
+        return time.perf_counter() - start_time
+
+    @staticmethod
+    def _get_commit_hash() -> str:
+        try:
+            return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except Exception:
+            return "unknown"
+
+
+def compare_benchmark_results(baseline_result_dict: dict[str, Any], current_result_dict: dict[str, Any],
+                              regression_threshold: float = 0.10) -> list[str]:
+    """
+    Logs the median ratio of every shared benchmark and returns the names that slowed down by more than
+    regression_threshold.
+    """
+
+    logger = AppLogger.get_logger(__name__)
+    regressed_benchmark_name_list: list[str] = []
+
+    for benchmark_name, current_result in current_result_dict["results"].items():
+        baseline_result: dict[str, Any] | None = baseline_result_dict["results"].get(benchmark_name)
+
+        if baseline_result is None:
+            continue
+
+        median_ratio: float = current_result["median_seconds"] / baseline_result["median_seconds"]
+        is_regression: bool = median_ratio > 1.0 + regression_threshold
+
+        if is_regression:
+            regressed_benchmark_name_list.append(benchmark_name)
+
+        logger.info(f"{benchmark_name:<24} {baseline_result['median_seconds'] * 1e6:>12,.1f}us -> "
+                    f"{current_result['median_seconds'] * 1e6:>12,.1f}us ({median_ratio:,.2f}x)"
+                    f"{'  REGRESSION' if is_regression else ''}")
+
+    return regressed_benchmark_name_list
+
+
+if __name__ == "__main__":
+    argument_parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Hot path benchmark suite")
+    argument_parser.add_argument("--benchmark", action="append", choices=list(BENCHMARK_SETUP_DICT),
+                                 help="Benchmark to run, repeatable, defaults to all")
+    argument_parser.add_argument("--output", type=Path, help="JSON output path, defaults to "
+                                                             "benchmarks/results/<commit>.json")
+    argument_parser.add_argument("--compare", type=Path, help="Baseline JSON to compare the new results against")
+    argument_parser.add_argument("--regression-threshold", type=float, default=0.10)
+    argument_parser.add_argument("--num-rounds", type=int, default=7)
+    arguments: argparse.Namespace = argument_parser.parse_args()
+
+    torch.manual_seed(0)
+    np.random.seed(0)
+
+    benchmark_result_dict: dict[str, Any] = BenchmarkSuite(num_rounds=arguments.num_rounds).run(
+        benchmark_name_list=arguments.benchmark)
+
+    output_path: Path = arguments.output or Path("benchmarks/results") / f"{benchmark_result_dict['commit']}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(benchmark_result_dict, indent=2))
+
+    AppLogger.get_logger(__name__).info(f"Benchmark results written to {output_path}")
+
+    if arguments.compare is not None:
+        if compare_benchmark_results(baseline_result_dict=json.loads(arguments.compare.read_text()),
+                                     current_result_dict=benchmark_result_dict,
+                                     regression_threshold=arguments.regression_threshold):
+            raise SystemExit(1)
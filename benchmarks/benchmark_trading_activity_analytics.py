@@ -0,0 +1,103 @@
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.trading_activity_analytics import TradingActivityAnalytics
+from analytics.trading_activity_log_loader import TradingActivityLog, TradingActivityLogLoader
+from logger.logger import AppLogger
+from utils.constants import Constants
+
+
+def write_trading_activity_logs(logs_directory_path: Path, num_sessions: int, num_accounts: int,
+                                steps_per_session: int = 390, seed: int = 0) -> int:
+    """
+    Synthetic minute-level logs for the ppo and random policies, one file per account and session, laid out the way
+    the environments write them. Returns the number of rows written.
+    """
+
+    random_generator: np.random.Generator = np.random.default_rng(seed)
+    first_session_date: date = date(2024, 1, 2)
+    num_rows: int = 0
+
+    for policy_name in ("ppo", "random"):
+        for session_index in range(num_sessions):
+            session_date: date = first_session_date + timedelta(days=session_index)
+            date_directory_path: Path = logs_directory_path / f"{policy_name}_trading_activity" / session_date.isoformat()
+            date_directory_path.mkdir(parents=True, exist_ok=True)
+
+            session_start_datetime: datetime = datetime(session_date.year, session_date.month, session_date.day, 14,
+                                                        30, tzinfo=timezone.utc)
+            timestamp_str_list: list[str] = [(session_start_datetime + timedelta(minutes=step_index)).isoformat() for
+                                             step_index in range(steps_per_session)]
+
+            for account_index in range(num_accounts):
+                equity_array: np.ndarray = 100_000.0 * np.exp(np.cumsum(
+                    random_generator.normal(scale=5e-4, size=steps_per_session)))
+
+                activity_column_dict: dict[str, object] = {
+                    "Timestep": np.arange(1, steps_per_session + 1),
+                    "Timestamp": timestamp_str_list,
+                    "Portfolio Equity": np.round(equity_array, 2),
+                    "Portfolio Cash Available": np.round(equity_array / 4, 2),
+                }
+
+                for ticker_symbol in Constants.TICKER_SYMBOL_LIST:
+                    activity_column_dict[ticker_symbol] = np.cumsum(
+                        random_generator.integers(low=-2, high=3, size=steps_per_session)).clip(min=0).astype(float)
+
+                pd.DataFrame(activity_column_dict).to_csv(
+                    date_directory_path / f"trading_activity_{session_date:%Y_%m_%d}_09_30_{account_index:04d}.csv",
+                    index=False)
+
+                num_rows += steps_per_session
+
+    return num_rows
+
+
+def benchmark_trading_activity_analytics(num_sessions: int = 21, num_accounts: int = 20) -> dict[str, float]:
+    """
+    Seconds to load a month of minute-level logs for many accounts per policy from CSV and from the cache, and to
+    compute every report over them.
+    """
+
+    logger = AppLogger.get_logger(__name__)
+    seconds_dict: dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        logs_directory_path: Path = Path(temporary_directory)
+        num_rows: int = write_trading_activity_logs(logs_directory_path=logs_directory_path,
+                                                    num_sessions=num_sessions, num_accounts=num_accounts)
+
+        policy_summary_dataframe_list: list[pd.DataFrame] = []
+
+        for case_name in ("cold load", "cached load"):
+            start_time: float = time.perf_counter()
+            trading_activity_log: TradingActivityLog = TradingActivityLogLoader(
+                logs_directory_path=logs_directory_path).load()
+            seconds_dict[case_name] = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            trading_activity_analytics: TradingActivityAnalytics = TradingActivityAnalytics(
+                trading_activity_log=trading_activity_log)
+            policy_summary_dataframe_list.append(trading_activity_analytics.get_policy_summary_dataframe())
+            trading_activity_analytics.get_position_history_dataframe(policy_name="ppo")
+            seconds_dict["analytics"] = time.perf_counter() - start_time
+
+    if not policy_summary_dataframe_list[0].equals(policy_summary_dataframe_list[1]):
+        raise AssertionError("Cached load produced a different policy summary than parsing the logs")
+
+    logger.info(f"{num_rows:,} rows, {2 * num_sessions * num_accounts:,} logs "
+                f"({num_accounts} accounts x {num_sessions} sessions x 2 policies)")
+
+    for case_name, seconds in seconds_dict.items():
+        logger.info(f"{case_name:<12} {seconds:>8,.2f}s ({num_rows / seconds:>12,.0f} rows/sec)")
+
+    return seconds_dict
+
+
+if __name__ == "__main__":
+    benchmark_trading_activity_analytics()
@@ -0,0 +1,78 @@
+import csv
+import importlib.util
+import tempfile
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+from alpaca.trading import Position
+
+from benchmarks.benchmark_fixtures import get_positions_list
+from logger.logger import AppLogger
+from utils.constants import Constants
+from utils.trading_activity_csv_writer import TradingActivityCsvWriter
+
+
+def _append_row_reopening_file(csv_path: Path, timestep: int, current_datetime: datetime, portfolio_equity: float,
+                               portfolio_cash_available: float, all_positions_list: list[Position]) -> None:
+
+    # The writer as it was: a positions dict and a file open per row
+    positions_dict: dict[str, float] = {position.symbol: float(position.qty) for position in all_positions_list}
+
+    with csv_path.open(mode="a", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow([timestep, current_datetime.isoformat(), f"{portfolio_equity:.2f}",
+                                f"{portfolio_cash_available:.2f}",
+                                *[positions_dict.get(ticker_symbol, 0) for ticker_symbol in
+                                  Constants.TICKER_SYMBOL_LIST]])
+
+
+def benchmark_trading_activity_writer(num_rows: int = 50_000) -> dict[str, float]:
+    """
+    Rows per second appended to the trading activity log, reopening the CSV for every row against the buffered
+    writer in each output format.
+    """
+
+    logger = AppLogger.get_logger(__name__)
+    all_positions_list: list[Position] = get_positions_list()
+    start_datetime: datetime = datetime(2024, 1, 2, 14, 30, tzinfo=timezone.utc)
+    rows_per_second_dict: dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        logs_directory_path: Path = Path(temporary_directory)
+        csv_path: Path = logs_directory_path / "reopened.csv"
+        start_time: float = time.perf_counter()
+
+        for timestep in range(num_rows):
+            _append_row_reopening_file(csv_path=csv_path, timestep=timestep,
+                                       current_datetime=start_datetime + timedelta(minutes=timestep),
+                                       portfolio_equity=100_000.0, portfolio_cash_available=25_000.0,
+                                       all_positions_list=all_positions_list)
+
+        rows_per_second_dict["csv/reopen per row"] = num_rows / (time.perf_counter() - start_time)
+
+        output_format_list: list[str] = ["csv"] + (["arrow", "parquet"] if importlib.util.find_spec("pyarrow") else [])
+
+        for output_format in output_format_list:
+            start_time = time.perf_counter()
+
+            with TradingActivityCsvWriter(_base_dir=logs_directory_path / output_format,
+                                          output_format=output_format) as trading_activity_csv_writer:
+                for timestep in range(num_rows):
+                    trading_activity_csv_writer.append_row_to_csv(
+                        logs_directory_path=logs_directory_path / output_format, timestep=timestep,
+                        current_datetime=start_datetime + timedelta(minutes=timestep), portfolio_equity=100_000.0,
+                        portfolio_cash_available=25_000.0, all_positions_list=all_positions_list)
+
+            rows_per_second_dict[f"{output_format}/buffered"] = num_rows / (time.perf_counter() - start_time)
+
+    baseline_rows_per_second: float = rows_per_second_dict["csv/reopen per row"]
+
+    for case_name, rows_per_second in rows_per_second_dict.items():
+        logger.info(f"{case_name:<20} {rows_per_second:>12,.0f} rows/sec "
+                    f"({rows_per_second / baseline_rows_per_second:,.1f}x)")
+
+    return rows_per_second_dict
+
+
+if __name__ == "__main__":
+    benchmark_trading_activity_writer()
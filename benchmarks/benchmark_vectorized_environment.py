@@ -0,0 +1,49 @@
+import time
+
+import torch
+from tensordict import TensorDictBase
+
+from benchmarks.synthetic_market_data import build_synthetic_market_data
+from data_extraction.historical_stock_data_loader import HistoricalMarketData
+from logger.logger import AppLogger
+from models.alpaca_trading_environment_vectorized import AlpacaTradingEnvironmentVectorized
+from models.ppo_config import PPOConfig
+
+
+def benchmark_vectorized_environment(num_environments_list: list[int], num_steps: int = 200) -> dict[int, float]:
+    logger = AppLogger.get_logger(__name__)
+    market_data: HistoricalMarketData = build_synthetic_market_data(num_sessions=20)
+
+    steps_per_second_dict: dict[int, float] = {}
+
+    for num_environments in num_environments_list:
+        config: PPOConfig = PPOConfig(num_environments=num_environments)
+        environment: AlpacaTradingEnvironmentVectorized = AlpacaTradingEnvironmentVectorized(config=config,
+                                                                                             market_data=market_data)
+        environment.set_seed(0)
+
+        tensordict: TensorDictBase = environment.reset()
+
+        # Warm up allocator and kernel caches before timing
+        for _ in range(10):
+            _, tensordict = environment.step_and_maybe_reset(environment.rand_action(tensordict))
+
+        start_time: float = time.perf_counter()
+
+        for _ in range(num_steps):
+            _, tensordict = environment.step_and_maybe_reset(environment.rand_action(tensordict))
+
+        elapsed_seconds: float = time.perf_counter() - start_time
+        steps_per_second: float = num_steps * num_environments / elapsed_seconds
+
+        steps_per_second_dict[num_environments] = steps_per_second
+
+        logger.info(f"N={num_environments:>5,} -> {steps_per_second:>14,.0f} environment steps/sec "
+                    f"({num_steps / elapsed_seconds:,.0f} batched calls/sec)")
+
+    return steps_per_second_dict
+
+
+if __name__ == "__main__":
+    torch.set_num_threads(1)
+    benchmark_vectorized_environment(num_environments_list=[1, 8, 64, 256, 1024, 4096])
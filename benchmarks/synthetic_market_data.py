@@ -0,0 +1,40 @@
+import numpy as np
+
+from data_extraction.historical_stock_data_loader import HistoricalMarketData
+from utils.constants import Constants
+
+
+def build_synthetic_market_data(num_sessions: int, ticker_symbol_list: list[str] | None = None,
+                                bars_per_session: int = 391, seed: int = 0) -> HistoricalMarketData:
+    ticker_symbol_list = ticker_symbol_list or Constants.TICKER_SYMBOL_LIST
+
+    random_generator: np.random.Generator = np.random.default_rng(seed)
+
+    num_timesteps: int = num_sessions * bars_per_session
+    num_tickers: int = len(ticker_symbol_list)
+
+    log_returns: np.ndarray = random_generator.normal(loc=0.0, scale=1e-3, size=(num_timesteps, num_tickers))
+    close_prices: np.ndarray = 100.0 * np.exp(np.cumsum(log_returns, axis=0))
+    open_prices: np.ndarray = close_prices * (1.0 + random_generator.normal(scale=1e-4, size=close_prices.shape))
+
+    session_ids: np.ndarray = np.repeat(np.arange(num_sessions, dtype=np.int64), bars_per_session)
+
+    # 09:30 New York open expressed in UTC nanoseconds, one calendar day apart per session
+    session_open_ns: np.ndarray = np.datetime64("2024-01-02T14:30", "ns").astype(np.int64) + session_ids * 86_400 * 10 ** 9
+    timestamps: np.ndarray = session_open_ns + np.tile(np.arange(bars_per_session, dtype=np.int64) * 60 * 10 ** 9,
+                                                       num_sessions)
+
+    session_last_close_prices: np.ndarray = close_prices[bars_per_session - 1::bars_per_session]
+    previous_close_per_session: np.ndarray = np.vstack([close_prices[:1], session_last_close_prices[:-1]])
+
+    return HistoricalMarketData(
+        ticker_symbol_list=list(ticker_symbol_list),
+        timestamps=timestamps,
+        session_ids=session_ids,
+        open_prices=open_prices,
+        high_prices=np.maximum(open_prices, close_prices) * 1.0005,
+        low_prices=np.minimum(open_prices, close_prices) * 0.9995,
+        close_prices=close_prices,
+        volumes=random_generator.integers(low=100, high=10_000, size=close_prices.shape).astype(np.float64),
+        previous_session_close_prices=previous_close_per_session[session_ids]
+    )
@@ -9,6 +9,14 @@ class Settings(BaseSettings):
     api_key_ppo: str = Field(..., description="API key for connection to PPO_Trading_Account on Alpaca Markets")
     api_secret_key_ppo: str = Field(..., description="API secret key for connection to PPO_Trading_Account on Alpaca Markets")
 
+    alpaca_url_override: str | None = Field(None, description="REST base URL that replaces Alpaca's trading and market data endpoints, e.g. a LocalAlpacaServer")
+    alpaca_stream_url_override: str | None = Field(None, description="Websocket base URL that replaces Alpaca's market data and trade update streams")
+
+    latency_tracing_enabled: bool = Field(False, description="Record per-phase latency spans in the trading environments")
+    latency_trace_dump_path: str | None = Field(None, description="File the latency percentiles are periodically written to in Prometheus text format")
+    latency_trace_dump_interval_seconds: float = Field(60.0, description="Seconds between latency dumps")
+    latency_trace_metrics_port: int | None = Field(None, description="Port serving the latency percentiles on /metrics")
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
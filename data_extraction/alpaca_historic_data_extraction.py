@@ -1,11 +1,18 @@
 import calendar
+import os
+import random
+import time
 import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from contextlib import ExitStack
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import numpy as np
 import pandas as pd
+from alpaca.common.exceptions import APIError
 from alpaca.data import StockHistoricalDataClient
 from alpaca.data.models.bars import BarSet
 from alpaca.data.requests import StockBarsRequest
@@ -13,85 +20,353 @@ from alpaca.data.timeframe import TimeFrame
 from tqdm import tqdm
 
 from config.config import settings
+from data_extraction.columnar_bar_store import ColumnarBarStore
+from data_extraction.extraction_chunk_manifest import ExtractionChunkManifest
+from data_extraction.streaming_bar_writer import StreamingBarWriter
+from data_extraction.token_bucket_rate_limiter import TokenBucketRateLimiter
 from logger.logger import AppLogger
+from utils.alpaca_client_factory import AlpacaClientFactory
 from utils.constants import Constants
 
 
 class AlpacaHistoricDataExtraction:
 
-    def __init__(self) -> None:
+    def __init__(self, stock_historical_data_client: StockHistoricalDataClient | None = None,
+                 export_directory_path: Path = Path("historical_stock_data/")) -> None:
         self._api_key_random: str = settings.api_key_random
         self._api_secret_key_random: str = settings.api_secret_key_random
         self._eastern_timezone: ZoneInfo = ZoneInfo("America/New_York")
-        self._export_director_path: Path = Path("historical_stock_data/")
-        self._stock_historical_data_client: StockHistoricalDataClient = StockHistoricalDataClient(self._api_key_random,
-                                                                                                  self._api_secret_key_random)
+        self._export_director_path: Path = export_directory_path
+        self._columnar_bar_store: ColumnarBarStore = ColumnarBarStore(
+            store_directory_path=self._export_director_path / "columnar")
+        self._stock_historical_data_client: StockHistoricalDataClient = (
+                stock_historical_data_client or AlpacaClientFactory.get_stock_historical_data_client(
+            api_key=self._api_key_random, secret_key=self._api_secret_key_random))
+        self._max_retry_attempts: int = 6
+        self._retry_base_wait_seconds: float = 1.0
+        self._rate_limiter: TokenBucketRateLimiter | None = None
+        self._chunk_manifest: ExtractionChunkManifest = ExtractionChunkManifest(
+            chunk_directory_path=self._export_director_path / "chunks")
+        self._ticker_symbol_unique_label_dict: dict[str, int] = self._get_ticker_symbol_unique_label_dict()
         self.logger = AppLogger.get_logger(self.__class__.__name__)
 
-    def export_historical_stock_data(self, list_of_years_to_collect: list[int]) -> None:
+    def export_historical_stock_data(self, list_of_years_to_collect: list[int], output_format: str = "csv") -> None:
         try:
 
+            if output_format not in ("csv", "columnar"):
+                raise ValueError(f"Unsupported output format: {output_format}")
+
             start_year_str, end_year_str = self._get_year_strs(list_of_years_to_collect=list_of_years_to_collect)
 
             for ticker_symbol in tqdm(Constants.TICKER_SYMBOL_LIST, desc="Extracting Historical Stock Data"):
 
-                file_name_str: str = ""
-                stock_dataframe_list: list[pd.DataFrame] = []
+                file_name_str: str = self._get_file_name_str(ticker_symbol=ticker_symbol,
+                                                             start_year_str=start_year_str,
+                                                             end_year_str=end_year_str)
+
+                with self._get_streaming_bar_writer(file_name_str=file_name_str,
+                                                    output_format=output_format) as streaming_bar_writer:
+
+                    for year_num in list_of_years_to_collect:
+
+                        for month_num in tqdm(range(1, 13), desc="Extracting Specific Stock Data"):
+                            stock_bars_request: StockBarsRequest = self._get_stock_bars_request(
+                                ticker_symbol=ticker_symbol, year_num=year_num, month_num=month_num)
+
+                            bars_set: BarSet = self._get_stock_bars_with_retry(stock_bars_request=stock_bars_request)
+
+                            streaming_bar_writer.append(stock_dataframe=self._clean_stock_dataframe(bars_set=bars_set))
+
+                self.logger.info(f"Successfully exported {streaming_bar_writer.num_rows_written:,} rows of "
+                                 f"{ticker_symbol}")
+
+        except Exception as e:
+            self.logger.error(f"Exception Thrown: {e}")
+
+    def export_historical_stock_data_batched(self, list_of_years_to_collect: list[int],
+                                             output_format: str = "csv") -> None:
+        try:
+
+            if output_format not in ("csv", "columnar"):
+                raise ValueError(f"Unsupported output format: {output_format}")
+
+            start_year_str, end_year_str = self._get_year_strs(list_of_years_to_collect=list_of_years_to_collect)
+
+            with ExitStack() as exit_stack:
+
+                streaming_bar_writer_dict: dict[str, StreamingBarWriter] = {
+                    ticker_symbol: exit_stack.enter_context(self._get_streaming_bar_writer(
+                        file_name_str=self._get_file_name_str(ticker_symbol=ticker_symbol,
+                                                              start_year_str=start_year_str,
+                                                              end_year_str=end_year_str),
+                        output_format=output_format))
+                    for ticker_symbol in Constants.TICKER_SYMBOL_LIST
+                }
 
                 for year_num in list_of_years_to_collect:
 
-                    for month_num in tqdm(range(1, 13), desc="Extracting Specific Stock Data"):
-                        days_in_month_num: int = self._get_days_in_month(year=year_num, month=month_num)
+                    for month_num in tqdm(range(1, 13), desc="Extracting Historical Stock Data"):
+                        stock_bars_request: StockBarsRequest = self._get_stock_bars_request(
+                            ticker_symbol=Constants.TICKER_SYMBOL_LIST, year_num=year_num, month_num=month_num)
+
+                        bars_set: BarSet = self._get_stock_bars_with_retry(stock_bars_request=stock_bars_request)
+
+                        stock_dataframe_dict: dict[str, pd.DataFrame] = self._clean_multi_symbol_stock_dataframe(
+                            bars_set=bars_set)
+
+                        for ticker_symbol, streaming_bar_writer in streaming_bar_writer_dict.items():
+                            streaming_bar_writer.append(stock_dataframe=stock_dataframe_dict.get(
+                                ticker_symbol, self._get_empty_stock_dataframe()))
+
+        except Exception as e:
+            self.logger.error(f"Exception Thrown: {e}")
+
+    def export_historical_stock_data_concurrently(self, list_of_years_to_collect: list[int], max_workers: int = 8,
+                                                  requests_per_minute: float = 200.0,
+                                                  retry_base_wait_seconds: float = 1.0,
+                                                  output_format: str = "csv") -> None:
+        try:
+
+            if output_format not in ("csv", "columnar"):
+                raise ValueError(f"Unsupported output format: {output_format}")
+
+            start_year_str, end_year_str = self._get_year_strs(list_of_years_to_collect=list_of_years_to_collect)
+
+            self._retry_base_wait_seconds = retry_base_wait_seconds
+            self._rate_limiter = TokenBucketRateLimiter(requests_per_minute=requests_per_minute,
+                                                        burst_capacity=max_workers)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+                for ticker_symbol in tqdm(Constants.TICKER_SYMBOL_LIST, desc="Extracting Historical Stock Data"):
+
+                    file_name_str: str = self._get_file_name_str(ticker_symbol=ticker_symbol,
+                                                                 start_year_str=start_year_str,
+                                                                 end_year_str=end_year_str)
+
+                    # Futures are drained in submission order through a bounded window, so months are written in
+                    # sequence and at most a couple of windows of cleaned frames are held in memory
+                    pending_future_deque: deque[Future] = deque()
+
+                    with self._get_streaming_bar_writer(file_name_str=file_name_str,
+                                                        output_format=output_format) as streaming_bar_writer:
+
+                        for year_num in list_of_years_to_collect:
+
+                            for month_num in range(1, 13):
+                                pending_future_deque.append(
+                                    executor.submit(self._get_cleaned_month_dataframe, ticker_symbol, year_num,
+                                                    month_num))
+
+                                if len(pending_future_deque) >= 2 * max_workers:
+                                    streaming_bar_writer.append(stock_dataframe=pending_future_deque.popleft().result())
+
+                        while pending_future_deque:
+                            streaming_bar_writer.append(stock_dataframe=pending_future_deque.popleft().result())
+
+        except Exception as e:
+            self.logger.error(f"Exception Thrown: {e}")
+
+        finally:
+            self._rate_limiter = None
+
+    def export_historical_stock_data_incrementally(self, list_of_years_to_collect: list[int], max_workers: int = 8,
+                                                   requests_per_minute: float = 200.0,
+                                                   output_format: str = "csv") -> None:
+        try:
+
+            if output_format not in ("csv", "columnar"):
+                raise ValueError(f"Unsupported output format: {output_format}")
+
+            start_year_str, end_year_str = self._get_year_strs(list_of_years_to_collect=list_of_years_to_collect)
+
+            self._rate_limiter = TokenBucketRateLimiter(requests_per_minute=requests_per_minute,
+                                                        burst_capacity=max_workers)
+
+            chunk_key_list: list[tuple[str, int, int]] = [
+                (ticker_symbol, year_num, month_num)
+                for ticker_symbol in Constants.TICKER_SYMBOL_LIST
+                for year_num in list_of_years_to_collect
+                for month_num in range(1, 13)
+            ]
 
-                        start_datetime: datetime = datetime(
-                            year=year_num,
-                            month=month_num,
-                            day=1,
-                            hour=0,
-                            minute=0,
-                            second=0,
-                            tzinfo=self._eastern_timezone
-                        )
+            missing_chunk_key_list: list[tuple[str, int, int]] = [
+                chunk_key for chunk_key in chunk_key_list if not self._chunk_manifest.is_chunk_complete(
+                    symbol=chunk_key[0], year_num=chunk_key[1], month_num=chunk_key[2],
+                    month_end_datetime=self._get_month_end_datetime(year_num=chunk_key[1], month_num=chunk_key[2]))
+            ]
 
-                        end_datetime: datetime = datetime(
-                            year=year_num,
-                            month=month_num,
-                            day=days_in_month_num,
-                            hour=23,
-                            minute=59,
-                            second=59,
-                            tzinfo=self._eastern_timezone
-                        )
+            self.logger.info(f"{len(chunk_key_list) - len(missing_chunk_key_list)} of {len(chunk_key_list)} chunks "
+                             f"up to date, fetching {len(missing_chunk_key_list)}")
 
-                        stock_bars_request: StockBarsRequest = StockBarsRequest(
-                            timeframe=TimeFrame.Minute,
-                            symbol_or_symbols=ticker_symbol,
-                            start=start_datetime,
-                            end=end_datetime
-                        )
+            failed_chunk_key_set: set[tuple[str, int, int]] = set()
 
-                        bars_set: BarSet = self._stock_historical_data_client.get_stock_bars(stock_bars_request)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
 
-                        self._clean_stock_dataframe(bars_set=bars_set, stock_dataframe_list=stock_dataframe_list,
-                                                    ticker_symbol=ticker_symbol)
+                future_to_chunk_key_dict: dict[Future, tuple[str, int, int]] = {
+                    executor.submit(self._persist_month_chunk, *chunk_key): chunk_key
+                    for chunk_key in missing_chunk_key_list
+                }
 
-                        file_name_str = self._get_file_name_str(ticker_symbol=ticker_symbol,
-                                                                start_year_str=start_year_str,
-                                                                end_year_str=end_year_str)
+                for future in tqdm(as_completed(future_to_chunk_key_dict), total=len(future_to_chunk_key_dict),
+                                   desc="Extracting Missing Stock Data Chunks"):
+                    try:
+                        future.result()
 
-                    result_dataframe: pd.DataFrame = pd.concat(stock_dataframe_list)
+                    except Exception as e:
+                        failed_chunk_key_set.add(future_to_chunk_key_dict[future])
+                        self.logger.error(f"Exception Thrown for {future_to_chunk_key_dict[future]}: {e}")
 
-                    export_file_path: Path = self._get_export_file_path(file_name_str=file_name_str)
+            for ticker_symbol in Constants.TICKER_SYMBOL_LIST:
+                ticker_chunk_key_list: list[tuple[str, int, int]] = [
+                    chunk_key for chunk_key in chunk_key_list if chunk_key[0] == ticker_symbol
+                ]
 
-                    self.logger.info(f"Concatenating data to: {export_file_path}")
+                if failed_chunk_key_set.intersection(ticker_chunk_key_list):
+                    self.logger.warning(f"Skipping rebuild of {ticker_symbol}, re-run to fetch its failed chunks")
+                    continue
 
-                    result_dataframe.to_csv(path_or_buf=export_file_path)
+                file_name_str: str = self._get_file_name_str(ticker_symbol=ticker_symbol,
+                                                             start_year_str=start_year_str,
+                                                             end_year_str=end_year_str)
 
-                    self.logger.info(f"Successfully concatenated data to: {export_file_path}")
+                self._rebuild_export_from_chunks(chunk_key_list=ticker_chunk_key_list, file_name_str=file_name_str,
+                                                 output_format=output_format)
 
         except Exception as e:
             self.logger.error(f"Exception Thrown: {e}")
 
+        finally:
+            self._rate_limiter = None
+
+    def _persist_month_chunk(self, ticker_symbol: str, year_num: int, month_num: int) -> None:
+
+        fetched_at: datetime = datetime.now(tz=self._eastern_timezone)
+        stock_dataframe: pd.DataFrame = self._get_cleaned_month_dataframe(ticker_symbol=ticker_symbol,
+                                                                          year_num=year_num, month_num=month_num)
+
+        chunk_path: Path = self._chunk_manifest.get_chunk_path(symbol=ticker_symbol, year_num=year_num,
+                                                               month_num=month_num)
+        chunk_path.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary_chunk_path: Path = chunk_path.with_suffix(".csv.tmp")
+        stock_dataframe.to_csv(path_or_buf=temporary_chunk_path)
+        os.replace(temporary_chunk_path, chunk_path)
+
+        self._chunk_manifest.record_chunk(symbol=ticker_symbol, year_num=year_num, month_num=month_num,
+                                          num_rows=len(stock_dataframe), fetched_at=fetched_at)
+
+    def _rebuild_export_from_chunks(self, chunk_key_list: list[tuple[str, int, int]], file_name_str: str,
+                                    output_format: str) -> None:
+
+        chunk_path_list: list[Path] = [
+            self._chunk_manifest.get_chunk_path(symbol=symbol, year_num=year_num, month_num=month_num)
+            for symbol, year_num, month_num in chunk_key_list
+        ]
+
+        if output_format == "columnar":
+            for chunk_path in chunk_path_list:
+                self._columnar_bar_store.write_stock_dataframe(stock_dataframe=pd.read_csv(chunk_path))
+            return
+
+        export_file_path: Path = self._get_export_file_path(file_name_str=file_name_str)
+        temporary_export_file_path: Path = export_file_path.with_suffix(".csv.tmp")
+
+        self.logger.info(f"Rebuilding {export_file_path} from {len(chunk_path_list)} chunks")
+
+        # Each chunk is the CSV of one cleaned month, so splicing them under a single header reproduces
+        # the concatenated export byte for byte without re-parsing
+        with temporary_export_file_path.open(mode="w", newline="", encoding="utf-8") as export_file:
+            for chunk_num, chunk_path in enumerate(chunk_path_list):
+                with chunk_path.open(mode="r", newline="", encoding="utf-8") as chunk_file:
+                    if chunk_num > 0:
+                        chunk_file.readline()
+
+                    export_file.writelines(chunk_file)
+
+        os.replace(temporary_export_file_path, export_file_path)
+
+        self.logger.info(f"Successfully rebuilt: {export_file_path}")
+
+    def _get_cleaned_month_dataframe(self, ticker_symbol: str, year_num: int, month_num: int) -> pd.DataFrame:
+
+        stock_bars_request: StockBarsRequest = self._get_stock_bars_request(ticker_symbol=ticker_symbol,
+                                                                            year_num=year_num, month_num=month_num)
+
+        bars_set: BarSet = self._get_stock_bars_with_retry(stock_bars_request=stock_bars_request)
+
+        return self._clean_stock_dataframe(bars_set=bars_set)
+
+    def _get_stock_bars_with_retry(self, stock_bars_request: StockBarsRequest) -> BarSet:
+
+        for attempt_num in range(self._max_retry_attempts):
+
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire()
+
+            try:
+                return self._stock_historical_data_client.get_stock_bars(stock_bars_request)
+
+            except APIError as e:
+
+                if e.status_code != 429 or attempt_num == self._max_retry_attempts - 1:
+                    raise
+
+                # Full jitter keeps throttled workers from retrying in lockstep
+                wait_seconds: float = random.uniform(0, self._retry_base_wait_seconds * 2 ** attempt_num)
+
+                self.logger.warning(f"Throttled on {stock_bars_request.symbol_or_symbols}, retrying in "
+                                    f"{wait_seconds:.2f}s (attempt {attempt_num + 1}/{self._max_retry_attempts})")
+
+                time.sleep(wait_seconds)
+
+    def _get_stock_bars_request(self, ticker_symbol: str | list[str], year_num: int,
+                                month_num: int) -> StockBarsRequest:
+
+        start_datetime: datetime = datetime(
+            year=year_num,
+            month=month_num,
+            day=1,
+            hour=0,
+            minute=0,
+            second=0,
+            tzinfo=self._eastern_timezone
+        )
+
+        end_datetime: datetime = self._get_month_end_datetime(year_num=year_num, month_num=month_num)
+
+        stock_bars_request: StockBarsRequest = StockBarsRequest(
+            timeframe=TimeFrame.Minute,
+            symbol_or_symbols=ticker_symbol,
+            start=start_datetime,
+            end=end_datetime
+        )
+
+        return stock_bars_request
+
+    def _get_month_end_datetime(self, year_num: int, month_num: int) -> datetime:
+
+        days_in_month_num: int = self._get_days_in_month(year=year_num, month=month_num)
+
+        end_datetime: datetime = datetime(
+            year=year_num,
+            month=month_num,
+            day=days_in_month_num,
+            hour=23,
+            minute=59,
+            second=59,
+            tzinfo=self._eastern_timezone
+        )
+
+        return end_datetime
+
+    def _get_streaming_bar_writer(self, file_name_str: str, output_format: str) -> StreamingBarWriter:
+
+        export_file_path: Path = self._get_export_file_path(file_name_str=file_name_str)
+
+        return StreamingBarWriter(export_file_path=export_file_path, output_format=output_format,
+                                  columnar_bar_store=self._columnar_bar_store)
+
     def _get_year_strs(self, list_of_years_to_collect: list[int]) -> tuple[str, str]:
 
         start_year_str: str = ""
@@ -120,18 +395,18 @@ class AlpacaHistoricDataExtraction:
 
         return export_file_path
 
-    def _clean_stock_dataframe(self, bars_set: BarSet, stock_dataframe_list: list[pd.DataFrame],
-                               ticker_symbol: str) -> None:
+    def _clean_stock_dataframe(self, bars_set: BarSet) -> pd.DataFrame:
 
-        ticker_symbol_unique_label_dict: dict[str, int] = self._get_ticker_symbol_unique_label_dict()
+        bars_dataframe: pd.DataFrame = bars_set.df
 
-        stock_dataframe: pd.DataFrame = bars_set.df.reset_index()[
-            ["symbol", "timestamp", "open", "close", "high", "low", "volume"]]
+        if bars_dataframe.empty:
+            return self._get_empty_stock_dataframe()
 
-        unique_ticker_symbol_id: int = ticker_symbol_unique_label_dict[ticker_symbol]
+        stock_dataframe: pd.DataFrame = bars_dataframe.reset_index()[
+            ["symbol", "timestamp", "open", "close", "high", "low", "volume"]]
 
-        stock_dataframe['symbol_id'] = np.where(stock_dataframe['symbol'].str.contains(ticker_symbol),
-                                                unique_ticker_symbol_id, 9999999)
+        stock_dataframe["symbol_id"] = stock_dataframe["symbol"].map(self._ticker_symbol_unique_label_dict).fillna(
+            9999999).astype(np.int64)
 
         stock_dataframe["timestamp"] = pd.to_datetime(stock_dataframe["timestamp"], utc=True)
         stock_dataframe["timestamp"] = stock_dataframe["timestamp"].dt.tz_convert("America/New_York")
@@ -141,7 +416,23 @@ class AlpacaHistoricDataExtraction:
         stock_dataframe = stock_dataframe.reset_index()[
             ["symbol", "symbol_id", "timestamp", "open", "close", "high", "low", "volume"]]
 
-        stock_dataframe_list.append(stock_dataframe)
+        return stock_dataframe
+
+    def _clean_multi_symbol_stock_dataframe(self, bars_set: BarSet) -> dict[str, pd.DataFrame]:
+
+        stock_dataframe: pd.DataFrame = self._clean_stock_dataframe(bars_set=bars_set)
+
+        # One pass over the combined frame, each symbol's slice renumbered as if it had been requested alone
+        stock_dataframe_dict: dict[str, pd.DataFrame] = {
+            ticker_symbol: symbol_dataframe.reset_index(drop=True)
+            for ticker_symbol, symbol_dataframe in stock_dataframe.groupby("symbol", sort=False)
+        }
+
+        return stock_dataframe_dict
+
+    @staticmethod
+    def _get_empty_stock_dataframe() -> pd.DataFrame:
+        return pd.DataFrame(columns=["symbol", "symbol_id", "timestamp", "open", "close", "high", "low", "volume"])
 
     def _get_ticker_symbol_unique_label_dict(self) -> dict[str, int]:
         ticker_symbol_dict: dict[str, int] = {}
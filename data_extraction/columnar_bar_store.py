@@ -0,0 +1,171 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from logger.logger import AppLogger
+
+
+class ColumnarBarStore:
+    """
+    Minute bars stored as raw little-endian column files partitioned by symbol and month, described by a JSON
+    manifest. Partitions are opened with np.memmap so only the slices that are read get paged in.
+    """
+
+    MANIFEST_FILE_NAME: str = "manifest.json"
+    MANIFEST_VERSION: int = 1
+
+    COLUMN_DTYPE_DICT: dict[str, str] = {
+        "timestamp": "<i8",
+        "open": "<f4",
+        "close": "<f4",
+        "high": "<f4",
+        "low": "<f4",
+        "volume": "<f8",
+    }
+
+    def __init__(self, store_directory_path: Path = Path("historical_stock_data/columnar/")) -> None:
+        self._store_directory_path: Path = store_directory_path
+        self._manifest_path: Path = store_directory_path / self.MANIFEST_FILE_NAME
+        self._manifest_dict: dict[str, Any] = self._load_manifest_dict()
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    @classmethod
+    def exists(cls, store_directory_path: Path) -> bool:
+        return (store_directory_path / cls.MANIFEST_FILE_NAME).exists()
+
+    def get_symbol_list(self) -> list[str]:
+        return sorted(self._manifest_dict["partitions"].keys())
+
+    def get_partition_key_list(self, symbol: str) -> list[str]:
+        return sorted(self._manifest_dict["partitions"].get(symbol, {}).keys())
+
+    def get_num_rows(self, symbol: str) -> int:
+        symbol_partition_dict: dict[str, dict[str, int]] = self._manifest_dict["partitions"].get(symbol, {})
+        return sum(partition_dict["num_rows"] for partition_dict in symbol_partition_dict.values())
+
+    def open_partition(self, symbol: str, partition_key: str) -> dict[str, np.memmap]:
+
+        partition_dict: dict[str, Any] = self._manifest_dict["partitions"][symbol][partition_key]
+        partition_directory_path: Path = self._store_directory_path / symbol / partition_key
+
+        column_memmap_dict: dict[str, np.memmap] = {}
+
+        for column, dtype_str in self._manifest_dict["columns"].items():
+            column_memmap_dict[column] = np.memmap(partition_directory_path / f"{column}.bin",
+                                                   dtype=np.dtype(dtype_str), mode="r",
+                                                   shape=(partition_dict["num_rows"],))
+
+        return column_memmap_dict
+
+    def read_symbol_columns(self, symbol: str, start_partition_key: str | None = None,
+                            end_partition_key: str | None = None) -> dict[str, np.ndarray]:
+
+        partition_key_list: list[str] = [
+            partition_key for partition_key in self.get_partition_key_list(symbol=symbol)
+            if (start_partition_key is None or partition_key >= start_partition_key)
+               and (end_partition_key is None or partition_key <= end_partition_key)
+        ]
+
+        column_array_list_dict: dict[str, list[np.ndarray]] = {column: [] for column in self._manifest_dict["columns"]}
+
+        for partition_key in partition_key_list:
+            for column, column_memmap in self.open_partition(symbol=symbol, partition_key=partition_key).items():
+                column_array_list_dict[column].append(column_memmap)
+
+        # A single partition is handed back as the memmap itself, several are gathered into one array
+        return {
+            column: column_array_list[0] if len(column_array_list) == 1 else np.concatenate(
+                column_array_list or [np.empty(0, dtype=np.dtype(self._manifest_dict["columns"][column]))])
+            for column, column_array_list in column_array_list_dict.items()
+        }
+
+    def write_stock_dataframe(self, stock_dataframe: pd.DataFrame) -> None:
+
+        if stock_dataframe.empty:
+            return
+
+        timestamp_series: pd.Series = pd.to_datetime(stock_dataframe["timestamp"], utc=True)
+        timestamp_array: np.ndarray = timestamp_series.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        partition_key_array: np.ndarray = timestamp_series.dt.tz_convert("America/New_York").dt.strftime(
+            "%Y-%m").to_numpy()
+
+        column_array_dict: dict[str, np.ndarray] = {
+            column: stock_dataframe[column].to_numpy() for column in self.COLUMN_DTYPE_DICT if column != "timestamp"
+        }
+        column_array_dict["timestamp"] = timestamp_array
+
+        partition_row_index_dict: dict[tuple[str, str], np.ndarray] = pd.DataFrame(
+            {"symbol": stock_dataframe["symbol"].to_numpy(), "partition_key": partition_key_array}
+        ).groupby(["symbol", "partition_key"], sort=True).indices
+
+        for (symbol, partition_key), row_index_array in partition_row_index_dict.items():
+            self._write_partition(symbol=symbol, partition_key=partition_key,
+                                  column_array_dict={column: column_array[row_index_array] for column, column_array in
+                                                     column_array_dict.items()})
+
+        self._save_manifest_dict()
+
+    def convert_csv_directory(self, csv_directory_path: Path = Path("historical_stock_data/")) -> None:
+
+        for csv_path in sorted(csv_directory_path.glob("*.csv")):
+            self.logger.info(f"Converting {csv_path} to columnar partitions")
+
+            stock_dataframe: pd.DataFrame = pd.read_csv(
+                csv_path,
+                usecols=["symbol", "timestamp", "open", "close", "high", "low", "volume"]
+            )
+
+            self.write_stock_dataframe(stock_dataframe=stock_dataframe)
+
+        self.logger.info(f"Successfully converted {csv_directory_path} to: {self._store_directory_path}")
+
+    def _write_partition(self, symbol: str, partition_key: str, column_array_dict: dict[str, np.ndarray]) -> None:
+
+        timestamp_array: np.ndarray = column_array_dict["timestamp"]
+        sort_order_array: np.ndarray = np.argsort(timestamp_array, kind="stable")
+        partition_directory_path: Path = self._store_directory_path / symbol / partition_key
+        staging_directory_path: Path = partition_directory_path.with_name(f".{partition_key}.tmp")
+
+        shutil.rmtree(staging_directory_path, ignore_errors=True)
+        staging_directory_path.mkdir(parents=True)
+
+        for column, dtype_str in self.COLUMN_DTYPE_DICT.items():
+            column_array_dict[column][sort_order_array].astype(np.dtype(dtype_str)).tofile(
+                staging_directory_path / f"{column}.bin")
+
+        # The partition is swapped in whole so readers never observe a half-written month
+        shutil.rmtree(partition_directory_path, ignore_errors=True)
+        staging_directory_path.rename(partition_directory_path)
+
+        self._manifest_dict["partitions"].setdefault(symbol, {})[partition_key] = {
+            "num_rows": int(len(timestamp_array)),
+            "first_timestamp": int(timestamp_array.min()),
+            "last_timestamp": int(timestamp_array.max()),
+        }
+
+    def _load_manifest_dict(self) -> dict[str, Any]:
+
+        if not self._manifest_path.exists():
+            return {"version": self.MANIFEST_VERSION, "columns": dict(self.COLUMN_DTYPE_DICT), "partitions": {}}
+
+        with self._manifest_path.open(mode="r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest_dict(self) -> None:
+
+        self._store_directory_path.mkdir(parents=True, exist_ok=True)
+        temporary_manifest_path: Path = self._manifest_path.with_suffix(".json.tmp")
+
+        with temporary_manifest_path.open(mode="w", encoding="utf-8") as f:
+            json.dump(self._manifest_dict, f, indent=2, sort_keys=True)
+
+        os.replace(temporary_manifest_path, self._manifest_path)
+
+
+if __name__ == "__main__":
+    ColumnarBarStore().convert_csv_directory()
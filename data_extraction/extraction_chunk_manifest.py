@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+
+class ExtractionChunkManifest:
+    """
+    Records every (symbol, year, month) chunk persisted by the extractor with its row count, checksum and fetch time,
+    so that an interrupted or extended export only re-requests missing or stale months.
+    """
+
+    MANIFEST_FILE_NAME: str = "manifest.json"
+
+    def __init__(self, chunk_directory_path: Path) -> None:
+        self._chunk_directory_path: Path = chunk_directory_path
+        self._manifest_path: Path = chunk_directory_path / self.MANIFEST_FILE_NAME
+        self._lock: threading.Lock = threading.Lock()
+        self._chunk_dict: dict[str, dict[str, Any]] = self._load_chunk_dict()
+
+    def get_chunk_path(self, symbol: str, year_num: int, month_num: int) -> Path:
+        return self._chunk_directory_path / symbol / f"{year_num:04d}_{month_num:02d}.csv"
+
+    def is_chunk_complete(self, symbol: str, year_num: int, month_num: int, month_end_datetime: datetime) -> bool:
+
+        chunk_entry_dict: dict[str, Any] | None = self._chunk_dict.get(self._get_chunk_key(symbol, year_num, month_num))
+        chunk_path: Path = self.get_chunk_path(symbol=symbol, year_num=year_num, month_num=month_num)
+
+        if chunk_entry_dict is None or not chunk_path.exists():
+            return False
+
+        # A month fetched before it ended is missing its final bars and has to be requested again
+        if datetime.fromisoformat(chunk_entry_dict["fetched_at"]) <= month_end_datetime:
+            return False
+
+        return chunk_entry_dict["sha256"] == self._get_file_checksum(file_path=chunk_path)
+
+    def record_chunk(self, symbol: str, year_num: int, month_num: int, num_rows: int, fetched_at: datetime) -> None:
+
+        chunk_path: Path = self.get_chunk_path(symbol=symbol, year_num=year_num, month_num=month_num)
+
+        chunk_entry_dict: dict[str, Any] = {
+            "path": str(chunk_path.relative_to(self._chunk_directory_path)),
+            "num_rows": num_rows,
+            "sha256": self._get_file_checksum(file_path=chunk_path),
+            "fetched_at": fetched_at.isoformat(),
+        }
+
+        with self._lock:
+            self._chunk_dict[self._get_chunk_key(symbol, year_num, month_num)] = chunk_entry_dict
+            self._save_chunk_dict()
+
+    def _load_chunk_dict(self) -> dict[str, dict[str, Any]]:
+
+        if not self._manifest_path.exists():
+            return {}
+
+        with self._manifest_path.open(mode="r", encoding="utf-8") as f:
+            return json.load(f)["chunks"]
+
+    def _save_chunk_dict(self) -> None:
+
+        self._chunk_directory_path.mkdir(parents=True, exist_ok=True)
+        temporary_manifest_path: Path = self._manifest_path.with_suffix(".json.tmp")
+
+        with temporary_manifest_path.open(mode="w", encoding="utf-8") as f:
+            json.dump({"chunks": self._chunk_dict}, f, indent=2, sort_keys=True)
+
+        os.replace(temporary_manifest_path, self._manifest_path)
+
+    @staticmethod
+    def _get_chunk_key(symbol: str, year_num: int, month_num: int) -> str:
+        return f"{symbol}/{year_num:04d}-{month_num:02d}"
+
+    @staticmethod
+    def _get_file_checksum(file_path: Path) -> str:
+
+        sha256_hash = hashlib.sha256()
+
+        with file_path.open(mode="rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha256_hash.update(block)
+
+        return sha256_hash.hexdigest()
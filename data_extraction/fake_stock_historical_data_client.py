@@ -0,0 +1,96 @@
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from alpaca.common.exceptions import APIError
+from alpaca.data.models.bars import BarSet
+from alpaca.data.requests import StockBarsRequest
+from requests import HTTPError, Response
+
+
+class FakeStockHistoricalDataClient:
+    """
+    Offline stand-in for StockHistoricalDataClient.get_stock_bars that serves deterministic synthetic minute bars,
+    with injectable per-request latency and HTTP 429 throttling.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0, throttle_probability: float = 0.0, minutes_per_bar: int = 1,
+                 seed: int = 0) -> None:
+        self._latency_seconds: float = latency_seconds
+        self._throttle_probability: float = throttle_probability
+        self._minutes_per_bar: int = minutes_per_bar
+        self._eastern_timezone: ZoneInfo = ZoneInfo("America/New_York")
+        self._random: random.Random = random.Random(seed)
+        self._lock: threading.Lock = threading.Lock()
+
+        self.num_requests: int = 0
+        self.num_throttled_requests: int = 0
+
+    def get_stock_bars(self, request_params: StockBarsRequest) -> BarSet:
+
+        with self._lock:
+            self.num_requests += 1
+            is_throttled: bool = self._random.random() < self._throttle_probability
+
+            if is_throttled:
+                self.num_throttled_requests += 1
+
+        time.sleep(self._latency_seconds)
+
+        if is_throttled:
+            response: Response = Response()
+            response.status_code = 429
+            raise APIError('{"code": 42910000, "message": "rate limit exceeded"}', HTTPError(response=response))
+
+        symbol_list: list[str] = [request_params.symbol_or_symbols] if isinstance(
+            request_params.symbol_or_symbols, str) else list(request_params.symbol_or_symbols)
+
+        raw_bar_dict: dict[str, list[dict]] = {
+            symbol: self._get_raw_bar_list(symbol=symbol, start_datetime=request_params.start,
+                                           end_datetime=request_params.end)
+            for symbol in symbol_list
+        }
+
+        return BarSet(raw_data=raw_bar_dict)
+
+    def _get_raw_bar_list(self, symbol: str, start_datetime: datetime, end_datetime: datetime) -> list[dict]:
+
+        bar_datetime_list: list[datetime] = []
+        current_date = start_datetime.astimezone(self._eastern_timezone).date()
+
+        while current_date <= end_datetime.astimezone(self._eastern_timezone).date():
+
+            if current_date.weekday() < 5:
+                # Pre- and post-market bars are included so the extractor's session filter is exercised
+                session_start: datetime = datetime(current_date.year, current_date.month, current_date.day, 9, 0,
+                                                   tzinfo=self._eastern_timezone)
+
+                bar_datetime_list.extend(
+                    session_start + timedelta(minutes=minute) for minute in range(0, 8 * 60, self._minutes_per_bar))
+
+            current_date += timedelta(days=1)
+
+        random_generator: np.random.Generator = np.random.default_rng(
+            zlib.adler32(f"{symbol}{start_datetime.isoformat()}".encode("utf-8")))
+
+        close_prices: np.ndarray = 100.0 * np.exp(
+            np.cumsum(random_generator.normal(scale=1e-3, size=len(bar_datetime_list))))
+        volumes: np.ndarray = random_generator.integers(low=100, high=10_000, size=len(bar_datetime_list))
+
+        return [
+            {
+                "t": bar_datetime.astimezone(ZoneInfo("UTC")).isoformat().replace("+00:00", "Z"),
+                "o": round(float(close_price) * 0.9999, 4),
+                "h": round(float(close_price) * 1.0005, 4),
+                "l": round(float(close_price) * 0.9995, 4),
+                "c": round(float(close_price), 4),
+                "v": float(volume),
+                "n": 1,
+                "vw": round(float(close_price), 4),
+            }
+            for bar_datetime, close_price, volume in zip(bar_datetime_list, close_prices, volumes)
+        ]
@@ -0,0 +1,176 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_extraction.columnar_bar_store import ColumnarBarStore
+from logger.logger import AppLogger
+from utils.constants import Constants
+
+
+@dataclass(frozen=True)
+class HistoricalMarketData:
+    """
+    Minute bars for every ticker aligned on a shared timestamp axis, shaped [num_timesteps, num_tickers].
+    """
+    ticker_symbol_list: list[str]
+    timestamps: np.ndarray
+    session_ids: np.ndarray
+    open_prices: np.ndarray
+    high_prices: np.ndarray
+    low_prices: np.ndarray
+    close_prices: np.ndarray
+    volumes: np.ndarray
+    previous_session_close_prices: np.ndarray
+
+    @property
+    def num_timesteps(self) -> int:
+        return int(self.timestamps.shape[0])
+
+    @property
+    def num_tickers(self) -> int:
+        return len(self.ticker_symbol_list)
+
+    def get_session_bounds_list(self) -> list[tuple[int, int]]:
+        session_start_indices: np.ndarray = np.flatnonzero(np.diff(self.session_ids, prepend=-1) != 0)
+        session_end_indices: np.ndarray = np.append(session_start_indices[1:], self.num_timesteps)
+
+        return [(int(start), int(end)) for start, end in zip(session_start_indices, session_end_indices)]
+
+
+class HistoricalStockDataLoader:
+
+    def __init__(self, data_directory_path: Path = Path("historical_stock_data/"),
+                 ticker_symbol_list: list[str] | None = None) -> None:
+        self._data_directory_path: Path = data_directory_path
+        self._ticker_symbol_list: list[str] = ticker_symbol_list or Constants.TICKER_SYMBOL_LIST
+        self._price_column_list: list[str] = ["open", "high", "low", "close"]
+        self._columnar_bar_store: ColumnarBarStore | None = self._get_columnar_bar_store()
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    def _get_columnar_bar_store(self) -> ColumnarBarStore | None:
+
+        for store_directory_path in [self._data_directory_path, self._data_directory_path / "columnar"]:
+            if ColumnarBarStore.exists(store_directory_path=store_directory_path):
+                return ColumnarBarStore(store_directory_path=store_directory_path)
+
+        return None
+
+    def load_market_data(self) -> HistoricalMarketData:
+
+        ticker_dataframe_dict: dict[str, pd.DataFrame] = {}
+
+        for ticker_symbol in self._ticker_symbol_list:
+            ticker_dataframe_dict[ticker_symbol] = self._read_ticker_dataframe(ticker_symbol=ticker_symbol)
+
+        return self._get_aligned_market_data(ticker_dataframe_dict=ticker_dataframe_dict)
+
+    def _read_ticker_dataframe(self, ticker_symbol: str) -> pd.DataFrame:
+
+        if self._columnar_bar_store is not None:
+            return self._read_columnar_ticker_dataframe(ticker_symbol=ticker_symbol)
+
+        csv_path_list: list[Path] = sorted(self._data_directory_path.glob(f"{ticker_symbol}_*.csv"))
+
+        if not csv_path_list:
+            raise FileNotFoundError(f"No historical stock data found for {ticker_symbol} in {self._data_directory_path}")
+
+        stock_dataframe_list: list[pd.DataFrame] = []
+
+        for csv_path in csv_path_list:
+            self.logger.info(f"Loading historical stock data from: {csv_path}")
+
+            stock_dataframe: pd.DataFrame = pd.read_csv(
+                csv_path,
+                usecols=["timestamp", "open", "close", "high", "low", "volume"]
+            )
+
+            stock_dataframe_list.append(stock_dataframe)
+
+        ticker_dataframe: pd.DataFrame = pd.concat(stock_dataframe_list)
+        ticker_dataframe["timestamp"] = pd.to_datetime(ticker_dataframe["timestamp"], utc=True)
+
+        ticker_dataframe = ticker_dataframe.drop_duplicates(subset="timestamp").set_index("timestamp").sort_index()
+
+        return ticker_dataframe
+
+    def _read_columnar_ticker_dataframe(self, ticker_symbol: str) -> pd.DataFrame:
+
+        if self._columnar_bar_store.get_num_rows(symbol=ticker_symbol) == 0:
+            raise FileNotFoundError(f"No columnar stock data found for {ticker_symbol} in {self._data_directory_path}")
+
+        column_array_dict: dict[str, np.ndarray] = self._columnar_bar_store.read_symbol_columns(symbol=ticker_symbol)
+
+        ticker_dataframe: pd.DataFrame = pd.DataFrame(
+            {column: column_array_dict[column] for column in self._price_column_list + ["volume"]},
+            index=pd.DatetimeIndex(column_array_dict["timestamp"].astype("datetime64[ns]"), tz="UTC", name="timestamp")
+        )
+
+        return ticker_dataframe[~ticker_dataframe.index.duplicated()].sort_index()
+
+    def _get_aligned_market_data(self, ticker_dataframe_dict: dict[str, pd.DataFrame]) -> HistoricalMarketData:
+
+        timestamp_index: pd.DatetimeIndex = pd.DatetimeIndex([], tz="UTC")
+
+        for ticker_dataframe in ticker_dataframe_dict.values():
+            timestamp_index = timestamp_index.union(ticker_dataframe.index)
+
+        aligned_column_dict: dict[str, list[np.ndarray]] = {column: [] for column in self._price_column_list + ["volume"]}
+
+        for ticker_dataframe in ticker_dataframe_dict.values():
+            aligned_dataframe: pd.DataFrame = ticker_dataframe.reindex(timestamp_index)
+
+            # Missing minutes carry the last traded price forward with no volume
+            aligned_dataframe["close"] = aligned_dataframe["close"].ffill()
+
+            for price_column in ["open", "high", "low"]:
+                aligned_dataframe[price_column] = aligned_dataframe[price_column].fillna(aligned_dataframe["close"])
+
+            aligned_dataframe["volume"] = aligned_dataframe["volume"].fillna(0.0)
+
+            for column, column_array_list in aligned_column_dict.items():
+                column_array_list.append(aligned_dataframe[column].to_numpy(dtype=np.float64))
+
+        close_prices: np.ndarray = np.stack(aligned_column_dict["close"], axis=1)
+        is_complete_row_array: np.ndarray = ~np.isnan(close_prices).any(axis=1)
+
+        timestamp_index = timestamp_index[is_complete_row_array]
+
+        session_dates: pd.Index = timestamp_index.tz_convert("America/New_York").normalize()
+        session_ids: np.ndarray = pd.factorize(session_dates)[0].astype(np.int64)
+
+        column_array_dict: dict[str, np.ndarray] = {
+            column: np.stack(column_array_list, axis=1)[is_complete_row_array]
+            for column, column_array_list in aligned_column_dict.items()
+        }
+
+        previous_session_close_prices: np.ndarray = self._get_previous_session_close_prices(
+            close_prices=column_array_dict["close"], session_ids=session_ids)
+
+        self.logger.info(
+            f"Loaded {len(timestamp_index):,} aligned minute bars across {len(ticker_dataframe_dict)} tickers")
+
+        return HistoricalMarketData(
+            ticker_symbol_list=list(ticker_dataframe_dict.keys()),
+            timestamps=timestamp_index.as_unit("ns").asi8.copy(),
+            session_ids=session_ids,
+            open_prices=column_array_dict["open"],
+            high_prices=column_array_dict["high"],
+            low_prices=column_array_dict["low"],
+            close_prices=column_array_dict["close"],
+            volumes=column_array_dict["volume"],
+            previous_session_close_prices=previous_session_close_prices
+        )
+
+    @staticmethod
+    def _get_previous_session_close_prices(close_prices: np.ndarray, session_ids: np.ndarray) -> np.ndarray:
+
+        session_start_indices: np.ndarray = np.flatnonzero(np.diff(session_ids, prepend=-1) != 0)
+        session_last_close_prices: np.ndarray = close_prices[np.append(session_start_indices[1:], len(session_ids)) - 1]
+
+        # The first session has no prior close, so it is measured against its own open bar
+        previous_close_per_session: np.ndarray = np.vstack(
+            [close_prices[session_start_indices[:1]], session_last_close_prices[:-1]])
+
+        return previous_close_per_session[session_ids]
@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from data_extraction.columnar_bar_store import ColumnarBarStore
+
+
+class StreamingBarWriter:
+    """
+    Appends cleaned monthly bar frames straight to a per-symbol export so peak memory is bounded by one month,
+    independent of how many years are extracted.
+    """
+
+    def __init__(self, export_file_path: Path, output_format: str, columnar_bar_store: ColumnarBarStore) -> None:
+        self._export_file_path: Path = export_file_path
+        self._output_format: str = output_format
+        self._columnar_bar_store: ColumnarBarStore = columnar_bar_store
+        self._temporary_export_file_path: Path = export_file_path.with_suffix(".csv.tmp")
+        self._is_header_written: bool = False
+        self._num_rows_written: int = 0
+
+    @property
+    def num_rows_written(self) -> int:
+        return self._num_rows_written
+
+    def __enter__(self) -> "StreamingBarWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+
+        if exc_type is None:
+            self.close()
+            return
+
+        self._temporary_export_file_path.unlink(missing_ok=True)
+
+    def append(self, stock_dataframe: pd.DataFrame) -> None:
+
+        self._num_rows_written += len(stock_dataframe)
+
+        if self._output_format == "columnar":
+            self._columnar_bar_store.write_stock_dataframe(stock_dataframe=stock_dataframe)
+            return
+
+        # Every month keeps its own 0-based index, matching a to_csv of the concatenated months
+        stock_dataframe.to_csv(path_or_buf=self._temporary_export_file_path,
+                               mode="a" if self._is_header_written else "w",
+                               header=not self._is_header_written)
+
+        self._is_header_written = True
+
+    def close(self) -> None:
+
+        if self._output_format == "columnar" or not self._is_header_written:
+            return
+
+        os.replace(self._temporary_export_file_path, self._export_file_path)
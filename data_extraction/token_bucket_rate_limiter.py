@@ -0,0 +1,38 @@
+import threading
+import time
+
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket shared by every worker issuing requests against the same API key.
+    """
+
+    def __init__(self, requests_per_minute: float, burst_capacity: int) -> None:
+        self._refill_rate_per_second: float = requests_per_minute / 60.0
+        self._burst_capacity: float = float(burst_capacity)
+        self._available_tokens: float = float(burst_capacity)
+        self._last_refill_time: float = time.monotonic()
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+
+        while True:
+
+            with self._lock:
+                self._refill_tokens()
+
+                if self._available_tokens >= 1.0:
+                    self._available_tokens -= 1.0
+                    return
+
+                wait_seconds: float = (1.0 - self._available_tokens) / self._refill_rate_per_second
+
+            time.sleep(wait_seconds)
+
+    def _refill_tokens(self) -> None:
+        current_time: float = time.monotonic()
+        elapsed_seconds: float = current_time - self._last_refill_time
+
+        self._available_tokens = min(self._burst_capacity,
+                                     self._available_tokens + elapsed_seconds * self._refill_rate_per_second)
+        self._last_refill_time = current_time
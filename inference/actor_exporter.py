@@ -0,0 +1,102 @@
+import copy
+import json
+from pathlib import Path
+
+import torch
+from tensordict.nn import NormalParamExtractor, TensorDictModule
+from torch import nn, Tensor
+from torch.ao.quantization import quantize_dynamic
+from torchrl.modules import ProbabilisticActor
+
+from logger.logger import AppLogger
+
+
+class DeterministicActorNetwork(nn.Module):
+    """
+    The actor backbone followed by the mean of its TanhNormal, i.e. the action the ProbabilisticActor takes under
+    ExplorationType.DETERMINISTIC, without tensordicts or distribution objects.
+    """
+
+    def __init__(self, actor_network: nn.Sequential, action_dimension: int, low: float = -1.0,
+                 high: float = 1.0) -> None:
+        super().__init__()
+        self.actor_network: nn.Sequential = actor_network
+        self.action_dimension: int = action_dimension
+        self.action_scale: float = (high - low) / 2
+        self.action_shift: float = (high + low) / 2
+
+    def forward(self, observation_tensor: Tensor) -> Tensor:
+        # Dynamically quantized linear layers only accept batched input
+        distribution_parameters_tensor: Tensor = self.actor_network(observation_tensor.reshape(1, -1))
+        loc_tensor: Tensor = distribution_parameters_tensor[:, :self.action_dimension]
+
+        return (torch.tanh(loc_tensor) * self.action_scale + self.action_shift).reshape(self.action_dimension)
+
+
+class ActorExporter:
+    """
+    Freezes a trained ProbabilisticActor into a standalone artifact for ActorInferenceRunner. A .pt2 path is written
+    with torch.export, any other path as a frozen TorchScript module, which is the only format that can also be int8
+    dynamically quantized.
+    """
+
+    METADATA_FILE_NAME: str = "actor_metadata.json"
+
+    def __init__(self) -> None:
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    def export(self, actor_module: ProbabilisticActor, export_path: Path, observation_dimension: int,
+               action_dimension: int, quantize_int8: bool = False) -> Path:
+
+        is_torch_export: bool = export_path.suffix == ".pt2"
+
+        if is_torch_export and quantize_int8:
+            raise ValueError("int8 dynamic quantization is only supported for TorchScript artifacts")
+
+        deterministic_actor_network: DeterministicActorNetwork = self.get_deterministic_actor_network(
+            actor_module=actor_module, action_dimension=action_dimension).cpu().eval()
+
+        if quantize_int8:
+            deterministic_actor_network = quantize_dynamic(deterministic_actor_network, {nn.Linear},
+                                                           dtype=torch.qint8)
+
+        example_observation_tensor: Tensor = torch.zeros(observation_dimension, dtype=torch.float32)
+        metadata_dict: dict[str, int | bool] = {
+            "observation_dimension": observation_dimension,
+            "action_dimension": action_dimension,
+            "quantize_int8": quantize_int8,
+        }
+        extra_files_dict: dict[str, str] = {self.METADATA_FILE_NAME: json.dumps(metadata_dict)}
+
+        export_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with torch.no_grad():
+            if is_torch_export:
+                torch.export.save(torch.export.export(deterministic_actor_network, (example_observation_tensor,)),
+                                  export_path, extra_files=extra_files_dict)
+            else:
+                scripted_actor_network: torch.jit.ScriptModule = torch.jit.freeze(
+                    torch.jit.trace(deterministic_actor_network, example_observation_tensor))
+                torch.jit.save(scripted_actor_network, export_path, _extra_files=extra_files_dict)
+
+        self.logger.info(f"Exported {'int8 ' if quantize_int8 else ''}actor to {export_path}")
+
+        return export_path
+
+    @staticmethod
+    def get_deterministic_actor_network(actor_module: ProbabilisticActor,
+                                        action_dimension: int) -> DeterministicActorNetwork:
+
+        actor_backbone: TensorDictModule = actor_module.module[0]
+        # Copied so exporting never moves or quantizes the network that is still being trained
+        actor_network: nn.Sequential = copy.deepcopy(actor_backbone.module)
+
+        # The mean action only needs loc, which is the first half of the output NormalParamExtractor splits
+        if isinstance(actor_network[-1], NormalParamExtractor):
+            actor_network = actor_network[:-1]
+
+        distribution_kwargs: dict = actor_module.module[-1].distribution_kwargs
+
+        return DeterministicActorNetwork(actor_network=actor_network, action_dimension=action_dimension,
+                                         low=float(distribution_kwargs.get("low", -1.0)),
+                                         high=float(distribution_kwargs.get("high", 1.0)))
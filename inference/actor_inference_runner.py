@@ -0,0 +1,81 @@
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch import Tensor
+
+from logger.logger import AppLogger
+from tracing.latency_histogram import LatencyHistogram
+
+
+class ActorInferenceRunner:
+    """
+    Loads an artifact written by ActorExporter and runs the deterministic actor on one observation at a time, timing
+    every call. Deliberately imports neither torchrl nor the training modules, so a live trading process only pays
+    for torch itself.
+    """
+
+    METADATA_FILE_NAME: str = "actor_metadata.json"
+
+    def __init__(self, artifact_path: Path, num_warmup_calls: int = 100, num_threads: int | None = None) -> None:
+        self._artifact_path: Path = artifact_path
+        self._num_warmup_calls: int = num_warmup_calls
+        self.latency_histogram: LatencyHistogram = LatencyHistogram()
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+        # A single small matrix-vector product per call loses more to thread wake-ups than it gains
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+
+        extra_files_dict: dict[str, str | bytes] = {self.METADATA_FILE_NAME: ""}
+
+        if artifact_path.suffix == ".pt2":
+            self._actor_network = torch.export.load(artifact_path, extra_files=extra_files_dict).module()
+        else:
+            self._actor_network = torch.jit.load(artifact_path, map_location="cpu", _extra_files=extra_files_dict)
+
+        metadata_dict: dict[str, int | bool] = json.loads(extra_files_dict[self.METADATA_FILE_NAME])
+        self.observation_dimension: int = int(metadata_dict["observation_dimension"])
+        self.action_dimension: int = int(metadata_dict["action_dimension"])
+
+        self._warm_up()
+
+    def get_action_tensor(self, observation: Tensor | np.ndarray) -> Tensor:
+
+        observation_tensor: Tensor = torch.as_tensor(observation, dtype=torch.float32)
+
+        start_time_ns: int = time.perf_counter_ns()
+
+        with torch.inference_mode():
+            action_tensor: Tensor = self._actor_network(observation_tensor)
+
+        self.latency_histogram.record((time.perf_counter_ns() - start_time_ns) / 1e9)
+
+        return action_tensor
+
+    def get_target_weights_array(self, observation: Tensor | np.ndarray) -> np.ndarray:
+        # Same projection as the trading environments apply to the action
+        return torch.softmax(self.get_action_tensor(observation=observation), dim=-1).numpy().astype(np.float64)
+
+    def get_latency_summary_dict(self) -> dict[str, float]:
+        return {
+            "count": self.latency_histogram.count,
+            "p50_seconds": self.latency_histogram.get_percentile_seconds(percentile=50.0),
+            "p99_seconds": self.latency_histogram.get_percentile_seconds(percentile=99.0),
+            "max_seconds": self.latency_histogram.max_seconds,
+        }
+
+    def _warm_up(self) -> None:
+
+        warmup_observation_tensor: Tensor = torch.zeros(self.observation_dimension, dtype=torch.float32)
+
+        # TorchScript profiles and optimizes the graph over its first calls
+        for _ in range(self._num_warmup_calls):
+            self.get_action_tensor(observation=warmup_observation_tensor)
+
+        self.logger.info(f"Loaded actor from {self._artifact_path}, warm p50 "
+                         f"{self.latency_histogram.get_percentile_seconds(percentile=50.0) * 1e6:,.1f}us")
+
+        self.latency_histogram = LatencyHistogram()
@@ -0,0 +1,54 @@
+import argparse
+from pathlib import Path
+from typing import Any
+
+from inference.actor_exporter import ActorExporter
+from logger.logger import AppLogger
+from models.alpaca_trading_environment_ppo import AlpacaTradingEnvironmentPPO
+from models.alpaca_trading_ppo_neural_network import AlpacaTradingPPONeuralNetwork
+from models.ppo_config import PPOConfig
+from models.training_checkpointer import TrainingCheckpointer
+
+
+def export_actor(checkpoint_directory_path: Path, historical_data_directory_path: Path, export_path: Path,
+                 quantize_int8: bool = False) -> Path:
+    """
+    Rebuilds the actor from the latest training checkpoint and exports its deterministic mean action. The replay
+    environment only supplies the action spec and device the actor was built with.
+    """
+
+    checkpoint_dict: dict[str, Any] | None = TrainingCheckpointer(
+        checkpoint_directory_path=checkpoint_directory_path).load_latest()
+
+    if checkpoint_dict is None:
+        raise FileNotFoundError(f"No checkpoint found in {checkpoint_directory_path}")
+
+    ppo_config: PPOConfig = PPOConfig(historical_data_directory=str(historical_data_directory_path))
+    trading_environment: AlpacaTradingEnvironmentPPO = AlpacaTradingEnvironmentPPO(config=ppo_config)
+    actor_module = AlpacaTradingPPONeuralNetwork(env=trading_environment, config=ppo_config).build_actor_module()
+    actor_module.load_state_dict(checkpoint_dict["actor_state_dict"])
+
+    return ActorExporter().export(actor_module=actor_module, export_path=export_path,
+                                  observation_dimension=trading_environment.observation_spec["observation"].shape[-1],
+                                  action_dimension=ppo_config.action_dimension, quantize_int8=quantize_int8)
+
+
+def main() -> None:
+    argument_parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Export the trained PPO actor for low-latency inference")
+    argument_parser.add_argument("--checkpoint-directory", type=Path, required=True)
+    argument_parser.add_argument("--historical-data-directory", type=Path, required=True)
+    argument_parser.add_argument("--output", type=Path, default=Path("artifacts") / "ppo_actor.pt",
+                                 help="a .pt2 suffix writes a torch.export program instead of TorchScript")
+    argument_parser.add_argument("--quantize-int8", action="store_true")
+    arguments: argparse.Namespace = argument_parser.parse_args()
+
+    export_path: Path = export_actor(checkpoint_directory_path=arguments.checkpoint_directory,
+                                     historical_data_directory_path=arguments.historical_data_directory,
+                                     export_path=arguments.output, quantize_int8=arguments.quantize_int8)
+
+    AppLogger.get_logger(__name__).info(f"Actor artifact written to {export_path}")
+
+
+if __name__ == "__main__":
+    main()
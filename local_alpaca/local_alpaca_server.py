@@ -0,0 +1,597 @@
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse, parse_qs
+
+import msgpack
+import numpy as np
+import pandas as pd
+import websockets
+from websockets.asyncio.server import ServerConnection, Server
+
+from data_extraction.historical_stock_data_loader import HistoricalMarketData, HistoricalStockDataLoader
+from logger.logger import AppLogger
+from trading_account.simulated_trading_portfolio import SimulatedTradingPortfolio
+
+
+class LocalAlpacaServer:
+    """
+    Local stand-in for the Alpaca endpoints the application talks to, backed by replayed minute bars:
+
+    - REST: /v2/account, /v2/positions, /v2/orders, /v2/stocks/bars and /v2/stocks/quotes/latest
+    - Websocket: the msgpack market data protocol on /v2/{feed} and the JSON trade update protocol on /stream
+
+    Market orders fill immediately at the replayed close and are echoed as trade update fills. Every REST request
+    waits latency_seconds and fails with error_status_code at error_rate, so step latency can be measured
+    reproducibly. Bars are streamed and the replay clock advances every bar_interval_seconds, or only through
+    advance_market() when it is None.
+    """
+
+    def __init__(self, market_data: HistoricalMarketData, initial_cash: float = 100_000.0,
+                 latency_seconds: float = 0.0, error_rate: float = 0.0, error_status_code: int = 500,
+                 rejected_symbol_list: list[str] | None = None, bar_interval_seconds: float | None = 1.0,
+                 host: str = "127.0.0.1", rest_port: int = 0, stream_port: int = 0, seed: int = 0) -> None:
+        self._market_data: HistoricalMarketData = market_data
+        self._latency_seconds: float = latency_seconds
+        self._error_rate: float = error_rate
+        self._error_status_code: int = error_status_code
+        self._rejected_symbol_list: list[str] = rejected_symbol_list or []
+        self._bar_interval_seconds: float | None = bar_interval_seconds
+        self._host: str = host
+        self._rest_port: int = rest_port
+        self._stream_port: int = stream_port
+        self._random: random.Random = random.Random(seed)
+        self._lock: threading.Lock = threading.Lock()
+
+        self._ticker_symbol_to_index_dict: dict[str, int] = {ticker_symbol: ticker_index for
+                                                             ticker_index, ticker_symbol in
+                                                             enumerate(market_data.ticker_symbol_list)}
+        self._asset_id_dict: dict[str, str] = {ticker_symbol: str(uuid.uuid5(uuid.NAMESPACE_URL, ticker_symbol)) for
+                                               ticker_symbol in market_data.ticker_symbol_list}
+        self._account_id_str: str = str(uuid.uuid5(uuid.NAMESPACE_URL, "local-alpaca-account"))
+
+        self._simulated_trading_portfolio: SimulatedTradingPortfolio = SimulatedTradingPortfolio(
+            device="cpu", market_data=market_data, initial_cash=initial_cash)
+        self._simulated_trading_portfolio.reset(start_index=0)
+
+        self._http_server: ThreadingHTTPServer | None = None
+        self._http_server_thread: threading.Thread | None = None
+        self._stream_loop: asyncio.AbstractEventLoop | None = None
+        self._stream_server: Server | None = None
+        self._stream_server_thread: threading.Thread | None = None
+        self._stream_server_ready_event: threading.Event = threading.Event()
+        self._data_connection_symbol_dict: dict[ServerConnection, set[str]] = {}
+        self._trade_update_connection_set: set[ServerConnection] = set()
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+        self._num_active_requests: int = 0
+
+        self.num_requests: int = 0
+        self.num_injected_errors: int = 0
+        self.max_concurrent_requests: int = 0
+
+    @classmethod
+    def from_historical_data_directory(cls, data_directory_path: Path, **kwargs: Any) -> "LocalAlpacaServer":
+        market_data: HistoricalMarketData = HistoricalStockDataLoader(
+            data_directory_path=data_directory_path).load_market_data()
+        return cls(market_data=market_data, **kwargs)
+
+    @property
+    def rest_url(self) -> str:
+        return f"http://{self._host}:{self._http_server.server_address[1]}"
+
+    @property
+    def stream_url(self) -> str:
+        return f"ws://{self._host}:{self._stream_server.sockets[0].getsockname()[1]}"
+
+    @property
+    def current_index(self) -> int:
+        return self._simulated_trading_portfolio.current_index
+
+    def __enter__(self) -> "LocalAlpacaServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def start(self) -> None:
+
+        self._http_server = ThreadingHTTPServer((self._host, self._rest_port), self._get_request_handler_class())
+        self._http_server.daemon_threads = True
+        self._http_server_thread = threading.Thread(target=self._http_server.serve_forever, name="LocalAlpacaRest",
+                                                    daemon=True)
+        self._http_server_thread.start()
+
+        self._stream_server_thread = threading.Thread(target=asyncio.run, args=(self._run_stream_server(),),
+                                                      name="LocalAlpacaStream", daemon=True)
+        self._stream_server_thread.start()
+        self._stream_server_ready_event.wait(timeout=10)
+
+        self.logger.info(f"Local Alpaca server listening on {self.rest_url} and {self.stream_url}")
+
+    def stop(self) -> None:
+
+        if self._http_server is not None:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+            self._http_server_thread.join(timeout=10)
+            self._http_server = None
+
+        if self._stream_server is not None:
+            self._stream_loop.call_soon_threadsafe(self._stream_server.close)
+            self._stream_server_thread.join(timeout=10)
+            self._stream_server = None
+
+    def advance_market(self) -> bool:
+
+        with self._lock:
+            if self.current_index >= self._market_data.num_timesteps - 1:
+                return False
+
+            self._simulated_trading_portfolio.advance_market()
+
+        if self._stream_loop is not None:
+            asyncio.run_coroutine_threadsafe(self._broadcast_bars(), self._stream_loop)
+
+        return True
+
+    def _handle_rest_request(self, method: str, path: str, query_dict: dict[str, str],
+                             body_dict: dict[str, Any]) -> tuple[int, Any]:
+
+        with self._lock:
+            self.num_requests += 1
+            self._num_active_requests += 1
+            self.max_concurrent_requests = max(self.max_concurrent_requests, self._num_active_requests)
+            is_injected_error: bool = self._random.random() < self._error_rate
+
+            if is_injected_error:
+                self.num_injected_errors += 1
+
+        try:
+            time.sleep(self._latency_seconds)
+            return self._route_rest_request(method=method, path=path, query_dict=query_dict, body_dict=body_dict,
+                                            is_injected_error=is_injected_error)
+
+        finally:
+            with self._lock:
+                self._num_active_requests -= 1
+
+    def _route_rest_request(self, method: str, path: str, query_dict: dict[str, str], body_dict: dict[str, Any],
+                            is_injected_error: bool) -> tuple[int, Any]:
+
+        if is_injected_error:
+            return self._error_status_code, {"code": self._error_status_code * 100_000,
+                                             "message": "injected error"}
+
+        route_key: tuple[str, str] = (method, path.rstrip("/"))
+
+        if route_key == ("GET", "/v2/account"):
+            return 200, self._get_account_dict()
+        elif route_key == ("GET", "/v2/positions"):
+            return 200, self._get_position_dict_list()
+        elif route_key == ("POST", "/v2/orders"):
+            return self._submit_order(order_request_dict=body_dict)
+        elif route_key == ("GET", "/v2/stocks/bars"):
+            return 200, self._get_bars_response_dict(query_dict=query_dict)
+        elif route_key == ("GET", "/v2/stocks/quotes/latest"):
+            return 200, self._get_latest_quotes_response_dict(query_dict=query_dict)
+
+        return 404, {"code": 40410000, "message": f"{method} {path} is not served by the local Alpaca server"}
+
+    def _get_account_dict(self) -> dict[str, Any]:
+
+        with self._lock:
+            account_dict: dict[str, Any] = self._simulated_trading_portfolio.get_account_dict()
+            long_market_value: float = account_dict["portfolio_value"] - account_dict["cash"]
+
+        return {
+            "id": self._account_id_str,
+            "account_number": "LOCAL0001",
+            "status": "ACTIVE",
+            "currency": "USD",
+            "cash": str(account_dict["cash"]),
+            "buying_power": str(account_dict["buying_power"]),
+            "regt_buying_power": str(account_dict["buying_power"]),
+            "daytrading_buying_power": str(account_dict["daytrading_buying_power"]),
+            "non_marginable_buying_power": str(account_dict["buying_power"]),
+            "equity": str(account_dict["equity"]),
+            "last_equity": str(account_dict["equity"]),
+            "portfolio_value": str(account_dict["portfolio_value"]),
+            "long_market_value": str(long_market_value),
+            "short_market_value": "0",
+            "multiplier": "1",
+            "pattern_day_trader": False,
+            "trading_blocked": False,
+            "transfers_blocked": False,
+            "account_blocked": False,
+            "shorting_enabled": False,
+            "trade_suspended_by_user": False,
+            "daytrade_count": 0,
+        }
+
+    def _get_position_dict_list(self) -> list[dict[str, Any]]:
+
+        with self._lock:
+            current_prices: np.ndarray = self._simulated_trading_portfolio.get_current_prices()
+            previous_close_prices: np.ndarray = self._market_data.previous_session_close_prices[self.current_index]
+            holdings_array: np.ndarray = self._simulated_trading_portfolio.holdings_array.copy()
+            cost_basis_array: np.ndarray = self._simulated_trading_portfolio.cost_basis_array.copy()
+
+        position_dict_list: list[dict[str, Any]] = []
+
+        for ticker_index in np.flatnonzero(holdings_array > 0):
+            ticker_symbol: str = self._market_data.ticker_symbol_list[ticker_index]
+            quantity: float = float(holdings_array[ticker_index])
+            cost_basis: float = float(cost_basis_array[ticker_index])
+            current_price: float = float(current_prices[ticker_index])
+            market_value: float = quantity * current_price
+
+            position_dict_list.append({
+                "asset_id": self._asset_id_dict[ticker_symbol],
+                "symbol": ticker_symbol,
+                "exchange": "NASDAQ",
+                "asset_class": "us_equity",
+                "asset_marginable": True,
+                "avg_entry_price": str(cost_basis / quantity),
+                "qty": str(quantity),
+                "qty_available": str(quantity),
+                "side": "long",
+                "market_value": str(market_value),
+                "cost_basis": str(cost_basis),
+                "unrealized_pl": str(market_value - cost_basis),
+                "unrealized_plpc": str((market_value - cost_basis) / cost_basis if cost_basis else 0.0),
+                "unrealized_intraday_pl": str(market_value - cost_basis),
+                "unrealized_intraday_plpc": str((market_value - cost_basis) / cost_basis if cost_basis else 0.0),
+                "current_price": str(current_price),
+                "lastday_price": str(float(previous_close_prices[ticker_index])),
+                "change_today": str(current_price / float(previous_close_prices[ticker_index]) - 1.0),
+            })
+
+        return position_dict_list
+
+    def _submit_order(self, order_request_dict: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+
+        ticker_symbol: str = order_request_dict.get("symbol", "")
+        ticker_index: int | None = self._ticker_symbol_to_index_dict.get(ticker_symbol)
+
+        if ticker_index is None:
+            return 422, {"code": 42210000, "message": f"asset not found: {ticker_symbol}"}
+
+        if ticker_symbol in self._rejected_symbol_list:
+            return 403, {"code": 40310000, "message": "insufficient buying power"}
+
+        if order_request_dict.get("type", "market") != "market":
+            return 422, {"code": 42210000, "message": "only market orders are served by the local Alpaca server"}
+
+        is_buy: bool = order_request_dict.get("side") == "buy"
+
+        with self._lock:
+            fill_price: float = float(self._simulated_trading_portfolio.get_current_prices()[ticker_index])
+            held_quantity: float = float(self._simulated_trading_portfolio.holdings_array[ticker_index])
+
+            quantity: float = float(order_request_dict["qty"]) if order_request_dict.get("qty") is not None else \
+                float(order_request_dict["notional"]) / fill_price
+
+            if quantity <= 0:
+                return 422, {"code": 42210000, "message": "qty must be > 0"}
+
+            if is_buy and quantity * fill_price > self._simulated_trading_portfolio.cash:
+                return 403, {"code": 40310000, "message": "insufficient buying power"}
+
+            if not is_buy and quantity > held_quantity + 1e-9:
+                return 403, {"code": 40310000, "message": f"insufficient qty available for order "
+                                                          f"(requested: {quantity}, available: {held_quantity})"}
+
+            self._simulated_trading_portfolio.fill_order(ticker_index=ticker_index,
+                                                         quantity=quantity if is_buy else -quantity)
+            position_quantity: float = float(self._simulated_trading_portfolio.holdings_array[ticker_index])
+
+        order_dict: dict[str, Any] = self._get_order_dict(order_request_dict=order_request_dict,
+                                                          ticker_symbol=ticker_symbol, quantity=quantity,
+                                                          fill_price=fill_price)
+
+        if self._stream_loop is not None:
+            trade_update_dict: dict[str, Any] = {
+                "stream": "trade_updates",
+                "data": {
+                    "event": "fill",
+                    "execution_id": str(uuid.uuid4()),
+                    "order": order_dict,
+                    "timestamp": order_dict["filled_at"],
+                    "position_qty": str(position_quantity),
+                    "price": str(fill_price),
+                    "qty": str(quantity),
+                },
+            }
+
+            asyncio.run_coroutine_threadsafe(self._broadcast_trade_update(trade_update_dict=trade_update_dict),
+                                             self._stream_loop)
+
+        return 200, order_dict
+
+    def _get_order_dict(self, order_request_dict: dict[str, Any], ticker_symbol: str, quantity: float,
+                        fill_price: float) -> dict[str, Any]:
+
+        current_datetime_str: str = datetime.now(tz=timezone.utc).isoformat()
+
+        return {
+            "id": str(uuid.uuid4()),
+            "client_order_id": order_request_dict.get("client_order_id") or str(uuid.uuid4()),
+            "created_at": current_datetime_str,
+            "updated_at": current_datetime_str,
+            "submitted_at": current_datetime_str,
+            "filled_at": current_datetime_str,
+            "asset_id": self._asset_id_dict[ticker_symbol],
+            "symbol": ticker_symbol,
+            "asset_class": "us_equity",
+            "qty": str(quantity),
+            "filled_qty": str(quantity),
+            "filled_avg_price": str(fill_price),
+            "order_class": "simple",
+            "order_type": "market",
+            "type": "market",
+            "side": order_request_dict.get("side"),
+            "time_in_force": order_request_dict.get("time_in_force", "day"),
+            "status": "filled",
+            "extended_hours": False,
+        }
+
+    def _get_bars_response_dict(self, query_dict: dict[str, str]) -> dict[str, Any]:
+        """
+        Serves the replayed minute bars whatever timeframe is requested, paged with an offset page token.
+        """
+
+        ticker_index_list: list[int] = self._get_ticker_index_list(query_dict=query_dict)
+        start_index: int = 0
+        end_index: int = self._market_data.num_timesteps
+
+        if query_dict.get("start"):
+            start_index = int(np.searchsorted(self._market_data.timestamps,
+                                              self._get_timestamp_ns(query_dict["start"]), side="left"))
+
+        if query_dict.get("end"):
+            end_index = int(np.searchsorted(self._market_data.timestamps,
+                                            self._get_timestamp_ns(query_dict["end"]), side="right"))
+
+        num_bars_per_symbol: int = max(end_index - start_index, 0)
+        num_bars: int = num_bars_per_symbol * len(ticker_index_list)
+        page_offset: int = int(query_dict.get("page_token") or 0)
+        page_size: int = int(query_dict.get("limit") or 10_000)
+        page_end_offset: int = min(page_offset + page_size, num_bars)
+
+        bars_dict: dict[str, list[dict[str, Any]]] = {}
+
+        # Bars are ordered symbol by symbol, so a page is at most a tail, some whole symbols and a head
+        for bar_offset in range(page_offset, page_end_offset):
+            ticker_index: int = ticker_index_list[bar_offset // num_bars_per_symbol]
+            timestep_index: int = start_index + bar_offset % num_bars_per_symbol
+
+            bars_dict.setdefault(self._market_data.ticker_symbol_list[ticker_index], []).append(
+                self._get_bar_dict(ticker_index=ticker_index, timestep_index=timestep_index, is_rest=True))
+
+        return {"bars": bars_dict,
+                "next_page_token": str(page_end_offset) if page_end_offset < num_bars else None}
+
+    def _get_latest_quotes_response_dict(self, query_dict: dict[str, str]) -> dict[str, Any]:
+
+        with self._lock:
+            current_prices: np.ndarray = self._simulated_trading_portfolio.get_current_prices()
+            timestamp_str: str = pd.Timestamp(int(self._market_data.timestamps[self.current_index]),
+                                              tz="UTC").isoformat()
+
+        quotes_dict: dict[str, dict[str, Any]] = {}
+
+        for ticker_index in self._get_ticker_index_list(query_dict=query_dict):
+            current_price: float = float(current_prices[ticker_index])
+
+            quotes_dict[self._market_data.ticker_symbol_list[ticker_index]] = {
+                "t": timestamp_str, "ax": "V", "ap": current_price, "as": 1, "bx": "V", "bp": current_price, "bs": 1,
+                "c": ["R"], "z": "C",
+            }
+
+        return {"quotes": quotes_dict}
+
+    def _get_ticker_index_list(self, query_dict: dict[str, str]) -> list[int]:
+        return [self._ticker_symbol_to_index_dict[ticker_symbol] for ticker_symbol in
+                query_dict.get("symbols", "").split(",") if ticker_symbol in self._ticker_symbol_to_index_dict]
+
+    def _get_bar_dict(self, ticker_index: int, timestep_index: int, is_rest: bool) -> dict[str, Any]:
+
+        timestamp_ns: int = int(self._market_data.timestamps[timestep_index])
+        close_price: float = float(self._market_data.close_prices[timestep_index, ticker_index])
+
+        return {
+            "t": pd.Timestamp(timestamp_ns, tz="UTC").isoformat() if is_rest else msgpack.Timestamp.from_unix_nano(
+                timestamp_ns),
+            "o": float(self._market_data.open_prices[timestep_index, ticker_index]),
+            "h": float(self._market_data.high_prices[timestep_index, ticker_index]),
+            "l": float(self._market_data.low_prices[timestep_index, ticker_index]),
+            "c": close_price,
+            "v": float(self._market_data.volumes[timestep_index, ticker_index]),
+            "n": 1,
+            "vw": close_price,
+        }
+
+    @staticmethod
+    def _get_timestamp_ns(timestamp_str: str) -> int:
+
+        timestamp: pd.Timestamp = pd.Timestamp(timestamp_str)
+
+        # Alpaca reads timestamps without an offset as UTC
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize("UTC")
+
+        return int(timestamp.as_unit("ns").value)
+
+    async def _run_stream_server(self) -> None:
+
+        self._stream_loop = asyncio.get_running_loop()
+
+        async with websockets.serve(self._handle_stream_connection, self._host, self._stream_port) as stream_server:
+            self._stream_server = stream_server
+            self._stream_server_ready_event.set()
+
+            if self._bar_interval_seconds is None:
+                await stream_server.wait_closed()
+                return
+
+            bar_clock_task: asyncio.Task = asyncio.create_task(self._run_bar_clock())
+
+            await stream_server.wait_closed()
+            bar_clock_task.cancel()
+
+        self._stream_loop = None
+
+    async def _run_bar_clock(self) -> None:
+
+        while True:
+            await asyncio.sleep(self._bar_interval_seconds)
+
+            if not await asyncio.to_thread(self.advance_market):
+                self.logger.info("Replay reached the final bar, the market clock has stopped")
+                return
+
+    async def _handle_stream_connection(self, connection: ServerConnection) -> None:
+
+        if connection.request.path.rstrip("/") == "/stream":
+            await self._handle_trade_update_connection(connection=connection)
+        else:
+            await self._handle_market_data_connection(connection=connection)
+
+    async def _handle_market_data_connection(self, connection: ServerConnection) -> None:
+
+        await connection.send(msgpack.packb([{"T": "success", "msg": "connected"}]))
+
+        try:
+            async for message in connection:
+                message_dict: dict[str, Any] = msgpack.unpackb(message)
+                action_str: str = message_dict.get("action", "")
+
+                if action_str == "auth":
+                    await connection.send(msgpack.packb([{"T": "success", "msg": "authenticated"}]))
+
+                elif action_str in ("subscribe", "unsubscribe"):
+                    subscribed_symbol_set: set[str] = self._data_connection_symbol_dict.setdefault(connection, set())
+                    requested_symbol_set: set[str] = set(message_dict.get("bars", []))
+
+                    if action_str == "subscribe":
+                        subscribed_symbol_set |= requested_symbol_set
+                    else:
+                        subscribed_symbol_set -= requested_symbol_set
+
+                    await connection.send(msgpack.packb([{"T": "subscription", "trades": [], "quotes": [],
+                                                          "bars": sorted(subscribed_symbol_set)}]))
+
+        except websockets.ConnectionClosed:
+            pass
+
+        finally:
+            self._data_connection_symbol_dict.pop(connection, None)
+
+    async def _handle_trade_update_connection(self, connection: ServerConnection) -> None:
+
+        try:
+            async for message in connection:
+                message_dict: dict[str, Any] = json.loads(message)
+                action_str: str = message_dict.get("action", "")
+
+                if action_str in ("auth", "authenticate"):
+                    await connection.send(json.dumps({"stream": "authorization",
+                                                      "data": {"status": "authorized", "action": "authenticate"}}))
+
+                elif action_str == "listen":
+                    self._trade_update_connection_set.add(connection)
+                    await connection.send(json.dumps({"stream": "listening",
+                                                      "data": {"streams": ["trade_updates"]}}))
+
+        except websockets.ConnectionClosed:
+            pass
+
+        finally:
+            self._trade_update_connection_set.discard(connection)
+
+    async def _broadcast_bars(self) -> None:
+
+        timestep_index: int = self.current_index
+
+        for connection, subscribed_symbol_set in list(self._data_connection_symbol_dict.items()):
+            bar_dict_list: list[dict[str, Any]] = [
+                {"T": "b", "S": ticker_symbol, **self._get_bar_dict(ticker_index=ticker_index,
+                                                                    timestep_index=timestep_index, is_rest=False)}
+                for ticker_symbol, ticker_index in self._ticker_symbol_to_index_dict.items()
+                if ticker_symbol in subscribed_symbol_set or "*" in subscribed_symbol_set
+            ]
+
+            if bar_dict_list:
+                await self._send_quietly(connection=connection, message=msgpack.packb(bar_dict_list))
+
+    async def _broadcast_trade_update(self, trade_update_dict: dict[str, Any]) -> None:
+
+        trade_update_message: str = json.dumps(trade_update_dict)
+
+        for connection in list(self._trade_update_connection_set):
+            await self._send_quietly(connection=connection, message=trade_update_message)
+
+    @staticmethod
+    async def _send_quietly(connection: ServerConnection, message: str | bytes) -> None:
+        try:
+            await connection.send(message)
+        except websockets.ConnectionClosed:
+            pass
+
+    def _get_request_handler_class(self) -> type[BaseHTTPRequestHandler]:
+
+        local_alpaca_server: LocalAlpacaServer = self
+
+        class LocalAlpacaRequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                self._handle_request(method="GET")
+
+            def do_POST(self) -> None:
+                self._handle_request(method="POST")
+
+            def _handle_request(self, method: str) -> None:
+
+                parsed_url = urlparse(self.path)
+                query_dict: dict[str, str] = {key: value_list[-1] for key, value_list in
+                                              parse_qs(parsed_url.query).items()}
+
+                content_length: int = int(self.headers.get("Content-Length", 0))
+                body_dict: dict[str, Any] = json.loads(self.rfile.read(content_length)) if content_length else {}
+
+                status_code, response_object = local_alpaca_server._handle_rest_request(
+                    method=method, path=parsed_url.path, query_dict=query_dict, body_dict=body_dict)
+
+                response_body: bytes = json.dumps(response_object).encode("utf-8")
+
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(response_body)))
+                self.end_headers()
+                self.wfile.write(response_body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return LocalAlpacaRequestHandler
+
+
+if __name__ == "__main__":
+    local_alpaca_server: LocalAlpacaServer = LocalAlpacaServer.from_historical_data_directory(
+        data_directory_path=Path("historical_stock_data/"), rest_port=8765, stream_port=8766)
+
+    with local_alpaca_server:
+        local_alpaca_server.logger.info(f"export ALPACA_URL_OVERRIDE={local_alpaca_server.rest_url}")
+        local_alpaca_server.logger.info(f"export ALPACA_STREAM_URL_OVERRIDE={local_alpaca_server.stream_url}")
+        threading.Event().wait()
@@ -1,33 +1,54 @@
 import asyncio
 from logging import Logger
 
+from config.config import settings
 from logger.logger import AppLogger
+from market_data.market_data_stream_service import MarketDataStreamService
 from models.alpaca_trading_environment_ppo import AlpacaTradingEnvironmentPPO
 from models.alpaca_trading_environment_random_policy import AlpacaTradingEnvironmentRandomPolicy
 from models.alpaca_trading_ppo_neural_network import AlpacaTradingPPONeuralNetwork
 from models.ppo_config import PPOConfig
+from tracing.latency_tracer import LatencyTracer
+from utils.alpaca_client_factory import AlpacaClientFactory
 
 
 async def main() -> int:
     logger: Logger = AppLogger().get_logger(__name__)
 
+    latency_tracer: LatencyTracer = LatencyTracer.get_tracer()
+    latency_tracer.start()
+
+    market_data_stream_service: MarketDataStreamService = MarketDataStreamService(
+        data_stream=AlpacaClientFactory.get_stock_data_stream(api_key=settings.api_key_random,
+                                                              secret_key=settings.api_secret_key_random))
+    environment: AlpacaTradingEnvironmentPPO | None = None
+
     try:
 
-        alpaca_trading_env_random_policy: AlpacaTradingEnvironmentRandomPolicy = AlpacaTradingEnvironmentRandomPolicy()
+        alpaca_trading_env_random_policy: AlpacaTradingEnvironmentRandomPolicy = AlpacaTradingEnvironmentRandomPolicy(
+            market_data_stream_service=market_data_stream_service)
 
         await alpaca_trading_env_random_policy.initialize_trading_environment_random_policy()
 
         ppo_config: PPOConfig = PPOConfig()
-        environment = AlpacaTradingEnvironmentPPO(config=ppo_config)
+        environment = AlpacaTradingEnvironmentPPO(config=ppo_config,
+                                                  market_data_stream_service=market_data_stream_service)
         alpaca_trading_ppo_neural_network: AlpacaTradingPPONeuralNetwork = AlpacaTradingPPONeuralNetwork(
             env=environment, config=ppo_config)
 
-        alpaca_trading_ppo_neural_network.train_model()
+        await asyncio.to_thread(alpaca_trading_ppo_neural_network.train_model)
 
 
     except Exception as e:
         logger.info(f"Exception Thrown: {e}")
 
+    finally:
+        if environment is not None:
+            environment.close()
+
+        market_data_stream_service.stop()
+        latency_tracer.stop()
+
     return 0
 
 
@@ -0,0 +1,92 @@
+import struct
+
+import numpy as np
+import torch
+from alpaca.data.models.bars import Bar
+from torch import Tensor
+
+
+class BarRingBuffer:
+    """
+    Recent minute bars as numbers, one preallocated float64 array per symbol with a row per bar and a column per
+    field. Every bar is packed into bytes once and copied into its slot and capacity rows further down, so the last k
+    bars are always one contiguous slice and windows are returned as views without copying.
+
+    Views share memory with the buffer: a later append can overwrite rows of a view once capacity - k more bars
+    have arrived, so copy a window that has to outlive that.
+    """
+
+    FIELD_LIST: list[str] = ["timestamp", "open", "high", "low", "close", "volume", "trade_count", "vwap"]
+    ROW_STRUCT: struct.Struct = struct.Struct(f"={len(FIELD_LIST)}d")
+
+    def __init__(self, symbol_list: list[str], capacity: int = 5_000) -> None:
+
+        if capacity < 1:
+            raise ValueError(f"Bar ring buffer capacity must be positive, got {capacity}")
+
+        self._capacity: int = capacity
+        self._field_index_dict: dict[str, int] = {field: field_index for field_index, field in
+                                                  enumerate(self.FIELD_LIST)}
+        self._bar_array_dict: dict[str, np.ndarray] = {
+            symbol: np.zeros((2 * capacity, len(self.FIELD_LIST)), dtype=np.float64) for symbol in symbol_list}
+        # Byte views of the same arrays, copying packed bytes in is about twice as fast as two tuple row assignments
+        self._bar_bytes_view_dict: dict[str, memoryview] = {
+            symbol: memoryview(bar_array).cast("B") for symbol, bar_array in self._bar_array_dict.items()}
+        self._mirror_byte_offset: int = capacity * self.ROW_STRUCT.size
+        # Total bars ever appended per symbol, only ever increases
+        self._num_appended_dict: dict[str, int] = {symbol: 0 for symbol in symbol_list}
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def nbytes(self) -> int:
+        return sum(bar_array.nbytes for bar_array in self._bar_array_dict.values())
+
+    def get_num_appended(self, symbol: str) -> int:
+        return self._num_appended_dict[symbol]
+
+    def get_num_bars(self, symbol: str) -> int:
+        return min(self._num_appended_dict[symbol], self._capacity)
+
+    def append(self, symbol: str, timestamp: float, open_price: float, high_price: float, low_price: float,
+               close_price: float, volume: float, trade_count: float = 0.0, vwap: float = np.nan) -> None:
+        self._append_row(symbol, (timestamp, open_price, high_price, low_price, close_price, volume, trade_count, vwap))
+
+    def append_bar(self, bar: Bar) -> None:
+        self._append_row(bar.symbol, (bar.timestamp.timestamp(), bar.open, bar.high, bar.low, bar.close, bar.volume,
+                                      bar.trade_count if bar.trade_count is not None else 0.0,
+                                      bar.vwap if bar.vwap is not None else np.nan))
+
+    def _append_row(self, symbol: str, bar_row: tuple[float, ...]) -> None:
+
+        num_appended: int = self._num_appended_dict[symbol]
+        row_bytes: bytes = self.ROW_STRUCT.pack(*bar_row)
+        row_byte_offset: int = num_appended % self._capacity * self.ROW_STRUCT.size
+        mirror_byte_offset: int = row_byte_offset + self._mirror_byte_offset
+        bar_bytes_view: memoryview = self._bar_bytes_view_dict[symbol]
+
+        bar_bytes_view[row_byte_offset:row_byte_offset + self.ROW_STRUCT.size] = row_bytes
+        bar_bytes_view[mirror_byte_offset:mirror_byte_offset + self.ROW_STRUCT.size] = row_bytes
+
+        # Published after the row so a reader on another thread never sees a half written bar in its window
+        self._num_appended_dict[symbol] = num_appended + 1
+
+    def get_window(self, symbol: str, num_bars: int) -> np.ndarray:
+        """
+        The last num_bars bars, oldest first, as a [num_bars, len(FIELD_LIST)] view. Fewer rows are returned while
+        the buffer is still filling.
+        """
+
+        num_appended: int = self._num_appended_dict[symbol]
+        num_window_bars: int = min(num_bars, num_appended, self._capacity)
+        window_end_index: int = (num_appended - 1) % self._capacity + self._capacity + 1
+
+        return self._bar_array_dict[symbol][window_end_index - num_window_bars:window_end_index]
+
+    def get_field_window(self, symbol: str, field: str, num_bars: int) -> np.ndarray:
+        return self.get_window(symbol=symbol, num_bars=num_bars)[:, self._field_index_dict[field]]
+
+    def get_window_tensor(self, symbol: str, num_bars: int) -> Tensor:
+        return torch.from_numpy(self.get_window(symbol=symbol, num_bars=num_bars))
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Callable
+
+import numpy as np
+from alpaca.data.models.bars import Bar
+
+
+class FakeStockDataStream:
+    """
+    Offline stand-in for StockDataStream that emits synthetic minute bars for every subscribed symbol on a fixed
+    wall-clock interval, through the same subscribe_bars / run / stop surface.
+    """
+
+    def __init__(self, bar_interval_seconds: float = 1.0, seed: int = 0) -> None:
+        self._bar_interval_seconds: float = bar_interval_seconds
+        self._random_generator: np.random.Generator = np.random.default_rng(seed)
+        self._bar_handler: Callable | None = None
+        self._symbol_list: list[str] = []
+        self._close_price_dict: dict[str, float] = {}
+        self._stop_event: threading.Event = threading.Event()
+
+        self.num_connections: int = 0
+
+    def subscribe_bars(self, handler: Callable, *symbols: str) -> None:
+        self._bar_handler = handler
+        self._symbol_list.extend(symbol for symbol in symbols if symbol not in self._symbol_list)
+        self._close_price_dict.update({symbol: 100.0 for symbol in symbols if symbol not in self._close_price_dict})
+
+    def run(self) -> None:
+        self.num_connections += 1
+        self._stop_event.clear()
+        asyncio.run(self._run_forever())
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    async def _run_forever(self) -> None:
+
+        while not self._stop_event.is_set():
+
+            for symbol in self._symbol_list:
+                await self._bar_handler(self._get_synthetic_bar(symbol=symbol))
+
+            await asyncio.sleep(self._bar_interval_seconds)
+
+    def _get_synthetic_bar(self, symbol: str) -> Bar:
+
+        open_price: float = self._close_price_dict[symbol]
+        close_price: float = open_price * float(np.exp(self._random_generator.normal(scale=1e-3)))
+        self._close_price_dict[symbol] = close_price
+
+        raw_bar_dict: dict = {
+            "t": datetime.now(tz=timezone.utc),
+            "o": open_price,
+            "h": max(open_price, close_price) * 1.0005,
+            "l": min(open_price, close_price) * 0.9995,
+            "c": close_price,
+            "v": float(self._random_generator.integers(low=100, high=10_000)),
+            "n": 1,
+            "vw": (open_price + close_price) / 2.0,
+        }
+
+        return Bar(symbol, raw_bar_dict)
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable
+
+import numpy as np
+from alpaca.data.live import StockDataStream
+from alpaca.data.models.bars import Bar
+
+from logger.logger import AppLogger
+from market_data.bar_ring_buffer import BarRingBuffer
+from utils.constants import Constants
+
+
+class MarketDataSubscription:
+    """
+    Per-consumer view of the bar stream, delivered into the consumer's own event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue_size: int) -> None:
+        self._loop: asyncio.AbstractEventLoop = loop
+        self._bar_queue: asyncio.Queue[Bar] = asyncio.Queue(maxsize=max_queue_size)
+
+    async def get(self) -> Bar:
+        return await self._bar_queue.get()
+
+    def __aiter__(self) -> "MarketDataSubscription":
+        return self
+
+    async def __anext__(self) -> Bar:
+        return await self.get()
+
+    @property
+    def is_closed(self) -> bool:
+        return self._loop.is_closed()
+
+    def publish_threadsafe(self, bar: Bar) -> None:
+        self._loop.call_soon_threadsafe(self._put_bar, bar)
+
+    def _put_bar(self, bar: Bar) -> None:
+
+        # A slow consumer drops its oldest bar rather than stalling the stream for everyone else
+        if self._bar_queue.full():
+            self._bar_queue.get_nowait()
+
+        self._bar_queue.put_nowait(bar)
+
+
+class MarketDataStreamService:
+    """
+    Owns a single long-lived market data websocket, keeps the latest bar and a ring buffer of recent bars per
+    symbol and fans updates out to any number of in-process consumers.
+    """
+
+    def __init__(self, data_stream: StockDataStream,
+                 ticker_symbol_list: list[str] | None = None, bar_history_capacity: int = 5_000) -> None:
+        self._data_stream: StockDataStream = data_stream
+        self._ticker_symbol_list: list[str] = ticker_symbol_list or Constants.TICKER_SYMBOL_LIST
+        self._latest_bar_dict: dict[str, Bar] = {}
+        self._bar_ring_buffer: BarRingBuffer = BarRingBuffer(symbol_list=self._ticker_symbol_list,
+                                                             capacity=bar_history_capacity)
+        self._bar_handler_list: list[Callable[[Bar], Awaitable[None]]] = []
+        self._subscription_list: list[MarketDataSubscription] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._first_bar_event: threading.Event = threading.Event()
+        self._stream_thread: threading.Thread | None = None
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    @property
+    def is_running(self) -> bool:
+        return self._stream_thread is not None and self._stream_thread.is_alive()
+
+    def start(self) -> None:
+
+        with self._lock:
+            if self.is_running:
+                return
+
+            self._data_stream.subscribe_bars(self._handle_bar, *self._ticker_symbol_list)
+
+            self._stream_thread = threading.Thread(target=self._data_stream.run, name="MarketDataStreamService",
+                                                   daemon=True)
+            self._stream_thread.start()
+
+        self.logger.info(f"Market data stream started for {len(self._ticker_symbol_list)} symbols")
+
+    def stop(self) -> None:
+
+        if not self.is_running:
+            return
+
+        self._data_stream.stop()
+        self._stream_thread.join(timeout=10)
+        self._stream_thread = None
+
+        self.logger.info("Market data stream stopped")
+
+    def add_bar_handler(self, bar_handler: Callable[[Bar], Awaitable[None]]) -> None:
+        with self._lock:
+            self._bar_handler_list.append(bar_handler)
+
+    def subscribe(self, max_queue_size: int = 1_000) -> MarketDataSubscription:
+
+        subscription: MarketDataSubscription = MarketDataSubscription(loop=asyncio.get_running_loop(),
+                                                                      max_queue_size=max_queue_size)
+
+        with self._lock:
+            self._subscription_list.append(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: MarketDataSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscription_list:
+                self._subscription_list.remove(subscription)
+
+    def get_latest_bar(self, symbol: str) -> Bar | None:
+        return self._latest_bar_dict.get(symbol)
+
+    def get_latest_bar_dict(self) -> dict[str, Bar]:
+        return dict(self._latest_bar_dict)
+
+    def get_bar_window(self, symbol: str, num_bars: int) -> np.ndarray:
+        return self._bar_ring_buffer.get_window(symbol=symbol, num_bars=num_bars)
+
+    @property
+    def bar_ring_buffer(self) -> BarRingBuffer:
+        return self._bar_ring_buffer
+
+    def wait_for_first_bar(self, timeout_seconds: float | None = None) -> bool:
+        return self._first_bar_event.wait(timeout=timeout_seconds)
+
+    async def _handle_bar(self, bar: Bar) -> None:
+
+        self._bar_ring_buffer.append_bar(bar=bar)
+        self._latest_bar_dict[bar.symbol] = bar
+        self._first_bar_event.set()
+
+        with self._lock:
+            bar_handler_list: list[Callable[[Bar], Awaitable[None]]] = list(self._bar_handler_list)
+            subscription_list: list[MarketDataSubscription] = list(self._subscription_list)
+
+        for subscription in subscription_list:
+            if subscription.is_closed:
+                self.unsubscribe(subscription=subscription)
+                continue
+
+            subscription.publish_threadsafe(bar)
+
+        for bar_handler in bar_handler_list:
+            try:
+                await bar_handler(bar)
+
+            except Exception as e:
+                self.logger.warning(f"Exception Thrown: {e}")
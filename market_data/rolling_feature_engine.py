@@ -0,0 +1,262 @@
+import threading
+
+import numpy as np
+
+from data_extraction.historical_stock_data_loader import HistoricalMarketData
+
+
+class RollingFeatureEngine:
+    """
+    Per-symbol price dynamics over minute bars, updated in O(1) per bar from ring buffers, running sums and
+    sliding-window Welford moments. For every window it keeps the return, the volatility of one-bar returns, the
+    deviation of the close from the typical-price VWAP and the volume z-score, plus the crosses of consecutive
+    window EMAs. State starts over at each trading session.
+
+    Live bars and historical arrays go through the same update, which only uses arithmetic and square roots, so
+    a session replayed offline yields bit-for-bit the features the live stream produced for the same bars.
+    """
+
+    FEATURE_NAME_FORMAT_LIST: list[str] = ["return_{}", "volatility_{}", "vwap_deviation_{}", "volume_zscore_{}"]
+    VOLUME_ZSCORE_LIMIT: float = 10.0
+
+    def __init__(self, num_symbols: int, window_size_tuple: tuple[int, ...] = (5, 15, 60)) -> None:
+
+        if any(window_size < 1 for window_size in window_size_tuple) or len(set(window_size_tuple)) != len(
+                window_size_tuple):
+            raise ValueError(f"Rolling feature windows must be distinct positive bar counts, got {window_size_tuple}")
+
+        self._num_symbols: int = num_symbols
+        self._window_size_tuple: tuple[int, ...] = tuple(sorted(window_size_tuple))
+        self._num_windows: int = len(self._window_size_tuple)
+        # Column vectors so every window updates in the same array operation
+        self._window_size_array: np.ndarray = np.array(self._window_size_tuple, dtype=np.int64).reshape(-1, 1)
+        self._ema_alpha_array: np.ndarray = 2.0 / (self._window_size_array + 1.0)
+        # One slot more than the longest window so the value leaving it is still buffered
+        self._ring_size: int = max(self._window_size_tuple, default=0) + 1
+        self._lock: threading.Lock = threading.Lock()
+
+        self._close_ring_array: np.ndarray = np.zeros((self._ring_size, num_symbols), dtype=np.float64)
+        self._return_ring_array: np.ndarray = np.zeros((self._ring_size, num_symbols), dtype=np.float64)
+        self._volume_ring_array: np.ndarray = np.zeros((self._ring_size, num_symbols), dtype=np.float64)
+        self._notional_ring_array: np.ndarray = np.zeros((self._ring_size, num_symbols), dtype=np.float64)
+        self._num_bars_array: np.ndarray = np.zeros(num_symbols, dtype=np.int64)
+        self._session_id_array: np.ndarray = np.full(num_symbols, -1, dtype=np.int64)
+
+        window_state_shape: tuple[int, int] = (self._num_windows, num_symbols)
+        self._return_mean_array: np.ndarray = np.zeros(window_state_shape, dtype=np.float64)
+        self._return_m2_array: np.ndarray = np.zeros(window_state_shape, dtype=np.float64)
+        self._volume_mean_array: np.ndarray = np.zeros(window_state_shape, dtype=np.float64)
+        self._volume_m2_array: np.ndarray = np.zeros(window_state_shape, dtype=np.float64)
+        self._notional_sum_array: np.ndarray = np.zeros(window_state_shape, dtype=np.float64)
+        self._volume_sum_array: np.ndarray = np.zeros(window_state_shape, dtype=np.float64)
+        self._ema_array: np.ndarray = np.zeros(window_state_shape, dtype=np.float64)
+
+        self._feature_array: np.ndarray = np.zeros((num_symbols, self.num_features_per_symbol), dtype=np.float64)
+
+    @property
+    def num_features_per_symbol(self) -> int:
+        return len(self.FEATURE_NAME_FORMAT_LIST) * self._num_windows + max(self._num_windows - 1, 0)
+
+    @property
+    def num_features(self) -> int:
+        return self._num_symbols * self.num_features_per_symbol
+
+    @property
+    def feature_name_list(self) -> list[str]:
+
+        feature_name_list: list[str] = [feature_name_format.format(window_size)
+                                        for window_size in self._window_size_tuple
+                                        for feature_name_format in self.FEATURE_NAME_FORMAT_LIST]
+
+        return feature_name_list + [f"ema_cross_{short_window_size}_{long_window_size}" for
+                                    short_window_size, long_window_size in
+                                    zip(self._window_size_tuple, self._window_size_tuple[1:])]
+
+    def reset(self, symbol_index_array: np.ndarray | None = None) -> None:
+
+        symbol_index_array = np.arange(self._num_symbols) if symbol_index_array is None else symbol_index_array
+
+        self._num_bars_array[symbol_index_array] = 0
+
+        for window_state_array in (self._return_mean_array, self._return_m2_array, self._volume_mean_array,
+                                   self._volume_m2_array, self._notional_sum_array, self._volume_sum_array,
+                                   self._ema_array):
+            window_state_array[:, symbol_index_array] = 0.0
+
+        self._feature_array[symbol_index_array] = 0.0
+
+    def update(self, close_array: np.ndarray, volume_array: np.ndarray, typical_price_array: np.ndarray,
+               symbol_index_array: np.ndarray | None = None) -> np.ndarray:
+        """
+        Folds one bar per listed symbol into the rolling state, every symbol when none are listed, and returns the
+        [num_symbols, num_features_per_symbol] feature array.
+        """
+
+        symbol_index_array = np.arange(self._num_symbols) if symbol_index_array is None else symbol_index_array
+        ring_size: int = self._ring_size
+        window_size_array: np.ndarray = self._window_size_array
+
+        num_bars_array: np.ndarray = self._num_bars_array[symbol_index_array] + 1
+        ring_slot_array: np.ndarray = num_bars_array % ring_size
+        previous_close_array: np.ndarray = self._close_ring_array[(num_bars_array - 1) % ring_size,
+                                                                  symbol_index_array]
+
+        has_previous_bar_array: np.ndarray = num_bars_array > 1
+        one_bar_return_array: np.ndarray = np.divide(close_array, previous_close_array,
+                                                     out=np.ones_like(close_array),
+                                                     where=has_previous_bar_array & (previous_close_array > 0)) - 1.0
+        notional_array: np.ndarray = typical_price_array * volume_array
+
+        self._close_ring_array[ring_slot_array, symbol_index_array] = close_array
+        self._return_ring_array[ring_slot_array, symbol_index_array] = one_bar_return_array
+        self._volume_ring_array[ring_slot_array, symbol_index_array] = volume_array
+        self._notional_ring_array[ring_slot_array, symbol_index_array] = notional_array
+        self._num_bars_array[symbol_index_array] = num_bars_array
+
+        # Bars and one-bar returns currently inside each window, and the ones that just left it
+        num_window_bars_array: np.ndarray = np.minimum(num_bars_array, window_size_array)
+        num_window_returns_array: np.ndarray = np.minimum(num_bars_array - 1, window_size_array)
+        leaving_slot_array: np.ndarray = (num_bars_array - window_size_array) % ring_size
+        has_leaving_bar_array: np.ndarray = num_bars_array > window_size_array
+        has_leaving_return_array: np.ndarray = num_bars_array > window_size_array + 1
+
+        return_mean_array, return_m2_array = self._get_welford_moments(
+            mean_array=self._return_mean_array[:, symbol_index_array],
+            m2_array=self._return_m2_array[:, symbol_index_array],
+            entering_array=one_bar_return_array,
+            leaving_array=self._return_ring_array[leaving_slot_array, symbol_index_array],
+            is_entering_array=np.broadcast_to(has_previous_bar_array, num_window_returns_array.shape),
+            is_leaving_array=has_leaving_return_array,
+            num_values_array=num_window_returns_array)
+        self._return_mean_array[:, symbol_index_array] = return_mean_array
+        self._return_m2_array[:, symbol_index_array] = return_m2_array
+
+        volume_mean_array, volume_m2_array = self._get_welford_moments(
+            mean_array=self._volume_mean_array[:, symbol_index_array],
+            m2_array=self._volume_m2_array[:, symbol_index_array],
+            entering_array=volume_array,
+            leaving_array=self._volume_ring_array[leaving_slot_array, symbol_index_array],
+            is_entering_array=np.ones(num_window_bars_array.shape, dtype=bool),
+            is_leaving_array=has_leaving_bar_array,
+            num_values_array=num_window_bars_array)
+        self._volume_mean_array[:, symbol_index_array] = volume_mean_array
+        self._volume_m2_array[:, symbol_index_array] = volume_m2_array
+
+        notional_sum_array: np.ndarray = self._notional_sum_array[:, symbol_index_array] + notional_array - np.where(
+            has_leaving_bar_array, self._notional_ring_array[leaving_slot_array, symbol_index_array], 0.0)
+        volume_sum_array: np.ndarray = self._volume_sum_array[:, symbol_index_array] + volume_array - np.where(
+            has_leaving_bar_array, self._volume_ring_array[leaving_slot_array, symbol_index_array], 0.0)
+        self._notional_sum_array[:, symbol_index_array] = notional_sum_array
+        self._volume_sum_array[:, symbol_index_array] = volume_sum_array
+
+        ema_array: np.ndarray = np.where(num_bars_array == 1, close_array, self._ema_array[:, symbol_index_array] +
+                                         self._ema_alpha_array * (close_array - self._ema_array[:, symbol_index_array]))
+        self._ema_array[:, symbol_index_array] = ema_array
+
+        window_start_close_array: np.ndarray = self._close_ring_array[
+            (num_bars_array - num_window_returns_array) % ring_size, symbol_index_array]
+        window_return_array: np.ndarray = close_array / window_start_close_array - 1.0
+
+        return_variance_array: np.ndarray = np.divide(return_m2_array, num_window_returns_array,
+                                                      out=np.zeros_like(return_m2_array),
+                                                      where=num_window_returns_array > 0)
+        volatility_array: np.ndarray = np.sqrt(np.maximum(return_variance_array, 0.0))
+
+        vwap_deviation_array: np.ndarray = np.divide(close_array * volume_sum_array, notional_sum_array,
+                                                     out=np.ones_like(notional_sum_array),
+                                                     where=(volume_sum_array > 0) & (notional_sum_array > 0)) - 1.0
+
+        volume_std_array: np.ndarray = np.sqrt(np.maximum(volume_m2_array / num_window_bars_array, 0.0))
+        volume_zscore_array: np.ndarray = np.clip(
+            np.divide(volume_array - volume_mean_array, volume_std_array, out=np.zeros_like(volume_std_array),
+                      where=volume_std_array > 0), -self.VOLUME_ZSCORE_LIMIT, self.VOLUME_ZSCORE_LIMIT)
+
+        ema_cross_array: np.ndarray = ema_array[:-1] / ema_array[1:] - 1.0
+
+        # [window, feature, symbol] flattened to the window-major order of feature_name_list
+        window_feature_array: np.ndarray = np.stack(
+            [window_return_array, volatility_array, vwap_deviation_array, volume_zscore_array], axis=1)
+        self._feature_array[symbol_index_array] = np.concatenate(
+            [window_feature_array.reshape(-1, len(symbol_index_array)), ema_cross_array], axis=0).T
+
+        return self._feature_array
+
+    def update_bar(self, symbol_index: int, close: float, high: float, low: float, volume: float,
+                   session_id: int) -> None:
+        """
+        Live entry point for one streamed bar. A new session_id, e.g. the exchange date, starts the symbol over.
+        """
+
+        symbol_index_array: np.ndarray = np.array([symbol_index])
+        close_array: np.ndarray = np.array([close], dtype=np.float64)
+
+        with self._lock:
+            if self._session_id_array[symbol_index] != session_id:
+                self.reset(symbol_index_array=symbol_index_array)
+                self._session_id_array[symbol_index] = session_id
+
+            self.update(close_array=close_array, volume_array=np.array([volume], dtype=np.float64),
+                        typical_price_array=self._get_typical_price_array(
+                            high_array=np.array([high], dtype=np.float64), low_array=np.array([low], dtype=np.float64),
+                            close_array=close_array),
+                        symbol_index_array=symbol_index_array)
+
+    def get_feature_array(self) -> np.ndarray:
+        with self._lock:
+            return self._feature_array.copy()
+
+    def get_historical_feature_array(self, market_data: HistoricalMarketData) -> np.ndarray:
+        """
+        Replays every session of the historical arrays through update and returns the features after each bar,
+        shaped [num_timesteps, num_tickers, num_features_per_symbol].
+        """
+
+        historical_feature_array: np.ndarray = np.zeros(
+            (market_data.num_timesteps, market_data.num_tickers, self.num_features_per_symbol), dtype=np.float64)
+        typical_price_array: np.ndarray = self._get_typical_price_array(high_array=market_data.high_prices,
+                                                                        low_array=market_data.low_prices,
+                                                                        close_array=market_data.close_prices)
+
+        with self._lock:
+            for session_start_index, session_end_index in market_data.get_session_bounds_list():
+                self.reset()
+
+                for timestep_index in range(session_start_index, session_end_index):
+                    historical_feature_array[timestep_index] = self.update(
+                        close_array=market_data.close_prices[timestep_index],
+                        volume_array=market_data.volumes[timestep_index],
+                        typical_price_array=typical_price_array[timestep_index])
+
+        return historical_feature_array
+
+    @staticmethod
+    def _get_typical_price_array(high_array: np.ndarray, low_array: np.ndarray, close_array: np.ndarray) -> np.ndarray:
+        # Historical bars carry no VWAP, so both paths weight volume by the typical price instead
+        return (high_array + low_array + close_array) / 3.0
+
+    @staticmethod
+    def _get_welford_moments(mean_array: np.ndarray, m2_array: np.ndarray, entering_array: np.ndarray,
+                             leaving_array: np.ndarray, is_entering_array: np.ndarray, is_leaving_array: np.ndarray,
+                             num_values_array: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Sliding-window Welford step: a value joins a window that is still filling, or replaces the oldest value of
+        a full one. num_values_array counts the window after the step.
+        """
+
+        safe_num_values_array: np.ndarray = np.maximum(num_values_array, 1)
+
+        growing_delta_array: np.ndarray = entering_array - mean_array
+        growing_mean_array: np.ndarray = mean_array + growing_delta_array / safe_num_values_array
+        growing_m2_array: np.ndarray = m2_array + growing_delta_array * (entering_array - growing_mean_array)
+
+        sliding_delta_array: np.ndarray = entering_array - leaving_array
+        sliding_mean_array: np.ndarray = mean_array + sliding_delta_array / safe_num_values_array
+        sliding_m2_array: np.ndarray = m2_array + sliding_delta_array * (
+                entering_array - sliding_mean_array + leaving_array - mean_array)
+
+        next_mean_array: np.ndarray = np.where(is_leaving_array, sliding_mean_array,
+                                               np.where(is_entering_array, growing_mean_array, mean_array))
+        next_m2_array: np.ndarray = np.where(is_leaving_array, sliding_m2_array,
+                                             np.where(is_entering_array, growing_m2_array, m2_array))
+
+        return next_mean_array, next_m2_array
@@ -1,7 +1,4 @@
 import asyncio
-import queue
-from asyncio import Task
-from collections import deque
 from datetime import datetime, time
 from pathlib import Path
 from typing import Any
@@ -9,7 +6,8 @@ from zoneinfo import ZoneInfo
 
 import numpy as np
 import torch
-from alpaca.data.live import StockDataStream
+from alpaca.data.models.bars import Bar
+from alpaca.trading import Position
 from alpaca.trading.client import TradingClient
 from tensordict import TensorDict, TensorDictBase
 from torch import multiprocessing, Tensor
@@ -17,9 +15,17 @@ from torchrl.data import Composite, UnboundedContinuous, Bounded
 from torchrl.envs import EnvBase
 
 from config.config import settings
+from data_extraction.historical_stock_data_loader import HistoricalStockDataLoader, HistoricalMarketData
 from logger.logger import AppLogger
+from market_data.market_data_stream_service import MarketDataStreamService
+from market_data.rolling_feature_engine import RollingFeatureEngine
 from models.ppo_config import PPOConfig
+from tracing.latency_tracer import LatencyTracer
 from trading_account.alpaca_trading_portfolio import AlpacaTradingPortfolio
+from trading_account.portfolio_state_cache import PortfolioStateCache
+from trading_account.simulated_trading_portfolio import SimulatedTradingPortfolio
+from trading_account.target_weight_rebalancer import TargetWeightRebalancer
+from utils.alpaca_client_factory import AlpacaClientFactory
 from utils.constants import Constants
 from utils.trading_activity_csv_writer import TradingActivityCsvWriter
 
@@ -27,7 +33,7 @@ from utils.trading_activity_csv_writer import TradingActivityCsvWriter
 # TODO: Use unsloth
 class AlpacaTradingEnvironmentPPO(EnvBase):
 
-    def __init__(self, config: PPOConfig) -> None:
+    def __init__(self, config: PPOConfig, market_data_stream_service: MarketDataStreamService | None = None) -> None:
         super().__init__()
 
         self._step_count: int = 0
@@ -36,7 +42,12 @@ class AlpacaTradingEnvironmentPPO(EnvBase):
         self._dtype = torch.float32
         self._device: torch.device = self._get_processing_device()
 
-        self._observation_dim: int = config.observation_dimension
+        self._rolling_feature_engine: RollingFeatureEngine = RollingFeatureEngine(
+            num_symbols=len(Constants.TICKER_SYMBOL_LIST), window_size_tuple=config.rolling_feature_window_tuple)
+        self._symbol_index_dict: dict[str, int] = {ticker_symbol: ticker_index for ticker_index, ticker_symbol in
+                                                   enumerate(Constants.TICKER_SYMBOL_LIST)}
+
+        self._observation_dim: int = config.observation_dimension + self._rolling_feature_engine.num_features
         self._action_dimension: int = config.action_dimension
 
         self._current_weights_tensor: Tensor = torch.zeros(self._action_dimension, dtype=self._dtype,
@@ -93,9 +104,6 @@ class AlpacaTradingEnvironmentPPO(EnvBase):
 
         self._base_directory: Path = Path.cwd()
         self._api_key_ppo: str = settings.api_key_ppo
-        self._bar_queue: queue.Queue[dict] = queue.Queue()
-        self._bar_history: deque[dict] = deque(maxlen=5000)
-        self._latest_bar_dict: dict[str, Any] | None = None
 
         self._action_space: list[str] = Constants.ACTIONS_LIST
         self._first_bar_event: asyncio.Event = asyncio.Event()
@@ -106,25 +114,117 @@ class AlpacaTradingEnvironmentPPO(EnvBase):
         self._cost_coefficient_tensor: torch.Tensor = torch.tensor(data=0.001,
                                                                    device=self._device,
                                                                    dtype=torch.float32)
-        self._trading_client: TradingClient = TradingClient(api_key=self._api_key_ppo,
-                                                            secret_key=self._api_secret_key_ppo, paper=True)
-
-        self._alpaca_trading_account: AlpacaTradingPortfolio = AlpacaTradingPortfolio(device=self._device,
-                                                                                      trading_client=self._trading_client)
+        self._trading_client: TradingClient = AlpacaClientFactory.get_trading_client(
+            api_key=self._api_key_ppo, secret_key=self._api_secret_key_ppo)
+
+        self._portfolio_state_cache: PortfolioStateCache = PortfolioStateCache(
+            trading_client=self._trading_client,
+            trading_stream=AlpacaClientFactory.get_trading_stream(api_key=self._api_key_ppo,
+                                                                  secret_key=self._api_secret_key_ppo),
+            max_staleness_seconds=config.portfolio_state_max_staleness_seconds)
+
+        self._alpaca_trading_account: AlpacaTradingPortfolio = AlpacaTradingPortfolio(
+            device=self._device, trading_client=self._trading_client,
+            portfolio_state_cache=self._portfolio_state_cache,
+            target_weight_rebalancer=TargetWeightRebalancer(min_trade_value=config.rebalance_min_trade_value,
+                                                            lot_size=config.rebalance_lot_size),
+            sell_fill_timeout_seconds=config.rebalance_sell_fill_timeout_seconds)
 
         self.logger = AppLogger.get_logger(self.__class__.__name__)
+        self._latency_tracer: LatencyTracer = LatencyTracer.get_tracer()
+
+        self._market_data_stream_service: MarketDataStreamService = (
+                market_data_stream_service or MarketDataStreamService(
+            data_stream=AlpacaClientFactory.get_stock_data_stream(api_key=self._api_key_ppo,
+                                                                  secret_key=self._api_secret_key_ppo)))
+        self._market_data_stream_service.add_bar_handler(self._handle_bar)
+        self._market_data_stream_service.add_bar_handler(self._portfolio_state_cache.handle_bar)
+
+        self._session_index: int = -1
+        self._session_bounds_list: list[tuple[int, int]] = []
+        self._historical_rolling_feature_tensor: Tensor | None = None
+        self._simulated_trading_portfolio: SimulatedTradingPortfolio | None = self._get_simulated_trading_portfolio()
+
+    def close(self, *, raise_if_closed: bool = True) -> None:
+        self._alpaca_trading_account.close()
+        super().close(raise_if_closed=raise_if_closed)
+
+    def _get_simulated_trading_portfolio(self) -> SimulatedTradingPortfolio | None:
+
+        if self._config.historical_data_directory is None:
+            return None
+
+        market_data: HistoricalMarketData = HistoricalStockDataLoader(
+            data_directory_path=Path(self._config.historical_data_directory)).load_market_data()
+
+        # A session needs at least two bars to produce one transition
+        self._session_bounds_list = [(start, end) for start, end in market_data.get_session_bounds_list() if
+                                     end - start >= 2]
+
+        if not self._session_bounds_list:
+            raise ValueError(f"No replayable trading sessions found in {self._config.historical_data_directory}")
+
+        self.logger.info(f"Historical replay enabled over {len(self._session_bounds_list):,} trading sessions")
+
+        # A separate engine, the live one keeps following the stream
+        self._historical_rolling_feature_tensor = torch.from_numpy(RollingFeatureEngine(
+            num_symbols=market_data.num_tickers,
+            window_size_tuple=self._config.rolling_feature_window_tuple).get_historical_feature_array(
+            market_data=market_data).reshape(market_data.num_timesteps, -1)).to(dtype=self._dtype, device=self._device)
+
+        return SimulatedTradingPortfolio(device=self._device, market_data=market_data,
+                                         initial_cash=self._config.initial_cash)
+
+    @property
+    def is_historical_replay(self) -> bool:
+        return self._simulated_trading_portfolio is not None
+
+    def get_replay_state_dict(self) -> dict[str, Any]:
+        """
+        Replay position and simulated account, enough for a resumed run to step through the same transitions.
+        """
+
+        if not self.is_historical_replay:
+            raise ValueError("Only historical replay environments can be checkpointed")
+
+        return {
+            "session_index": self._session_index,
+            "step_count": self._step_count,
+            "current_weights_tensor": self._current_weights_tensor.clone(),
+            "current_observation_tensor": self._current_observation_tensor.clone(),
+            "simulated_trading_portfolio": self._simulated_trading_portfolio.get_state_dict(),
+        }
+
+    def load_replay_state_dict(self, state_dict: dict[str, Any]) -> None:
+
+        if not self.is_historical_replay:
+            raise ValueError("Only historical replay environments can be checkpointed")
+
+        self._session_index = int(state_dict["session_index"])
+        self._step_count = int(state_dict["step_count"])
+        self._current_weights_tensor = state_dict["current_weights_tensor"].to(self._device)
+        self._current_observation_tensor = state_dict["current_observation_tensor"].to(self._device)
+        self._simulated_trading_portfolio.load_state_dict(state_dict["simulated_trading_portfolio"])
 
     def _project_action_to_target_weights(self, action_tensor: Tensor) -> Tensor:
         weights_tensor: Tensor = torch.softmax(action_tensor, dim=-1)
         return weights_tensor
 
-    async def _handle_bar(self, data) -> None:
-        bar_dict: dict = data.model_dump()
+    async def _handle_bar(self, data: Bar) -> None:
+        symbol_index: int | None = self._symbol_index_dict.get(data.symbol)
+
+        if symbol_index is not None:
+            self._rolling_feature_engine.update_bar(
+                symbol_index=symbol_index, close=data.close, high=data.high, low=data.low, volume=data.volume,
+                session_id=data.timestamp.astimezone(ZoneInfo("America/New_York")).date().toordinal())
 
-        self._latest_bar_dict = bar_dict
-        self._bar_history.append(bar_dict)
+    def _get_replay_observation_tensor(self) -> Tensor:
+        return torch.cat([self._simulated_trading_portfolio.get_observation_tensor(),
+                          self._historical_rolling_feature_tensor[self._simulated_trading_portfolio.current_index]])
 
-        self._bar_queue.put(bar_dict)
+    def _get_live_rolling_feature_tensor(self) -> Tensor:
+        return torch.from_numpy(self._rolling_feature_engine.get_feature_array().reshape(-1)).to(
+            dtype=self._dtype, device=self._device)
 
     def _reset(
             self,
@@ -132,7 +232,27 @@ class AlpacaTradingEnvironmentPPO(EnvBase):
             **kwargs
     ) -> TensorDictBase:
 
-        return TensorDict()
+        self._current_weights_tensor = torch.zeros(self._action_dimension, dtype=self._dtype, device=self._device)
+
+        if self.is_historical_replay:
+            self._session_index = (self._session_index + 1) % len(self._session_bounds_list)
+            session_start_index, _ = self._session_bounds_list[self._session_index]
+
+            self._simulated_trading_portfolio.reset(start_index=session_start_index)
+            self._current_observation_tensor = self._get_replay_observation_tensor()
+
+        is_terminal_tensor: Tensor = torch.zeros(1, dtype=torch.bool, device=self._device)
+
+        return TensorDict(
+            {
+                "observation": self._current_observation_tensor,
+                "done": is_terminal_tensor,
+                "terminated": is_terminal_tensor.clone(),
+                "truncated": is_terminal_tensor.clone(),
+            },
+            batch_size=[],
+            device=self._device,
+        )
 
     def _set_seed(self, seed: int | None = None) -> None:
         if seed is None:
@@ -141,43 +261,42 @@ class AlpacaTradingEnvironmentPPO(EnvBase):
         torch.manual_seed(seed)
         np.random.seed(seed)
 
-    async def _step(self, tensordict) -> TensorDict:
-        action_tensor: Tensor = tensordict["action"].to(self._device)
+        # Differently seeded replay environments, e.g. collector workers, start on different sessions
+        if self.is_historical_replay:
+            self._session_index = seed % len(self._session_bounds_list) - 1
 
-        data_stream: StockDataStream = StockDataStream(api_key=self._api_key_ppo,
-                                                       secret_key=self._api_secret_key_ppo)
+    def _step(self, tensordict) -> TensorDict:
 
-        try:
-
-            data_stream.subscribe_bars(self._handle_bar, *Constants.TICKER_SYMBOL_LIST)
-            stream_task: Task = asyncio.create_task(asyncio.to_thread(data_stream.run))
+        if self.is_historical_replay:
+            return self._historical_replay_step(tensordict)
 
-            # self._alpaca_trading_account.balance_empty_portfolio()
+        return self._live_step(tensordict)
 
-            account_dict: dict[str, float] = self._alpaca_trading_account.get_account_dict()
-            all_positions_list = self._trading_client.get_all_positions()
+    def _historical_replay_step(self, tensordict) -> TensorDict:
+        with self._latency_tracer.span("ppo_replay_step.total"):
+            action_tensor: Tensor = tensordict["action"].to(self._device)
 
-            current_portfolio_value_tensor = torch.tensor(
-                data=account_dict.get("portfolio_value", 0.0),
+            current_portfolio_value_tensor: Tensor = torch.tensor(
+                data=self._simulated_trading_portfolio.get_portfolio_value(),
                 dtype=self._dtype,
                 device=self._device,
             )
 
-            current_weights_tensor = self._current_weights_tensor.clone()
+            current_weights_tensor: Tensor = self._current_weights_tensor
+            target_weights_tensor: Tensor = self._project_action_to_target_weights(action_tensor=action_tensor)
 
-            target_weights_tensor = self._project_action_to_target_weights(action_tensor=action_tensor)
-
-            new_portfolio_value_tensor = self._simulate_portfolio_value_transition(
-                current_portfolio_value_tensor=current_portfolio_value_tensor,
-                current_weights_tensor=current_weights_tensor,
-                target_weights_tensor=target_weights_tensor,
-            )
+            with self._latency_tracer.span("ppo_replay_step.simulate"):
+                new_portfolio_value_tensor: Tensor = self._simulate_portfolio_value_transition(
+                    current_portfolio_value_tensor=current_portfolio_value_tensor,
+                    current_weights_tensor=current_weights_tensor,
+                    target_weights_tensor=target_weights_tensor,
+                )
 
             self._current_weights_tensor = target_weights_tensor.detach()
             self._step_count += 1
 
-            self._current_observation_tensor = self._alpaca_trading_account.get_observation_tensor(
-                all_positions_list=all_positions_list, account_dict=account_dict)
+            with self._latency_tracer.span("ppo_replay_step.observation_build"):
+                self._current_observation_tensor = self._get_replay_observation_tensor()
 
             reward_tensor: Tensor = self._get_reward_tensor(
                 current_portfolio_value_tensor=current_portfolio_value_tensor,
@@ -186,43 +305,136 @@ class AlpacaTradingEnvironmentPPO(EnvBase):
                 portfolio_weights_tensor_t_1=target_weights_tensor,
             )
 
-            current_time_est: time = datetime.now().astimezone(ZoneInfo("America/New_York")).time()
-            is_terminal: bool = current_time_est >= self._close_of_market_time
+            _, session_end_index = self._session_bounds_list[self._session_index]
+            is_terminal: bool = self._simulated_trading_portfolio.current_index >= session_end_index - 1
             is_terminal_tensor: Tensor = torch.tensor([is_terminal], dtype=torch.bool, device=self._device)
 
-            await stream_task
-
             return TensorDict(
                 {
                     "observation": self._current_observation_tensor,
                     "reward": reward_tensor.reshape(1),
                     "done": is_terminal_tensor,
-                    "terminated": is_terminal_tensor,
+                    "terminated": is_terminal_tensor.clone(),
                     "truncated": torch.zeros(1, dtype=torch.bool, device=self._device),
                 },
                 batch_size=[],
                 device=self._device,
             )
 
+    def _live_step(self, tensordict) -> TensorDict:
+        action_tensor: Tensor = tensordict["action"].to(self._device)
+
+        try:
+
+            with self._latency_tracer.span("ppo_step.total"):
+
+                # The shared stream is connected once, later steps only read its latest-bar buffer
+                with self._latency_tracer.span("ppo_step.stream_wait"):
+                    self._market_data_stream_service.start()
+                    self._market_data_stream_service.wait_for_first_bar(timeout_seconds=60)
+                    self._portfolio_state_cache.start()
+
+                # self._alpaca_trading_account.balance_empty_portfolio()
+
+                with self._latency_tracer.span("ppo_step.account_fetch"):
+                    account_dict: dict[str, float] = self._alpaca_trading_account.get_account_dict()
+
+                current_portfolio_value_tensor = torch.tensor(
+                    data=account_dict.get("portfolio_value", 0.0),
+                    dtype=self._dtype,
+                    device=self._device,
+                )
+
+                current_weights_tensor = self._current_weights_tensor.clone()
+
+                with self._latency_tracer.span("ppo_step.action_projection"):
+                    target_weights_tensor = self._project_action_to_target_weights(action_tensor=action_tensor)
+
+                with self._latency_tracer.span("ppo_step.order_submission"):
+                    self._execute_trades(target_weights_tensor=target_weights_tensor)
+
+                self._current_weights_tensor = target_weights_tensor.detach()
+                self._step_count += 1
+
+                # Positions are read back from the cache so the observation includes whatever fills have arrived
+                with self._latency_tracer.span("ppo_step.positions_fetch"):
+                    all_positions_list: list[Position] = self._alpaca_trading_account.get_all_positions()
+                    account_dict = self._alpaca_trading_account.get_account_dict()
+
+                # The account after the trades, marked with whatever fills and bars have arrived, gives the return
+                new_portfolio_value_tensor = torch.tensor(
+                    data=account_dict.get("portfolio_value", 0.0),
+                    dtype=self._dtype,
+                    device=self._device,
+                )
+
+                with self._latency_tracer.span("ppo_step.observation_build"):
+                    self._current_observation_tensor = torch.cat([
+                        self._alpaca_trading_account.get_observation_tensor(all_positions_list=all_positions_list,
+                                                                            account_dict=account_dict),
+                        self._get_live_rolling_feature_tensor()])
+
+                with self._latency_tracer.span("ppo_step.reward"):
+                    reward_tensor: Tensor = self._get_reward_tensor(
+                        current_portfolio_value_tensor=current_portfolio_value_tensor,
+                        new_portfolio_value_tensor=new_portfolio_value_tensor,
+                        portfolio_weights_tensor_t=current_weights_tensor,
+                        portfolio_weights_tensor_t_1=target_weights_tensor,
+                    )
+
+                current_time_est: time = datetime.now().astimezone(ZoneInfo("America/New_York")).time()
+                is_terminal: bool = current_time_est >= self._close_of_market_time
+                is_terminal_tensor: Tensor = torch.tensor([is_terminal], dtype=torch.bool, device=self._device)
+
+                return TensorDict(
+                    {
+                        "observation": self._current_observation_tensor,
+                        "reward": reward_tensor.reshape(1),
+                        "done": is_terminal_tensor,
+                        "terminated": is_terminal_tensor,
+                        "truncated": torch.zeros(1, dtype=torch.bool, device=self._device),
+                    },
+                    batch_size=[],
+                    device=self._device,
+                )
+
         except Exception as e:
             self.logger.error(f"Exception Thrown: {e}")
 
-    def _execute_trades(self, action) -> None:
-        pass
+    def _execute_trades(self, target_weights_tensor: Tensor) -> None:
+
+        current_prices_array: np.ndarray = np.full(self._action_dimension, np.nan, dtype=np.float64)
+
+        for ticker_index, ticker_symbol in enumerate(Constants.TICKER_SYMBOL_LIST):
+            latest_bar: Bar | None = self._market_data_stream_service.get_latest_bar(symbol=ticker_symbol)
+
+            if latest_bar is not None:
+                current_prices_array[ticker_index] = latest_bar.close
+
+        self._alpaca_trading_account.rebalance_to_target_weights(
+            target_weights_array=target_weights_tensor.detach().cpu().numpy().astype(np.float64),
+            current_prices_array=current_prices_array)
 
     def _simulate_portfolio_value_transition(self, current_portfolio_value_tensor: Tensor,
                                              current_weights_tensor: Tensor, target_weights_tensor: Tensor) -> Tensor:
-        # TODO
         """
-        Replace this with your real trading mechanics:
-        - execute trades
-        - apply fills / slippage / commissions if desired
-        - update holdings
-        - advance market by one step
-        - compute new portfolio value
+        Rebalances the simulated holdings to the target weights at the current close, advances the replay by
+        one bar and returns the marked-to-market portfolio value. Transaction costs are charged by the reward
+        through the turnover penalty, so fills here are frictionless.
         """
 
-        pass
+        target_weights_array: np.ndarray = target_weights_tensor.detach().cpu().numpy().astype(np.float64)
+
+        self._simulated_trading_portfolio.rebalance_to_target_weights(target_weights_array=target_weights_array)
+        self._simulated_trading_portfolio.advance_market()
+
+        new_portfolio_value_tensor: Tensor = torch.tensor(
+            data=self._simulated_trading_portfolio.get_portfolio_value(),
+            dtype=self._dtype,
+            device=self._device,
+        )
+
+        return new_portfolio_value_tensor
 
     def _get_reward_tensor(self, current_portfolio_value_tensor: Tensor, new_portfolio_value_tensor: Tensor,
                            portfolio_weights_tensor_t: Tensor, portfolio_weights_tensor_t_1: Tensor) -> Tensor:
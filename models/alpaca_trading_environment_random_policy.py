@@ -1,23 +1,23 @@
 import asyncio
 import math
-import queue
 import random
-from asyncio import Task
-from collections import deque
 from datetime import datetime, time
 from pathlib import Path
 from typing import Any
 from zoneinfo import ZoneInfo
 
-from alpaca.data.live import StockDataStream
 from alpaca.trading import Position
 from alpaca.trading.client import TradingClient
 from alpaca.trading.enums import OrderSide, TimeInForce, OrderType
-from alpaca.trading.models import Order
 from alpaca.trading.requests import MarketOrderRequest
 
 from config.config import settings
 from logger.logger import AppLogger
+from market_data.market_data_stream_service import MarketDataStreamService, MarketDataSubscription
+from trading_account.batch_order_executor import BatchOrderExecutor, OrderSubmissionResult
+from trading_account.portfolio_state_cache import PortfolioStateCache
+from tracing.latency_tracer import LatencyTracer
+from utils.alpaca_client_factory import AlpacaClientFactory
 from utils.constants import Constants
 from utils.trading_activity_csv_writer import TradingActivityCsvWriter
 
@@ -25,88 +25,96 @@ from utils.trading_activity_csv_writer import TradingActivityCsvWriter
 # TODO: Consider moving some of the methods in this class to a helper class
 class AlpacaTradingEnvironmentRandomPolicy:
 
-    def __init__(self) -> None:
+    def __init__(self, market_data_stream_service: MarketDataStreamService | None = None) -> None:
         self._base_directory: Path = Path.cwd()
         self._api_key_random: str = settings.api_key_random
-        self._bar_queue: queue.Queue[dict] = queue.Queue()
-        self._bar_history: deque[dict] = deque(maxlen=5000)
-        self._latest_bar_dict: dict[str, Any] | None = None
         self._action_space: list[str] = Constants.ACTIONS_LIST
         self._first_bar_event: asyncio.Event = asyncio.Event()
         self._close_of_market_time: time = time(16, 0)
         self._logs_directory_path: Path = self._get_logs_directory_path()
         self._api_secret_key_random: str = settings.api_secret_key_random
         self._trading_csv_writer: TradingActivityCsvWriter = TradingActivityCsvWriter(_base_dir=self._base_directory)
-        self._trading_client: TradingClient = TradingClient(api_key=self._api_key_random,
-                                                            secret_key=self._api_secret_key_random, paper=True)
+        self._trading_client: TradingClient = AlpacaClientFactory.get_trading_client(
+            api_key=self._api_key_random, secret_key=self._api_secret_key_random)
+        self._is_market_data_stream_service_owner: bool = market_data_stream_service is None
+        self._market_data_stream_service: MarketDataStreamService = (
+                market_data_stream_service or MarketDataStreamService(
+            data_stream=AlpacaClientFactory.get_stock_data_stream(api_key=self._api_key_random,
+                                                                  secret_key=self._api_secret_key_random)))
+        self._portfolio_state_cache: PortfolioStateCache = PortfolioStateCache(
+            trading_client=self._trading_client,
+            trading_stream=AlpacaClientFactory.get_trading_stream(api_key=self._api_key_random,
+                                                                  secret_key=self._api_secret_key_random))
+        self._market_data_stream_service.add_bar_handler(self._portfolio_state_cache.handle_bar)
+        self._batch_order_executor: BatchOrderExecutor = BatchOrderExecutor(trading_client=self._trading_client)
         self.logger = AppLogger.get_logger(self.__class__.__name__)
-
-    # TODO: Move the following to a helper class
-    async def _handle_bar(self, data) -> None:
-        bar_dict: dict = data.model_dump()
-
-        # store latest + history if you want
-        self._latest_bar_dict = bar_dict
-        self._bar_history.append(bar_dict)
-
-        # thread-safe handoff to your RL consumer loop
-        self._bar_queue.put(bar_dict)
+        self._latency_tracer: LatencyTracer = LatencyTracer.get_tracer()
 
     async def initialize_trading_environment_random_policy(self) -> None:
 
-        data_stream: StockDataStream = StockDataStream(api_key=self._api_key_random,
-                                                       secret_key=self._api_secret_key_random)
         self.logger.info("=" * 100)
         self.logger.info("Initializing Trading Environment")
 
-        try:
+        self._market_data_stream_service.start()
+        self._portfolio_state_cache.start()
+        bar_subscription: MarketDataSubscription = self._market_data_stream_service.subscribe()
 
-            data_stream.subscribe_bars(self._handle_bar, *Constants.TICKER_SYMBOL_LIST)
-            stream_task: Task = asyncio.create_task(asyncio.to_thread(data_stream.run))
+        try:
 
             current_time_step: int = 1
 
             while True:
 
-                account_dict: dict[str, Any] = self._get_account_dict()
-                all_positions_list: list[Position] = self._trading_client.get_all_positions()
+                with self._latency_tracer.span("random_step.total"):
 
-                self._populate_portfolio(all_positions_list=all_positions_list)
+                    with self._latency_tracer.span("random_step.account_fetch"):
+                        account_dict: dict[str, Any] = self._portfolio_state_cache.get_account_dict()
 
-                all_positions_list = self._trading_client.get_all_positions()
+                    with self._latency_tracer.span("random_step.positions_fetch"):
+                        all_positions_list: list[Position] = self._portfolio_state_cache.get_all_positions()
 
-                state_data_dict: dict = await asyncio.to_thread(self._bar_queue.get)
+                    with self._latency_tracer.span("random_step.populate_portfolio"):
+                        self._populate_portfolio(all_positions_list=all_positions_list)
 
-                random_action: OrderSide | str = self._get_random_order_side_action()
+                    all_positions_list = self._portfolio_state_cache.get_all_positions()
 
-                if random_action != "HOLD":
-                    portfolio_cash: float = account_dict.get("cash", 0.0)
-                    portfolio_equity: float = account_dict.get("equity", 0.0)
-                    current_datetime: datetime = datetime.now().astimezone(ZoneInfo("America/New_York"))
+                    with self._latency_tracer.span("random_step.stream_wait"):
+                        await bar_subscription.get()
 
-                    self.logger.info(
-                        f"Timestep: {current_time_step} -> Timestamp: {current_datetime.time()} -> Portfolio Equity: {portfolio_equity:,.2f} -> Portfolio Cash Available: ${portfolio_cash:,.2f}")
-                    self.logger.info("=" * 150)
+                    with self._latency_tracer.span("random_step.policy"):
+                        random_action: OrderSide | str = self._get_random_order_side_action()
 
-                    self._trading_csv_writer.append_row_to_csv(
-                        logs_directory_path=self._logs_directory_path,
-                        timestep=current_time_step,
-                        current_datetime=current_datetime,
-                        portfolio_equity=portfolio_equity,
-                        portfolio_cash_available=portfolio_cash,
-                        all_positions_list=all_positions_list
-                    )
+                    if random_action != "HOLD":
+                        portfolio_cash: float = account_dict.get("cash", 0.0)
+                        portfolio_equity: float = account_dict.get("equity", 0.0)
+                        current_datetime: datetime = datetime.now().astimezone(ZoneInfo("America/New_York"))
 
-                else:
-                    self.logger.info(f"Action Selected -> {random_action}")
-                    continue
+                        self.logger.info(
+                            f"Timestep: {current_time_step} -> Timestamp: {current_datetime.time()} -> Portfolio Equity: {portfolio_equity:,.2f} -> Portfolio Cash Available: ${portfolio_cash:,.2f}")
+                        self.logger.info("=" * 150)
+
+                        with self._latency_tracer.span("random_step.csv_write"):
+                            self._trading_csv_writer.append_row_to_csv(
+                                logs_directory_path=self._logs_directory_path,
+                                timestep=current_time_step,
+                                current_datetime=current_datetime,
+                                portfolio_equity=portfolio_equity,
+                                portfolio_cash_available=portfolio_cash,
+                                all_positions_list=all_positions_list
+                            )
+
+                    else:
+                        self.logger.info(f"Action Selected -> {random_action}")
+                        continue
 
-                random_quantity_dict: dict[
-                    str, tuple[int, float, OrderSide]] = self._get_random_quantity_per_symbol_dict(
-                    account_dict=account_dict,
-                    all_positions_list=all_positions_list)
+                    with self._latency_tracer.span("random_step.order_sizing"):
+                        random_quantity_dict: dict[
+                            str, tuple[int, float, OrderSide]] = self._get_random_quantity_per_symbol_dict(
+                            account_dict=account_dict,
+                            all_positions_list=all_positions_list)
 
-                self.execute_random_action(random_quantity_dict=random_quantity_dict)
+                    with self._latency_tracer.span("random_step.order_submission"):
+                        self.execute_random_action(random_quantity_dict=random_quantity_dict)
 
                 current_time_est: time = datetime.now().astimezone(ZoneInfo("America/New_York")).time()
 
@@ -117,11 +125,21 @@ class AlpacaTradingEnvironmentRandomPolicy:
 
                 current_time_step += 1
 
-            await stream_task
-
         except Exception as e:
             self.logger.error(f"Exception Thrown: {e}")
 
+        finally:
+            self._market_data_stream_service.unsubscribe(subscription=bar_subscription)
+
+            self._trading_csv_writer.close()
+
+            self._batch_order_executor.shutdown()
+
+            self._portfolio_state_cache.stop()
+
+            if self._is_market_data_stream_service_owner:
+                self._market_data_stream_service.stop()
+
     def _get_random_quantity_per_symbol_dict(self, account_dict: dict[str, Any], all_positions_list: list, ) -> dict[
         str, tuple[int, float, OrderSide]]:
 
@@ -229,31 +247,25 @@ class AlpacaTradingEnvironmentRandomPolicy:
 
         try:
 
+            market_order_request_list: list[MarketOrderRequest] = []
+
             for ticker_symbol_str, ticker_symbol_tuple in random_quantity_dict.items():
 
                 stock_quantity: int = ticker_symbol_tuple[0]
-                stock_price: float = float(ticker_symbol_tuple[1])
                 stock_action: OrderSide = ticker_symbol_tuple[2]
 
                 if stock_quantity <= 0 and stock_action == OrderSide.SELL:
                     continue
 
-                market_order_request: MarketOrderRequest = MarketOrderRequest(
+                market_order_request_list.append(MarketOrderRequest(
                     symbol=ticker_symbol_str,
                     qty=stock_quantity,
                     side=stock_action,
                     order_type=OrderType.MARKET,
                     time_in_force=TimeInForce.DAY
-                )
+                ))
 
-                market_order: Order = self._trading_client.submit_order(
-                    order_data=market_order_request
-                )
-
-                market_order_qty_int: int = int(market_order.qty)
-
-                self.logger.info(
-                    f"Successfully {market_order.side.name} {market_order_qty_int} share(s) of {market_order.symbol} @ ${stock_price:,.2f} for ${stock_price * market_order_qty_int:,.2f}")
+            self._batch_order_executor.submit_orders(order_request_list=market_order_request_list)
 
             self.logger.info("=" * 100)
 
@@ -264,44 +276,26 @@ class AlpacaTradingEnvironmentRandomPolicy:
 
         positions_str_list: list[str] = self._get_positions_str_list(all_positions_list=all_positions_list)
 
-        try:
-
-            for ticker_symbol_str in Constants.TICKER_SYMBOL_LIST:
-
-                if ticker_symbol_str not in positions_str_list:
-                    market_order_request: MarketOrderRequest = MarketOrderRequest(
-                        symbol=ticker_symbol_str,
-                        qty=1,
-                        side=OrderSide.BUY,
-                        order_type=OrderType.MARKET,
-                        time_in_force=TimeInForce.DAY
-                    )
-
-                    market_order: Order = self._trading_client.submit_order(
-                        order_data=market_order_request
-                    )
-
-                    self.logger.info(
-                        f"Successfully {market_order.side.name} {market_order.qty} share(s) of {market_order.symbol}")
-
-        except Exception as e:
-            self.logger.warning(f"Exception Thrown: {e}")
-
-    def _get_account_dict(self) -> dict[str, Any]:
-
-        account_dict: dict[str, Any] = self._trading_client.get_account().model_dump()
-
-        result_dict: dict[str, Any] = {
+        market_order_request_list: list[MarketOrderRequest] = [
+            MarketOrderRequest(
+                symbol=ticker_symbol_str,
+                qty=1,
+                side=OrderSide.BUY,
+                order_type=OrderType.MARKET,
+                time_in_force=TimeInForce.DAY
+            )
+            for ticker_symbol_str in Constants.TICKER_SYMBOL_LIST if ticker_symbol_str not in positions_str_list
+        ]
 
-            "cash": float(account_dict.get("cash", 0.0)),
-            "equity": float(account_dict.get("equity", 0.0)),
-            "buying_power": float(account_dict.get("buying_power", 0.0)),
-            "portfolio_value": float(account_dict.get("portfolio_value", 0.0)),
-            "daytrading_buying_power": float(account_dict.get("daytrading_buying_power", 0.0))
+        if not market_order_request_list:
+            return
 
-        }
+        order_submission_result_list: list[OrderSubmissionResult] = self._batch_order_executor.submit_orders(
+            order_request_list=market_order_request_list)
 
-        return result_dict
+        # A newly opened position is not in the cached snapshot yet
+        if any(order_submission_result.is_successful for order_submission_result in order_submission_result_list):
+            self._portfolio_state_cache.invalidate()
 
     def _get_logs_directory_path(self) -> Path:
         current_datetime: datetime = datetime.now()
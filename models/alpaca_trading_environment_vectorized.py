@@ -0,0 +1,277 @@
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import torch
+from tensordict import TensorDict, TensorDictBase
+from torch import multiprocessing, Tensor
+from torchrl.data import Composite, UnboundedContinuous, Bounded
+from torchrl.envs import EnvBase
+
+from data_extraction.historical_stock_data_loader import HistoricalStockDataLoader, HistoricalMarketData
+from logger.logger import AppLogger
+from market_data.rolling_feature_engine import RollingFeatureEngine
+from models.ppo_config import PPOConfig
+from utils.constants import Constants
+
+
+class AlpacaTradingEnvironmentVectorized(EnvBase):
+    """
+    Steps PPOConfig.num_environments independent simulated portfolios over replayed minute bars with batched
+    tensor operations, one trading session per episode.
+    """
+
+    def __init__(self, config: PPOConfig, market_data: HistoricalMarketData | None = None) -> None:
+        self._num_environments: int = config.num_environments
+
+        super().__init__(batch_size=torch.Size([self._num_environments]))
+
+        self._config: PPOConfig = config
+        self._dtype = torch.float32
+        self._device: torch.device = self._get_processing_device()
+        # MPS has no float64 support, so account state falls back to single precision there
+        self._state_dtype = torch.float32 if self._device.type == "mps" else torch.float64
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+        self._action_dimension: int = config.action_dimension
+        self._num_features: int = len(Constants.TICKER_FEATURES_LIST)
+
+        self._market_data: HistoricalMarketData = market_data or HistoricalStockDataLoader(
+            data_directory_path=Path(config.historical_data_directory)).load_market_data()
+
+        # Computed by the same engine the live environment feeds bar by bar, then gathered per market index
+        rolling_feature_engine: RollingFeatureEngine = RollingFeatureEngine(
+            num_symbols=self._market_data.num_tickers, window_size_tuple=config.rolling_feature_window_tuple)
+        self._rolling_feature_tensor: Tensor = torch.from_numpy(rolling_feature_engine.get_historical_feature_array(
+            market_data=self._market_data).reshape(self._market_data.num_timesteps, -1)).to(dtype=self._dtype,
+                                                                                            device=self._device)
+        self._observation_dim: int = config.observation_dimension + rolling_feature_engine.num_features
+
+        self._close_prices_tensor: Tensor = torch.as_tensor(self._market_data.close_prices, dtype=self._state_dtype,
+                                                            device=self._device)
+        self._previous_session_close_prices_tensor: Tensor = torch.as_tensor(
+            self._market_data.previous_session_close_prices, dtype=self._state_dtype, device=self._device)
+
+        session_bounds_list: list[tuple[int, int]] = [(start, end) for start, end in
+                                                      self._market_data.get_session_bounds_list() if end - start >= 2]
+
+        if not session_bounds_list:
+            raise ValueError("No replayable trading sessions found in the historical market data")
+
+        self._session_bounds_tensor: Tensor = torch.tensor(session_bounds_list, dtype=torch.int64, device=self._device)
+
+        environment_shape: torch.Size = torch.Size([self._num_environments])
+        self._market_index_tensor: Tensor = torch.zeros(environment_shape, dtype=torch.int64, device=self._device)
+        self._session_end_index_tensor: Tensor = torch.zeros(environment_shape, dtype=torch.int64, device=self._device)
+        self._cash_tensor: Tensor = torch.zeros((self._num_environments, 1), dtype=self._state_dtype,
+                                                device=self._device)
+        self._holdings_tensor: Tensor = torch.zeros((self._num_environments, self._action_dimension),
+                                                    dtype=self._state_dtype, device=self._device)
+        self._cost_basis_tensor: Tensor = torch.zeros_like(self._holdings_tensor)
+        self._current_weights_tensor: Tensor = torch.zeros((self._num_environments, self._action_dimension),
+                                                           dtype=self._dtype, device=self._device)
+        self._cost_coefficient_tensor: Tensor = torch.tensor(data=config.cost_coefficient, device=self._device,
+                                                             dtype=self._dtype)
+        self._generator: torch.Generator = torch.Generator(device=self._device)
+
+        self.observation_spec = Composite(
+            observation=UnboundedContinuous(
+                shape=torch.Size([self._num_environments, self._observation_dim]),
+                dtype=self._dtype,
+                device=self._device,
+            ),
+            shape=environment_shape,
+        )
+
+        self.action_spec = UnboundedContinuous(
+            shape=torch.Size([self._num_environments, self._action_dimension]),
+            dtype=self._dtype,
+            device=self._device,
+        )
+
+        self.reward_spec = UnboundedContinuous(
+            shape=torch.Size([self._num_environments, 1]),
+            dtype=self._dtype,
+            device=self._device,
+        )
+
+        self.done_spec = Composite(
+            done=Bounded(low=0, high=1, shape=torch.Size([self._num_environments, 1]), dtype=torch.bool,
+                         device=self._device),
+            terminated=Bounded(low=0, high=1, shape=torch.Size([self._num_environments, 1]), dtype=torch.bool,
+                               device=self._device),
+            truncated=Bounded(low=0, high=1, shape=torch.Size([self._num_environments, 1]), dtype=torch.bool,
+                              device=self._device),
+            shape=environment_shape,
+        )
+
+    @property
+    def market_data(self) -> HistoricalMarketData:
+        return self._market_data
+
+    def get_replay_state_dict(self) -> dict[str, Any]:
+        """
+        Per-environment replay position and simulated accounts plus the session sampler, enough for a resumed run
+        to step through the same transitions.
+        """
+
+        return {
+            "market_index_tensor": self._market_index_tensor.clone(),
+            "session_end_index_tensor": self._session_end_index_tensor.clone(),
+            "cash_tensor": self._cash_tensor.clone(),
+            "holdings_tensor": self._holdings_tensor.clone(),
+            "cost_basis_tensor": self._cost_basis_tensor.clone(),
+            "current_weights_tensor": self._current_weights_tensor.clone(),
+            "generator_state_tensor": self._generator.get_state(),
+        }
+
+    def load_replay_state_dict(self, state_dict: dict[str, Any]) -> None:
+        self._market_index_tensor = state_dict["market_index_tensor"].to(self._device)
+        self._session_end_index_tensor = state_dict["session_end_index_tensor"].to(self._device)
+        self._cash_tensor = state_dict["cash_tensor"].to(self._device)
+        self._holdings_tensor = state_dict["holdings_tensor"].to(self._device)
+        self._cost_basis_tensor = state_dict["cost_basis_tensor"].to(self._device)
+        self._current_weights_tensor = state_dict["current_weights_tensor"].to(self._device)
+        self._generator.set_state(state_dict["generator_state_tensor"])
+
+    def _reset(self, tensordict: TensorDictBase | None = None, **kwargs) -> TensorDictBase:
+
+        reset_mask_tensor: Tensor = torch.ones(self._num_environments, dtype=torch.bool, device=self._device)
+
+        if tensordict is not None and "_reset" in tensordict.keys():
+            reset_mask_tensor = tensordict.get("_reset").reshape(self._num_environments)
+
+        session_index_tensor: Tensor = torch.randint(high=self._session_bounds_tensor.shape[0],
+                                                     size=(self._num_environments,),
+                                                     generator=self._generator, device=self._device)
+        session_bounds_tensor: Tensor = self._session_bounds_tensor[session_index_tensor]
+
+        self._market_index_tensor = torch.where(reset_mask_tensor, session_bounds_tensor[:, 0],
+                                                self._market_index_tensor)
+        self._session_end_index_tensor = torch.where(reset_mask_tensor, session_bounds_tensor[:, 1],
+                                                     self._session_end_index_tensor)
+
+        reset_column_mask_tensor: Tensor = reset_mask_tensor.unsqueeze(-1)
+        self._cash_tensor = torch.where(reset_column_mask_tensor, self._config.initial_cash, self._cash_tensor)
+        self._holdings_tensor = self._holdings_tensor.masked_fill(reset_column_mask_tensor, 0.0)
+        self._cost_basis_tensor = self._cost_basis_tensor.masked_fill(reset_column_mask_tensor, 0.0)
+        self._current_weights_tensor = self._current_weights_tensor.masked_fill(reset_column_mask_tensor, 0.0)
+
+        is_terminal_tensor: Tensor = torch.zeros((self._num_environments, 1), dtype=torch.bool, device=self._device)
+
+        return TensorDict(
+            {
+                "observation": self._get_observation_tensor(current_prices_tensor=self._get_current_prices_tensor()),
+                "done": is_terminal_tensor,
+                "terminated": is_terminal_tensor.clone(),
+                "truncated": is_terminal_tensor.clone(),
+            },
+            batch_size=self.batch_size,
+            device=self._device,
+        )
+
+    def _set_seed(self, seed: int | None = None) -> None:
+        if seed is None:
+            return
+
+        self._generator.manual_seed(seed)
+        torch.manual_seed(seed)
+        np.random.seed(seed)
+
+    def _step(self, tensordict: TensorDictBase) -> TensorDictBase:
+        action_tensor: Tensor = tensordict["action"].to(self._device)
+
+        current_prices_tensor: Tensor = self._get_current_prices_tensor()
+        current_portfolio_value_tensor: Tensor = self._get_portfolio_value_tensor(prices_tensor=current_prices_tensor)
+
+        target_weights_tensor: Tensor = torch.softmax(action_tensor, dim=-1)
+
+        self._rebalance_to_target_weights(target_weights_tensor=target_weights_tensor,
+                                          current_prices_tensor=current_prices_tensor,
+                                          current_portfolio_value_tensor=current_portfolio_value_tensor)
+
+        self._market_index_tensor = self._market_index_tensor + 1
+
+        new_prices_tensor: Tensor = self._get_current_prices_tensor()
+        new_portfolio_value_tensor: Tensor = self._get_portfolio_value_tensor(prices_tensor=new_prices_tensor)
+
+        turnover_tensor: Tensor = torch.sum(torch.abs(target_weights_tensor - self._current_weights_tensor), dim=-1,
+                                            keepdim=True)
+
+        safe_denominator_tensor: Tensor = torch.clamp(current_portfolio_value_tensor, min=self._config.epsilon)
+        log_return_tensor: Tensor = torch.log(new_portfolio_value_tensor / safe_denominator_tensor).to(self._dtype)
+        reward_tensor: Tensor = log_return_tensor - self._cost_coefficient_tensor * turnover_tensor
+
+        self._current_weights_tensor = target_weights_tensor.detach()
+
+        is_terminal_tensor: Tensor = (self._market_index_tensor >= self._session_end_index_tensor - 1).unsqueeze(-1)
+
+        return TensorDict(
+            {
+                "observation": self._get_observation_tensor(current_prices_tensor=new_prices_tensor),
+                "reward": reward_tensor,
+                "done": is_terminal_tensor,
+                "terminated": is_terminal_tensor.clone(),
+                "truncated": torch.zeros_like(is_terminal_tensor),
+            },
+            batch_size=self.batch_size,
+            device=self._device,
+        )
+
+    def _rebalance_to_target_weights(self, target_weights_tensor: Tensor, current_prices_tensor: Tensor,
+                                     current_portfolio_value_tensor: Tensor) -> None:
+
+        target_holdings_tensor: Tensor = target_weights_tensor.detach().to(
+            self._state_dtype) * current_portfolio_value_tensor / current_prices_tensor
+        delta_holdings_tensor: Tensor = target_holdings_tensor - self._holdings_tensor
+
+        remaining_fraction_tensor: Tensor = torch.where(self._holdings_tensor > 0,
+                                                        target_holdings_tensor / self._holdings_tensor.clamp(
+                                                            min=self._config.epsilon), 1.0)
+
+        self._cost_basis_tensor = torch.where(delta_holdings_tensor > 0,
+                                              self._cost_basis_tensor + delta_holdings_tensor * current_prices_tensor,
+                                              self._cost_basis_tensor * remaining_fraction_tensor)
+
+        self._cash_tensor = self._cash_tensor - torch.sum(delta_holdings_tensor * current_prices_tensor, dim=-1,
+                                                          keepdim=True)
+        self._holdings_tensor = target_holdings_tensor
+
+    def _get_current_prices_tensor(self) -> Tensor:
+        return self._close_prices_tensor[self._market_index_tensor]
+
+    def _get_portfolio_value_tensor(self, prices_tensor: Tensor) -> Tensor:
+        return self._cash_tensor + torch.sum(self._holdings_tensor * prices_tensor, dim=-1, keepdim=True)
+
+    def _get_observation_tensor(self, current_prices_tensor: Tensor) -> Tensor:
+
+        portfolio_value_tensor: Tensor = torch.clamp(
+            self._get_portfolio_value_tensor(prices_tensor=current_prices_tensor), min=self._config.epsilon)
+        market_value_tensor: Tensor = self._holdings_tensor * current_prices_tensor
+
+        change_today_tensor: Tensor = current_prices_tensor / self._previous_session_close_prices_tensor[
+            self._market_index_tensor] - 1.0
+
+        observation_tensor: Tensor = torch.stack(
+            [
+                market_value_tensor / portfolio_value_tensor,
+                self._cost_basis_tensor / portfolio_value_tensor,
+                (market_value_tensor - self._cost_basis_tensor) / portfolio_value_tensor,
+                torch.where(self._holdings_tensor > 0, change_today_tensor, 0.0),
+            ],
+            dim=-1,
+        )
+
+        return torch.cat([observation_tensor.reshape(self._num_environments, -1).to(self._dtype),
+                          self._rolling_feature_tensor[self._market_index_tensor]], dim=-1)
+
+    def _get_processing_device(self) -> torch.device:
+
+        is_fork: bool = multiprocessing.get_start_method() == "fork"
+
+        if torch.cuda.is_available() and not is_fork:
+            return torch.device("cuda")
+        elif torch.mps.is_available():
+            return torch.device("mps")
+        else:
+            return torch.device("cpu")
@@ -1,10 +1,17 @@
+import functools
+import random
 from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable
 
+import numpy as np
 import torch
-from tensordict.nn import NormalParamExtractor, TensorDictModule
-from torch import nn
-from torchrl.collectors import Collector
+from tensordict import TensorDictBase
+from tensordict.nn import TensorDictModule
+from torch import nn, Tensor
+from torchrl.collectors import BaseCollector, Collector, MultiAsyncCollector, MultiSyncCollector
 from torchrl.data import ReplayBuffer, SamplerWithoutReplacement, LazyTensorStorage
+from torchrl.envs import EnvBase
 from torchrl.modules import ProbabilisticActor, TanhNormal, ValueOperator
 from torchrl.objectives import ClipPPOLoss
 from torchrl.objectives.value import GAE
@@ -12,30 +19,26 @@ from tqdm import tqdm
 
 from logger.logger import AppLogger
 from models.alpaca_trading_environment_ppo import AlpacaTradingEnvironmentPPO
+from models.alpaca_trading_environment_vectorized import AlpacaTradingEnvironmentVectorized
 from models.ppo_config import PPOConfig
+from models.ppo_network_builder import PPONetworkBuilder
+from models.training_checkpointer import TrainingCheckpointer
+from tracing.latency_tracer import LatencyTracer
 
 
 class AlpacaTradingPPONeuralNetwork:
 
-    def __init__(self, env: AlpacaTradingEnvironmentPPO, config: PPOConfig) -> None:
+    def __init__(self, env: AlpacaTradingEnvironmentPPO | AlpacaTradingEnvironmentVectorized,
+                 config: PPOConfig) -> None:
         self._config: PPOConfig = config
-        self._env: AlpacaTradingEnvironmentPPO = env
+        self._env: AlpacaTradingEnvironmentPPO | AlpacaTradingEnvironmentVectorized = env
         self._device: torch.device = self._env.device
+        self._ppo_network_builder: PPONetworkBuilder = PPONetworkBuilder(config=config, device=self._device)
         self._logger = AppLogger.get_logger(self.__class__.__name__)
 
     def build_actor_module(self) -> ProbabilisticActor:
-        actor_network: nn.Sequential = nn.Sequential(
-            nn.Linear(in_features=self._config.action_dimension, device=self._device, out_features=8),
-            nn.Tanh(),
-            nn.Linear(in_features=8, device=self._device, out_features=16),
-            nn.Tanh(),
-            nn.Linear(in_features=16, device=self._device, out_features=16),
-            nn.Tanh(),
-            nn.Linear(in_features=16, device=self._device, out_features=8),
-            nn.Tanh(),
-            nn.Linear(in_features=8, device=self._device, out_features=self._config.action_dimension),
-            NormalParamExtractor(),
-        )
+        actor_network: nn.Sequential = self._ppo_network_builder.build_actor_network(
+            input_dimension=self._get_observation_dimension())
 
         # NOTE: Both of the following are used in a Gaussian distribution
         # loc - average (μ)
@@ -57,17 +60,8 @@ class AlpacaTradingPPONeuralNetwork:
         return actor_module
 
     def build_critic_module(self) -> ValueOperator:
-        critic_neural_network: nn.Sequential = nn.Sequential(
-            nn.Linear(in_features=self._config.action_dimension, device=self._device, out_features=8),
-            nn.Tanh(),
-            nn.Linear(in_features=8, device=self._device, out_features=16),
-            nn.Tanh(),
-            nn.Linear(in_features=16, device=self._device, out_features=16),
-            nn.Tanh(),
-            nn.Linear(in_features=16, device=self._device, out_features=8),
-            nn.Tanh(),
-            nn.Linear(in_features=8, device=self._device, out_features=self._config.action_dimension),
-        )
+        critic_neural_network: nn.Sequential = self._ppo_network_builder.build_critic_network(
+            input_dimension=self._get_observation_dimension())
 
         critic_module: ValueOperator = ValueOperator(
             module=critic_neural_network,
@@ -76,26 +70,237 @@ class AlpacaTradingPPONeuralNetwork:
 
         return critic_module
 
+    def _get_observation_dimension(self) -> int:
+        return self._env.observation_spec["observation"].shape[-1]
+
     def train_model(self) -> None:
 
         actor_module: ProbabilisticActor = self.build_actor_module()
         critic_module: ValueOperator = self.build_critic_module()
 
-        collector: Collector = Collector(
-            create_env_fn=self._env,
-            policy=actor_module,
-            frames_per_batch=self._config.max_batch_size,
-            total_frames=self._config.max_batches,
-            split_trajs=False,
-            device=self._device,
-        )
+        collector: BaseCollector = self.build_collector(actor_module=actor_module)
 
         replay_buffer: ReplayBuffer = ReplayBuffer(
             storage=LazyTensorStorage(max_size=self._config.max_batch_size),
             sampler=SamplerWithoutReplacement(),
         )
 
-        advantage_module: GAE = GAE(
+        advantage_module: GAE = self.build_advantage_module(critic_module=critic_module)
+        loss_module: ClipPPOLoss = self.build_loss_module(actor_module=actor_module, critic_module=critic_module)
+
+        optimizer = torch.optim.Adam(loss_module.parameters(), lr=self._config.learning_rate)
+
+        logs: dict[str, list[float]] = defaultdict(list)
+        start_batch_index: int = 0
+        num_resumed_frames: int = 0
+
+        training_checkpointer: TrainingCheckpointer | None = None
+
+        if self._config.checkpoint_directory is not None:
+            training_checkpointer = TrainingCheckpointer(
+                checkpoint_directory_path=Path(self._config.checkpoint_directory),
+                max_checkpoints_to_keep=self._config.max_checkpoints_to_keep)
+
+            if self._config.resume_from_checkpoint:
+                checkpoint_dict: dict[str, Any] | None = training_checkpointer.load_latest()
+
+                if checkpoint_dict is None:
+                    self._logger.info(f"No checkpoint in {self._config.checkpoint_directory}, starting from scratch")
+                else:
+                    start_batch_index = self._load_checkpoint_dict(
+                        checkpoint_dict=checkpoint_dict, actor_module=actor_module, critic_module=critic_module,
+                        optimizer=optimizer, collector=collector, logs=logs) + 1
+                    num_resumed_frames = checkpoint_dict["collector_state_dict"]["frames"]
+
+        progress_bar = tqdm(total=self._config.max_batches, initial=num_resumed_frames)
+        completed_batch_index: int = start_batch_index - 1
+
+        try:
+            for batch_index, tensordict_data in enumerate(collector, start=start_batch_index):
+                self._update_policy(tensordict_data=tensordict_data, advantage_module=advantage_module,
+                                    loss_module=loss_module, optimizer=optimizer, replay_buffer=replay_buffer)
+
+                # Sync workers pick up new weights at every batch, async workers only when told to
+                if isinstance(collector, MultiAsyncCollector):
+                    collector.update_policy_weights_()
+
+                mean_reward = float(tensordict_data["next", "reward"].mean().item())
+                logs["reward"].append(mean_reward)
+                completed_batch_index = batch_index
+
+                progress_bar.update(tensordict_data.numel())
+                progress_bar.set_description(f"batch={batch_index} reward={mean_reward:.6f}")
+
+                if training_checkpointer is not None and (
+                        batch_index + 1) % self._config.checkpoint_interval_batches == 0:
+                    training_checkpointer.save(batch_index=batch_index, checkpoint_dict=self._get_checkpoint_dict(
+                        batch_index=batch_index, actor_module=actor_module, critic_module=critic_module,
+                        optimizer=optimizer, collector=collector, logs=logs))
+
+            # The finished network is always saved, whatever the interval
+            if training_checkpointer is not None and completed_batch_index >= start_batch_index and (
+                    completed_batch_index + 1) % self._config.checkpoint_interval_batches != 0:
+                training_checkpointer.save(batch_index=completed_batch_index, checkpoint_dict=self._get_checkpoint_dict(
+                    batch_index=completed_batch_index, actor_module=actor_module, critic_module=critic_module,
+                    optimizer=optimizer, collector=collector, logs=logs))
+
+        finally:
+            collector.shutdown()
+
+            if training_checkpointer is not None:
+                training_checkpointer.close()
+
+        self._logger.info("Training finished.")
+        self._logger.info(f"Collected {len(logs['reward'])} reward entries.")
+
+    def _get_checkpoint_dict(self, batch_index: int, actor_module: ProbabilisticActor, critic_module: ValueOperator,
+                             optimizer: torch.optim.Optimizer, collector: BaseCollector,
+                             logs: dict[str, list[float]]) -> dict[str, Any]:
+        """
+        Everything the next batch depends on. The RNG states are taken last, after the update, so a resumed run
+        draws the same exploration noise and minibatch permutations as an uninterrupted one.
+        """
+
+        checkpoint_dict: dict[str, Any] = {
+            "batch_index": batch_index,
+            "actor_state_dict": actor_module.state_dict(),
+            "critic_state_dict": critic_module.state_dict(),
+            "optimizer_state_dict": optimizer.state_dict(),
+            "collector_state_dict": collector.state_dict(),
+            "logs": dict(logs),
+        }
+
+        if self._is_resumable_exactly(collector=collector):
+            checkpoint_dict["environment_state_dict"] = self._env.get_replay_state_dict()
+            checkpoint_dict["collector_carrier"] = self._get_collector_carrier(collector=collector)
+
+        checkpoint_dict["rng_state_dict"] = {
+            "torch": torch.get_rng_state(),
+            "numpy": np.random.get_state(),
+            "python": random.getstate(),
+        }
+
+        if torch.cuda.is_available():
+            checkpoint_dict["rng_state_dict"]["cuda"] = torch.cuda.get_rng_state_all()
+
+        return checkpoint_dict
+
+    def _load_checkpoint_dict(self, checkpoint_dict: dict[str, Any], actor_module: ProbabilisticActor,
+                              critic_module: ValueOperator, optimizer: torch.optim.Optimizer,
+                              collector: BaseCollector, logs: dict[str, list[float]]) -> int:
+
+        actor_module.load_state_dict(checkpoint_dict["actor_state_dict"])
+        critic_module.load_state_dict(checkpoint_dict["critic_state_dict"])
+        optimizer.load_state_dict(checkpoint_dict["optimizer_state_dict"])
+        collector.load_state_dict(checkpoint_dict["collector_state_dict"])
+        logs.update(checkpoint_dict["logs"])
+
+        if "environment_state_dict" in checkpoint_dict and self._is_resumable_exactly(collector=collector):
+            self._env.load_replay_state_dict(checkpoint_dict["environment_state_dict"])
+            self._get_collector_carrier(collector=collector).update(checkpoint_dict["collector_carrier"])
+        else:
+            self._logger.warning("Collector environments restart from their seeds, updates after resuming will "
+                                 "differ from an uninterrupted run")
+
+        rng_state_dict: dict[str, Any] = checkpoint_dict["rng_state_dict"]
+        torch.set_rng_state(rng_state_dict["torch"])
+        np.random.set_state(rng_state_dict["numpy"])
+        random.setstate(rng_state_dict["python"])
+
+        if "cuda" in rng_state_dict and torch.cuda.is_available():
+            torch.cuda.set_rng_state_all(rng_state_dict["cuda"])
+
+        self._logger.info(f"Resumed from batch {checkpoint_dict['batch_index']} "
+                          f"after {checkpoint_dict['collector_state_dict']['frames']:,} frames")
+
+        return int(checkpoint_dict["batch_index"])
+
+    @staticmethod
+    def _get_collector_carrier(collector: BaseCollector) -> TensorDictBase:
+        """
+        The observation the collector will feed the policy first. It is not part of the collector state_dict, so
+        this is the one place that reaches into torchrl's private attribute.
+        """
+
+        if not hasattr(collector, "_carrier"):
+            raise RuntimeError(f"{type(collector).__name__} has no _carrier, the installed torchrl version no longer "
+                               f"exposes the collector's pending observation, exact resuming needs updating")
+
+        return collector._carrier
+
+    def _is_resumable_exactly(self, collector: BaseCollector) -> bool:
+
+        # Worker processes own their environments, and a live brokerage account cannot be rewound
+        return isinstance(collector, Collector) and (
+                isinstance(self._env, AlpacaTradingEnvironmentVectorized) or self._env.is_historical_replay)
+
+    def build_collector(self, actor_module: ProbabilisticActor) -> BaseCollector:
+        """
+        A single in-process Collector, or PPOConfig.num_collector_workers replay environments in worker processes
+        that hand batches back through shared memory. Sync mode stacks one slice per worker into each batch of
+        max_batch_size frames, async mode yields each worker's max_batch_size batch as soon as it is ready.
+        """
+
+        num_collector_workers: int = self._config.num_collector_workers
+
+        if num_collector_workers <= 1:
+            LatencyTracer.get_tracer().instrument_module(module=actor_module, phase_name="ppo_policy.forward")
+
+            return Collector(
+                create_env_fn=self._env,
+                policy=actor_module,
+                frames_per_batch=self._config.max_batch_size,
+                total_frames=self._config.max_batches,
+                split_trajs=False,
+                device=self._device,
+            )
+
+        if self._config.collector_mode == "sync":
+            if self._config.max_batch_size % num_collector_workers != 0:
+                raise ValueError(f"max_batch_size {self._config.max_batch_size} is not divisible by "
+                                 f"{num_collector_workers} collector workers")
+
+            collector: BaseCollector = MultiSyncCollector(
+                create_env_fn=[self._get_create_env_function()] * num_collector_workers,
+                policy=actor_module,
+                frames_per_batch=self._config.max_batch_size,
+                total_frames=self._config.max_batches,
+                split_trajs=False,
+                device=self._device,
+                cat_results="stack",
+                update_at_each_batch=True,
+            )
+        elif self._config.collector_mode == "async":
+            collector = MultiAsyncCollector(
+                create_env_fn=[self._get_create_env_function()] * num_collector_workers,
+                policy=actor_module,
+                frames_per_batch=self._config.max_batch_size,
+                total_frames=self._config.max_batches,
+                split_trajs=False,
+                device=self._device,
+            )
+        else:
+            raise ValueError(f"Unsupported collector mode: {self._config.collector_mode}")
+
+        # Each worker is seeded differently so replay workers start on different sessions
+        collector.set_seed(self._config.collector_seed)
+
+        return collector
+
+    def _get_create_env_function(self) -> Callable[[], EnvBase]:
+
+        if isinstance(self._env, AlpacaTradingEnvironmentVectorized):
+            return functools.partial(AlpacaTradingEnvironmentVectorized, config=self._config,
+                                     market_data=self._env.market_data)
+
+        # Live workers would all trade the one brokerage account
+        if not self._env.is_historical_replay:
+            raise ValueError("Parallel collection needs historical replay, set PPOConfig.historical_data_directory")
+
+        return functools.partial(AlpacaTradingEnvironmentPPO, config=self._config)
+
+    def build_advantage_module(self, critic_module: ValueOperator) -> GAE:
+        return GAE(
             gamma=self._config.gamma,
             lmbda=self._config.gae_lambda,
             value_network=critic_module,
@@ -103,52 +308,75 @@ class AlpacaTradingPPONeuralNetwork:
             device=self._device,
         )
 
-        loss_module: ClipPPOLoss = ClipPPOLoss(
+    def build_loss_module(self, actor_module: ProbabilisticActor, critic_module: ValueOperator) -> ClipPPOLoss:
+        return ClipPPOLoss(
             actor_network=actor_module,
             critic_network=critic_module,
-            clip_epsilon=self._config.epsilon,
+            clip_epsilon=self._config.clip_epsilon,
             entropy_bonus=True,
-            entropy_coef=self._config.entropy_coefficient,
-            critic_coef=1.0,
+            entropy_coeff=self._config.entropy_coefficient,
+            critic_coeff=1.0,
             loss_critic_type="smooth_l1",
         )
 
-        optimizer = torch.optim.Adam(loss_module.parameters(), lr=self._config.learning_rate)
+    def _update_policy(self, tensordict_data: TensorDictBase, advantage_module: GAE, loss_module: ClipPPOLoss,
+                       optimizer: torch.optim.Optimizer, replay_buffer: ReplayBuffer) -> None:
 
-        logs: dict[str, list[float]] = defaultdict(list)
-        progress_bar = tqdm(total=self._config.max_batches)
+        if self._config.device_resident_rollouts:
+            self._update_policy_device_resident(tensordict_data=tensordict_data, advantage_module=advantage_module,
+                                                loss_module=loss_module, optimizer=optimizer)
+            return
 
-        for batch_index, tensordict_data in enumerate(collector):
-            for _ in range(self._config.num_epochs):
-                advantage_module(tensordict_data)
+        for _ in range(self._config.num_epochs):
+            advantage_module(tensordict_data)
 
-                rollout_view = tensordict_data.reshape(-1)
-                replay_buffer.empty()
-                replay_buffer.extend(rollout_view.cpu())
+            rollout_view = tensordict_data.reshape(-1)
+            replay_buffer.empty()
+            replay_buffer.extend(rollout_view.cpu())
 
-                num_mini_batches = self._config.max_batch_size // self._config.sub_batch_size
+            num_mini_batches = self._config.max_batch_size // self._config.sub_batch_size
 
-                for _ in range(num_mini_batches):
-                    subdata = replay_buffer.sample(self._config.sub_batch_size)
-                    subdata = subdata.to(self._device)
+            for _ in range(num_mini_batches):
+                subdata = replay_buffer.sample(self._config.sub_batch_size)
+                subdata = subdata.to(self._device)
 
-                    loss_values = loss_module(subdata)
-                    total_loss = (
-                            loss_values["loss_objective"]
-                            + loss_values["loss_critic"]
-                            + loss_values["loss_entropy"]
-                    )
+                self._optimize_mini_batch(subdata=subdata, loss_module=loss_module, optimizer=optimizer)
 
-                    optimizer.zero_grad()
-                    total_loss.backward()
-                    torch.nn.utils.clip_grad_norm_(loss_module.parameters(), self._config.max_gradient_norm)
-                    optimizer.step()
+    def _update_policy_device_resident(self, tensordict_data: TensorDictBase, advantage_module: GAE,
+                                       loss_module: ClipPPOLoss, optimizer: torch.optim.Optimizer) -> None:
+        """
+        Computes advantages once for the collected batch and draws every epoch's minibatches as slices of a random
+        permutation of the rollout, which stays on the training device throughout.
+        """
 
-            mean_reward = float(tensordict_data["next", "reward"].mean().item())
-            logs["reward"].append(mean_reward)
+        with torch.no_grad():
+            advantage_module(tensordict_data)
 
-            progress_bar.update(tensordict_data.numel())
-            progress_bar.set_description(f"batch={batch_index} reward={mean_reward:.6f}")
+        rollout_view: TensorDictBase = tensordict_data.reshape(-1).to(self._device)
+        num_frames: int = rollout_view.shape[0]
+        num_mini_batches: int = num_frames // self._config.sub_batch_size
 
-        self._logger.info("Training finished.")
-        self._logger.info(f"Collected {len(logs['reward'])} reward entries.")
+        for _ in range(self._config.num_epochs):
+            permutation_tensor: Tensor = torch.randperm(num_frames, device=self._device)
+
+            for mini_batch_index in range(num_mini_batches):
+                mini_batch_index_tensor: Tensor = permutation_tensor[
+                    mini_batch_index * self._config.sub_batch_size:(mini_batch_index + 1) * self._config.sub_batch_size]
+
+                self._optimize_mini_batch(subdata=rollout_view[mini_batch_index_tensor], loss_module=loss_module,
+                                          optimizer=optimizer)
+
+    def _optimize_mini_batch(self, subdata: TensorDictBase, loss_module: ClipPPOLoss,
+                             optimizer: torch.optim.Optimizer) -> None:
+
+        loss_values = loss_module(subdata)
+        total_loss = (
+                loss_values["loss_objective"]
+                + loss_values["loss_critic"]
+                + loss_values["loss_entropy"]
+        )
+
+        optimizer.zero_grad()
+        total_loss.backward()
+        torch.nn.utils.clip_grad_norm_(loss_module.parameters(), self._config.max_gradient_norm)
+        optimizer.step()
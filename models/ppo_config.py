@@ -3,10 +3,16 @@ from dataclasses import dataclass
 
 @dataclass
 class PPOConfig:
+    # Per-ticker account features, the rolling price features of each window are appended after them
     observation_dimension: int = 28
+    rolling_feature_window_tuple: tuple[int, ...] = (5, 15, 60)
     action_dimension: int = 7
 
     hidden_size: int = 256
+    num_hidden_layers: int = 2
+    activation: str = "tanh"
+    share_actor_critic_trunk: bool = False
+    compile_mode: str | None = None
     learning_rate: float = 3e-4
     max_gradient_norm: float = 1.0
 
@@ -14,6 +20,7 @@ class PPOConfig:
     max_batches: int = 50_000
     sub_batch_size: int = 128
     num_epochs: int = 10
+    device_resident_rollouts: bool = True
 
     gamma: float = 0.99
     gae_lambda: float = 0.95
@@ -21,4 +28,22 @@ class PPOConfig:
     entropy_coefficient: float = 1e-4
 
     cost_coefficient: float = 1e-3
-    epsilon: float = 1e-12
\ No newline at end of file
+    epsilon: float = 1e-12
+
+    historical_data_directory: str | None = None
+    initial_cash: float = 100_000.0
+    num_environments: int = 64
+
+    num_collector_workers: int = 1
+    collector_mode: str = "sync"
+    collector_seed: int = 0
+
+    checkpoint_directory: str | None = None
+    checkpoint_interval_batches: int = 50
+    max_checkpoints_to_keep: int = 3
+    resume_from_checkpoint: bool = False
+
+    portfolio_state_max_staleness_seconds: float = 300.0
+    rebalance_min_trade_value: float = 1.0
+    rebalance_lot_size: float = 1.0
+    rebalance_sell_fill_timeout_seconds: float = 5.0
@@ -0,0 +1,83 @@
+import torch
+from tensordict.nn import NormalParamExtractor
+from torch import nn
+
+from models.ppo_config import PPOConfig
+
+
+class PPONetworkBuilder:
+    """
+    Builds the actor and critic networks from PPOConfig: num_hidden_layers Linear and activation blocks of
+    hidden_size units followed by a linear head. With share_actor_critic_trunk both networks run the same hidden
+    blocks, so the critic loss also trains the features the actor sees.
+    """
+
+    ACTIVATION_CLASS_DICT: dict[str, type[nn.Module]] = {
+        "tanh": nn.Tanh,
+        "relu": nn.ReLU,
+        "elu": nn.ELU,
+        "gelu": nn.GELU,
+        "silu": nn.SiLU,
+    }
+
+    def __init__(self, config: PPOConfig, device: torch.device) -> None:
+        self._config: PPOConfig = config
+        self._device: torch.device = device
+        self._shared_trunk_network: nn.Sequential | None = None
+
+        if config.activation not in self.ACTIVATION_CLASS_DICT:
+            raise ValueError(f"Unsupported activation: {config.activation}, expected one of "
+                             f"{sorted(self.ACTIVATION_CLASS_DICT)}")
+
+    def build_actor_network(self, input_dimension: int) -> nn.Sequential:
+        actor_network: nn.Sequential = nn.Sequential(
+            self._get_trunk_network(input_dimension=input_dimension),
+            nn.Linear(in_features=self._get_trunk_output_dimension(input_dimension=input_dimension),
+                      out_features=2 * self._config.action_dimension, device=self._device),
+            NormalParamExtractor(),
+        )
+
+        return self._compile(network=actor_network)
+
+    def build_critic_network(self, input_dimension: int) -> nn.Sequential:
+        critic_network: nn.Sequential = nn.Sequential(
+            self._get_trunk_network(input_dimension=input_dimension),
+            nn.Linear(in_features=self._get_trunk_output_dimension(input_dimension=input_dimension), out_features=1,
+                      device=self._device),
+        )
+
+        return self._compile(network=critic_network)
+
+    def _get_trunk_network(self, input_dimension: int) -> nn.Sequential:
+
+        if not self._config.share_actor_critic_trunk:
+            return self._build_trunk_network(input_dimension=input_dimension)
+
+        if self._shared_trunk_network is None:
+            self._shared_trunk_network = self._build_trunk_network(input_dimension=input_dimension)
+
+        return self._shared_trunk_network
+
+    def _build_trunk_network(self, input_dimension: int) -> nn.Sequential:
+
+        layer_list: list[nn.Module] = []
+        in_features: int = input_dimension
+
+        for _ in range(self._config.num_hidden_layers):
+            layer_list.append(nn.Linear(in_features=in_features, out_features=self._config.hidden_size,
+                                        device=self._device))
+            layer_list.append(self.ACTIVATION_CLASS_DICT[self._config.activation]())
+            in_features = self._config.hidden_size
+
+        return nn.Sequential(*layer_list)
+
+    def _get_trunk_output_dimension(self, input_dimension: int) -> int:
+        return self._config.hidden_size if self._config.num_hidden_layers > 0 else input_dimension
+
+    def _compile(self, network: nn.Sequential) -> nn.Sequential:
+
+        # Compiled in place so parameter names, and with them checkpoints, match eager networks
+        if self._config.compile_mode is not None:
+            network.compile(mode=self._config.compile_mode)
+
+        return network
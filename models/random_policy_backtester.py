@@ -0,0 +1,171 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from alpaca.trading.enums import OrderSide
+
+from data_extraction.historical_stock_data_loader import HistoricalMarketData, HistoricalStockDataLoader
+from logger.logger import AppLogger
+from utils.constants import Constants
+
+
+@dataclass(frozen=True)
+class RandomPolicyBacktestResult:
+    """
+    Outcome of every simulated portfolio, shaped [num_portfolios], with equity quantiles across portfolios after
+    every replayed bar, shaped [num_bars, len(RandomPolicyBacktester.EQUITY_QUANTILE_TUPLE)].
+    """
+    initial_cash: float
+    terminal_equity_array: np.ndarray
+    max_drawdown_array: np.ndarray
+    num_filled_orders_array: np.ndarray
+    equity_quantile_array: np.ndarray
+
+    @property
+    def terminal_return_array(self) -> np.ndarray:
+        return self.terminal_equity_array / self.initial_cash - 1.0
+
+    def get_return_percentile(self, total_return: float) -> float:
+        """
+        Share of random portfolios that did no better than total_return, e.g. a PPO run over the same bars.
+        """
+        return float(np.mean(self.terminal_return_array <= total_return))
+
+    def get_summary_dict(self) -> dict[str, float]:
+
+        terminal_return_array: np.ndarray = self.terminal_return_array
+
+        return {
+            "num_portfolios": float(len(terminal_return_array)),
+            "mean_terminal_return": float(terminal_return_array.mean()),
+            "terminal_return_std": float(terminal_return_array.std(ddof=1)) if len(terminal_return_array) > 1 else 0.0,
+            "terminal_return_p05": float(np.quantile(terminal_return_array, 0.05)),
+            "terminal_return_p50": float(np.quantile(terminal_return_array, 0.50)),
+            "terminal_return_p95": float(np.quantile(terminal_return_array, 0.95)),
+            "probability_of_loss": float(np.mean(terminal_return_array < 0.0)),
+            "mean_max_drawdown": float(self.max_drawdown_array.mean()),
+            "max_drawdown_p05": float(np.quantile(self.max_drawdown_array, 0.05)),
+            "mean_filled_orders": float(self.num_filled_orders_array.mean()),
+        }
+
+
+class RandomPolicyBacktester:
+    """
+    Replays historical minute bars through many independent copies of AlpacaTradingEnvironmentRandomPolicy at once.
+    Every step follows the live loop: top up any ticker not held with one share, draw HOLD, BUY or SELL, and when
+    trading give every held ticker a random side sized as ceil(randint(1, max_quantity) / 2), with the cash checks
+    of _is_buy_side_order and _is_sell_side_order.
+
+    The live loop takes one step per streamed bar and every minute streams a bar per ticker, so by default each
+    minute is num_tickers steps. Orders fill at the minute's close without costs, sells before buys, and a buy that
+    no longer fits the remaining cash is rejected as the broker would.
+    """
+
+    EQUITY_QUANTILE_TUPLE: tuple[float, ...] = (0.05, 0.25, 0.50, 0.75, 0.95)
+    # Taken from the live action lists so the backtest follows any change to the policy it reproduces
+    TRADING_ACTION_PROBABILITY: float = sum(action != "HOLD" for action in Constants.ACTIONS_LIST) / len(
+        Constants.ACTIONS_LIST)
+    SELL_SIDE_PROBABILITY: float = Constants.ORDER_SIDE_ACTIONS_LIST.count(OrderSide.SELL) / len(
+        Constants.ORDER_SIDE_ACTIONS_LIST)
+
+    def __init__(self, market_data: HistoricalMarketData, num_portfolios: int = 10_000,
+                 initial_cash: float = 100_000.0, steps_per_bar: int | None = None, seed: int = 0) -> None:
+        self._market_data: HistoricalMarketData = market_data
+        self._num_portfolios: int = num_portfolios
+        self._initial_cash: float = initial_cash
+        self._steps_per_bar: int = steps_per_bar or market_data.num_tickers
+        self._random_generator: np.random.Generator = np.random.default_rng(seed)
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    def run(self, start_session_index: int = 0, num_sessions: int | None = None) -> RandomPolicyBacktestResult:
+        """
+        Replays num_sessions consecutive sessions (all remaining by default) with positions carried overnight, as
+        the paper account carries them between live runs.
+        """
+
+        session_bounds_list: list[tuple[int, int]] = self._market_data.get_session_bounds_list()[
+            start_session_index:None if num_sessions is None else start_session_index + num_sessions]
+
+        if not session_bounds_list:
+            raise ValueError("No trading sessions to replay in the historical market data")
+
+        close_prices: np.ndarray = self._market_data.close_prices[session_bounds_list[0][0]:session_bounds_list[-1][1]]
+
+        cash_array: np.ndarray = np.full(self._num_portfolios, self._initial_cash, dtype=np.float64)
+        # Ticker-major so every per-ticker slice in _step is contiguous
+        holdings_array: np.ndarray = np.zeros((self._market_data.num_tickers, self._num_portfolios), dtype=np.float64)
+        num_filled_orders_array: np.ndarray = np.zeros(self._num_portfolios, dtype=np.int64)
+        running_max_equity_array: np.ndarray = cash_array.copy()
+        max_drawdown_array: np.ndarray = np.zeros(self._num_portfolios, dtype=np.float64)
+        equity_quantile_array: np.ndarray = np.empty((len(close_prices), len(self.EQUITY_QUANTILE_TUPLE)),
+                                                     dtype=np.float64)
+
+        for bar_index, price_array in enumerate(close_prices):
+            for _ in range(self._steps_per_bar):
+                self._step(cash_array=cash_array, holdings_array=holdings_array, price_array=price_array,
+                           num_filled_orders_array=num_filled_orders_array)
+
+            equity_array: np.ndarray = cash_array + price_array @ holdings_array
+
+            np.maximum(running_max_equity_array, equity_array, out=running_max_equity_array)
+            np.minimum(max_drawdown_array, equity_array / running_max_equity_array - 1.0, out=max_drawdown_array)
+            equity_quantile_array[bar_index] = np.quantile(equity_array, self.EQUITY_QUANTILE_TUPLE)
+
+        self.logger.info(f"Replayed {len(close_prices):,} bars over {len(session_bounds_list)} session(s) for "
+                         f"{self._num_portfolios:,} random portfolios")
+
+        return RandomPolicyBacktestResult(initial_cash=self._initial_cash, terminal_equity_array=equity_array,
+                                          max_drawdown_array=max_drawdown_array,
+                                          num_filled_orders_array=num_filled_orders_array,
+                                          equity_quantile_array=equity_quantile_array)
+
+    def _step(self, cash_array: np.ndarray, holdings_array: np.ndarray, price_array: np.ndarray,
+              num_filled_orders_array: np.ndarray) -> None:
+
+        num_tickers: int = len(price_array)
+        uniform_array: np.ndarray = self._random_generator.random((1 + 2 * num_tickers, self._num_portfolios))
+
+        # Orders are sized from the account snapshot taken before the top-up buys go through
+        sizing_cash_array: np.ndarray = cash_array.copy()
+
+        for ticker_index in np.flatnonzero((holdings_array == 0.0).any(axis=1)):
+            is_filled_array: np.ndarray = (holdings_array[ticker_index] == 0.0) & (
+                    cash_array >= price_array[ticker_index])
+            cash_array -= is_filled_array * price_array[ticker_index]
+            holdings_array[ticker_index] += is_filled_array
+            num_filled_orders_array += is_filled_array
+
+        is_trading_array: np.ndarray = uniform_array[0] < self.TRADING_ACTION_PROBABILITY
+        is_held_array: np.ndarray = holdings_array > 0.0
+        is_sell_side_array: np.ndarray = uniform_array[1:1 + num_tickers] < self.SELL_SIDE_PROBABILITY
+        is_sell_array: np.ndarray = is_trading_array & is_held_array & is_sell_side_array
+        is_buy_array: np.ndarray = is_trading_array & is_held_array & ~is_sell_side_array
+        quantity_uniform_array: np.ndarray = uniform_array[1 + num_tickers:]
+
+        # ceil(randint(1, max_quantity) / 2) == floor(floor(u * max_quantity) / 2) + 1 for max_quantity >= 1
+        sell_quantity_array: np.ndarray = np.floor(np.floor(quantity_uniform_array * holdings_array) * 0.5) + 1.0
+        sell_quantity_array *= is_sell_array
+
+        holdings_array -= sell_quantity_array
+        cash_array += price_array @ sell_quantity_array
+        num_filled_orders_array += is_sell_array.sum(axis=0)
+
+        max_buy_quantity_array: np.ndarray = np.floor(sizing_cash_array / price_array[:, None])
+        buy_quantity_array: np.ndarray = np.floor(np.floor(quantity_uniform_array * max_buy_quantity_array) * 0.5) + 1.0
+        buy_quantity_array *= is_buy_array & (max_buy_quantity_array > 0.0)
+
+        for ticker_index in range(num_tickers):
+            buy_cost_array: np.ndarray = buy_quantity_array[ticker_index] * price_array[ticker_index]
+            is_filled_array = (buy_cost_array > 0.0) & (buy_cost_array <= cash_array)
+            cash_array -= buy_cost_array * is_filled_array
+            holdings_array[ticker_index] += buy_quantity_array[ticker_index] * is_filled_array
+            num_filled_orders_array += is_filled_array
+
+
+if __name__ == "__main__":
+    random_policy_backtest_result: RandomPolicyBacktestResult = RandomPolicyBacktester(
+        market_data=HistoricalStockDataLoader(data_directory_path=Path("historical_stock_data/")).load_market_data()
+    ).run()
+
+    for summary_name, summary_value in random_policy_backtest_result.get_summary_dict().items():
+        AppLogger.get_logger(__name__).info(f"{summary_name:<24} {summary_value:>14,.6f}")
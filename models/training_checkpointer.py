@@ -0,0 +1,125 @@
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Any
+
+import torch
+from tensordict import TensorDictBase
+from torch import Tensor
+
+from logger.logger import AppLogger
+
+
+class TrainingCheckpointer:
+    """
+    Snapshots training state to CPU memory on the calling thread and hands it to a background thread, which writes
+    each checkpoint to a temporary file and renames it into place, so an interrupted write never leaves a
+    truncated checkpoint behind and training only waits for the in-memory copy.
+    """
+
+    CHECKPOINT_FILE_PREFIX: str = "checkpoint_"
+    CHECKPOINT_FILE_SUFFIX: str = ".pt"
+
+    def __init__(self, checkpoint_directory_path: Path, max_checkpoints_to_keep: int = 3,
+                 max_pending_checkpoints: int = 2) -> None:
+        self._checkpoint_directory_path: Path = checkpoint_directory_path
+        self._max_checkpoints_to_keep: int = max_checkpoints_to_keep
+        # Bounded so a slow disk throttles training instead of piling up snapshots in memory
+        self._pending_checkpoint_queue: queue.Queue[tuple[int, dict[str, Any]] | None] = queue.Queue(
+            maxsize=max_pending_checkpoints)
+        self._writer_thread: threading.Thread | None = None
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    def save(self, batch_index: int, checkpoint_dict: dict[str, Any]) -> None:
+
+        if self._writer_thread is None:
+            self._checkpoint_directory_path.mkdir(parents=True, exist_ok=True)
+            self._writer_thread = threading.Thread(target=self._run_writer, name="TrainingCheckpointWriter",
+                                                   daemon=True)
+            self._writer_thread.start()
+
+        self._pending_checkpoint_queue.put((batch_index, self._get_snapshot(checkpoint_dict)))
+
+    def load_latest(self) -> dict[str, Any] | None:
+
+        checkpoint_path_list: list[Path] = self.get_checkpoint_path_list()
+
+        if not checkpoint_path_list:
+            return None
+
+        self.logger.info(f"Loading checkpoint {checkpoint_path_list[-1]}")
+
+        # Checkpoints carry numpy and python RNG states, which the weights-only unpickler rejects
+        return torch.load(checkpoint_path_list[-1], map_location="cpu", weights_only=False)
+
+    def get_checkpoint_path_list(self) -> list[Path]:
+
+        if not self._checkpoint_directory_path.is_dir():
+            return []
+
+        # Zero padded batch indices sort chronologically
+        return sorted(self._checkpoint_directory_path.glob(
+            f"{self.CHECKPOINT_FILE_PREFIX}*{self.CHECKPOINT_FILE_SUFFIX}"))
+
+    def close(self) -> None:
+        """
+        Blocks until every queued checkpoint is on disk.
+        """
+
+        if self._writer_thread is None:
+            return
+
+        self._pending_checkpoint_queue.put(None)
+        self._writer_thread.join()
+        self._writer_thread = None
+
+    def _run_writer(self) -> None:
+
+        while (pending_checkpoint := self._pending_checkpoint_queue.get()) is not None:
+            batch_index, checkpoint_dict = pending_checkpoint
+
+            try:
+                self._write_checkpoint(batch_index=batch_index, checkpoint_dict=checkpoint_dict)
+                self._remove_old_checkpoints()
+            except Exception as e:
+                self.logger.error(f"Exception Thrown: {e}")
+
+    def _write_checkpoint(self, batch_index: int, checkpoint_dict: dict[str, Any]) -> None:
+
+        checkpoint_path: Path = self._checkpoint_directory_path / (
+            f"{self.CHECKPOINT_FILE_PREFIX}{batch_index:08d}{self.CHECKPOINT_FILE_SUFFIX}")
+        temporary_checkpoint_path: Path = checkpoint_path.with_suffix(checkpoint_path.suffix + ".tmp")
+
+        with open(temporary_checkpoint_path, "wb") as checkpoint_file:
+            torch.save(checkpoint_dict, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+
+        os.replace(temporary_checkpoint_path, checkpoint_path)
+
+        self.logger.info(f"Saved checkpoint {checkpoint_path}")
+
+    def _remove_old_checkpoints(self) -> None:
+
+        for checkpoint_path in self.get_checkpoint_path_list()[:-self._max_checkpoints_to_keep]:
+            checkpoint_path.unlink(missing_ok=True)
+
+    def _get_snapshot(self, value: Any) -> Any:
+        """
+        Copies every tensor to CPU so later optimizer steps cannot change a checkpoint that is still being written.
+        """
+
+        if isinstance(value, Tensor):
+            return value.detach().to("cpu", copy=True)
+
+        if isinstance(value, TensorDictBase):
+            return value.detach().to("cpu").clone()
+
+        if isinstance(value, dict):
+            return {key: self._get_snapshot(item) for key, item in value.items()}
+
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._get_snapshot(item) for item in value)
+
+        return value
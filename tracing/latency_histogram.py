@@ -0,0 +1,53 @@
+import bisect
+import math
+
+
+class LatencyHistogram:
+    """
+    Fixed log-spaced buckets from 1us to 100s, 20 per decade, so recording is one bisect and memory does not grow
+    with the number of samples. Percentiles are interpolated inside the bucket they fall in.
+    """
+
+    BUCKET_UPPER_BOUNDS_SECONDS: list[float] = [10 ** (bucket_index / 20 - 6) for bucket_index in range(161)]
+
+    def __init__(self) -> None:
+        self._bucket_count_list: list[int] = [0] * (len(self.BUCKET_UPPER_BOUNDS_SECONDS) + 1)
+        self.count: int = 0
+        self.sum_seconds: float = 0.0
+        self.min_seconds: float = math.inf
+        self.max_seconds: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self._bucket_count_list[bisect.bisect_left(self.BUCKET_UPPER_BOUNDS_SECONDS, seconds)] += 1
+        self.count += 1
+        self.sum_seconds += seconds
+
+        if seconds < self.min_seconds:
+            self.min_seconds = seconds
+
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+
+    def get_percentile_seconds(self, percentile: float) -> float:
+
+        if self.count == 0:
+            return math.nan
+
+        target_rank: float = percentile / 100 * self.count
+        cumulative_count: int = 0
+
+        for bucket_index, bucket_count in enumerate(self._bucket_count_list):
+            if bucket_count == 0 or cumulative_count + bucket_count < target_rank:
+                cumulative_count += bucket_count
+                continue
+
+            lower_bound: float = self.BUCKET_UPPER_BOUNDS_SECONDS[bucket_index - 1] if bucket_index > 0 else 0.0
+            upper_bound: float = self.BUCKET_UPPER_BOUNDS_SECONDS[bucket_index] if bucket_index < len(
+                self.BUCKET_UPPER_BOUNDS_SECONDS) else self.max_seconds
+            bucket_fraction: float = (target_rank - cumulative_count) / bucket_count
+
+            # Clamped to the observed range so sparse histograms do not report values never seen
+            return min(max(lower_bound + bucket_fraction * (upper_bound - lower_bound), self.min_seconds),
+                       self.max_seconds)
+
+        return self.max_seconds
@@ -0,0 +1,241 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import nullcontext, AbstractContextManager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+from torch import nn
+
+from config.config import settings
+from logger.logger import AppLogger
+from tracing.latency_histogram import LatencyHistogram
+
+
+class _LatencySpan:
+    __slots__ = ("_latency_tracer", "_phase_name", "_start_time_ns")
+
+    def __init__(self, latency_tracer: "LatencyTracer", phase_name: str) -> None:
+        self._latency_tracer: LatencyTracer = latency_tracer
+        self._phase_name: str = phase_name
+        self._start_time_ns: int = 0
+
+    def __enter__(self) -> "_LatencySpan":
+        self._start_time_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._latency_tracer.record(self._phase_name, (time.perf_counter_ns() - self._start_time_ns) / 1e9)
+
+
+class LatencyTracer:
+    """
+    Process-wide per-phase latency histograms. span() and trace() return a shared no-op when tracing is disabled,
+    so instrumented code pays one attribute check. When enabled, the percentiles can be dumped periodically in
+    Prometheus text format to a file, served on /metrics, or both.
+    """
+
+    _latency_tracer: "LatencyTracer | None" = None
+    _NULL_SPAN: nullcontext = nullcontext()
+    PERCENTILE_LIST: list[float] = [50.0, 95.0, 99.0]
+
+    def __init__(self, is_enabled: bool = False, dump_path: Path | None = None, dump_interval_seconds: float = 60.0,
+                 metrics_port: int | None = None) -> None:
+        self.is_enabled: bool = is_enabled
+        self._dump_path: Path | None = dump_path
+        self._dump_interval_seconds: float = dump_interval_seconds
+        self._metrics_port: int | None = metrics_port
+        self._lock: threading.Lock = threading.Lock()
+        self._latency_histogram_dict: dict[str, LatencyHistogram] = {}
+        self._stop_event: threading.Event = threading.Event()
+        self._dump_thread: threading.Thread | None = None
+        self._metrics_http_server: ThreadingHTTPServer | None = None
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    @classmethod
+    def get_tracer(cls) -> "LatencyTracer":
+
+        if cls._latency_tracer is None:
+            cls._latency_tracer = LatencyTracer(
+                is_enabled=settings.latency_tracing_enabled,
+                dump_path=Path(settings.latency_trace_dump_path) if settings.latency_trace_dump_path else None,
+                dump_interval_seconds=settings.latency_trace_dump_interval_seconds,
+                metrics_port=settings.latency_trace_metrics_port)
+
+        return cls._latency_tracer
+
+    def span(self, phase_name: str) -> AbstractContextManager:
+
+        if not self.is_enabled:
+            return self._NULL_SPAN
+
+        return _LatencySpan(latency_tracer=self, phase_name=phase_name)
+
+    def trace(self, phase_name: str) -> Callable[[Callable], Callable]:
+
+        def decorator(function: Callable) -> Callable:
+
+            if inspect.iscoroutinefunction(function):
+                @functools.wraps(function)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    with self.span(phase_name=phase_name):
+                        return await function(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(function)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(phase_name=phase_name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def instrument_module(self, module: nn.Module, phase_name: str) -> None:
+        """
+        Times every forward call of a module, e.g. a policy driven by a collector, through forward hooks.
+        """
+
+        if not self.is_enabled:
+            return
+
+        start_time_ns_list: list[int] = []
+
+        module.register_forward_pre_hook(lambda *_: start_time_ns_list.append(time.perf_counter_ns()))
+        module.register_forward_hook(lambda *_: self.record(
+            phase_name=phase_name, seconds=(time.perf_counter_ns() - start_time_ns_list.pop()) / 1e9))
+
+    def record(self, phase_name: str, seconds: float) -> None:
+        with self._lock:
+            latency_histogram: LatencyHistogram | None = self._latency_histogram_dict.get(phase_name)
+
+            if latency_histogram is None:
+                latency_histogram = self._latency_histogram_dict[phase_name] = LatencyHistogram()
+
+            latency_histogram.record(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency_histogram_dict = {}
+
+    def get_summary_dict(self) -> dict[str, dict[str, float]]:
+
+        with self._lock:
+            return {
+                phase_name: {
+                    "count": latency_histogram.count,
+                    "mean_seconds": latency_histogram.sum_seconds / latency_histogram.count,
+                    **{f"p{percentile:g}_seconds": latency_histogram.get_percentile_seconds(percentile=percentile)
+                       for percentile in self.PERCENTILE_LIST},
+                    "max_seconds": latency_histogram.max_seconds,
+                }
+                for phase_name, latency_histogram in sorted(self._latency_histogram_dict.items())
+            }
+
+    def get_prometheus_text(self) -> str:
+
+        line_list: list[str] = [
+            "# HELP trading_phase_latency_seconds Latency of each trading step phase.",
+            "# TYPE trading_phase_latency_seconds summary",
+        ]
+
+        with self._lock:
+            for phase_name, latency_histogram in sorted(self._latency_histogram_dict.items()):
+                for percentile in self.PERCENTILE_LIST:
+                    line_list.append(f'trading_phase_latency_seconds{{phase="{phase_name}",'
+                                     f'quantile="{percentile / 100:g}"}} '
+                                     f'{latency_histogram.get_percentile_seconds(percentile=percentile):.9f}')
+
+                line_list.append(f'trading_phase_latency_seconds_sum{{phase="{phase_name}"}} '
+                                 f'{latency_histogram.sum_seconds:.9f}')
+                line_list.append(f'trading_phase_latency_seconds_count{{phase="{phase_name}"}} '
+                                 f'{latency_histogram.count}')
+
+        return "\n".join(line_list) + "\n"
+
+    def start(self) -> None:
+
+        if not self.is_enabled:
+            return
+
+        if self._dump_path is not None and self._dump_thread is None:
+            self._stop_event.clear()
+            self._dump_thread = threading.Thread(target=self._run_periodic_dump, name="LatencyTracerDump",
+                                                 daemon=True)
+            self._dump_thread.start()
+
+        if self._metrics_port is not None and self._metrics_http_server is None:
+            self._metrics_http_server = ThreadingHTTPServer(("0.0.0.0", self._metrics_port),
+                                                            self._get_request_handler_class())
+            self._metrics_http_server.daemon_threads = True
+            threading.Thread(target=self._metrics_http_server.serve_forever, name="LatencyTracerMetrics",
+                             daemon=True).start()
+
+            self.logger.info(f"Latency metrics served on port {self._metrics_http_server.server_address[1]}/metrics")
+
+    def stop(self) -> None:
+
+        if self._dump_thread is not None:
+            self._stop_event.set()
+            self._dump_thread.join(timeout=10)
+            self._dump_thread = None
+
+        if self._metrics_http_server is not None:
+            self._metrics_http_server.shutdown()
+            self._metrics_http_server.server_close()
+            self._metrics_http_server = None
+
+    def dump(self) -> None:
+
+        if self._dump_path is not None:
+            self._dump_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_dump_path: Path = self._dump_path.with_suffix(self._dump_path.suffix + ".tmp")
+            temporary_dump_path.write_text(self.get_prometheus_text(), encoding="utf-8")
+
+            # Scrapers never see a half written file
+            os.replace(temporary_dump_path, self._dump_path)
+
+        for phase_name, summary_dict in self.get_summary_dict().items():
+            self.logger.info(f"{phase_name:<36} n={summary_dict['count']:>8,} "
+                             f"p50 {summary_dict['p50_seconds'] * 1e3:>9,.3f}ms "
+                             f"p95 {summary_dict['p95_seconds'] * 1e3:>9,.3f}ms "
+                             f"p99 {summary_dict['p99_seconds'] * 1e3:>9,.3f}ms")
+
+    def _run_periodic_dump(self) -> None:
+
+        while not self._stop_event.wait(timeout=self._dump_interval_seconds):
+            try:
+                self.dump()
+            except Exception as e:
+                self.logger.warning(f"Exception Thrown: {e}")
+
+        self.dump()
+
+    def _get_request_handler_class(self) -> type[BaseHTTPRequestHandler]:
+
+        latency_tracer: LatencyTracer = self
+
+        class LatencyMetricsRequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None:
+
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+
+                response_body: bytes = latency_tracer.get_prometheus_text().encode("utf-8")
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(response_body)))
+                self.end_headers()
+                self.wfile.write(response_body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return LatencyMetricsRequestHandler
@@ -1,6 +1,4 @@
 import asyncio
-import queue
-from collections import deque
 from datetime import time, datetime
 from pathlib import Path
 from typing import Any
@@ -14,36 +12,48 @@ from alpaca.data.historical import StockHistoricalDataClient
 from alpaca.trading import Position
 from alpaca.trading.client import TradingClient
 from alpaca.trading.enums import OrderSide, TimeInForce, OrderType
-from alpaca.trading.models import Order
 from alpaca.trading.requests import MarketOrderRequest
 from torch import Tensor
 
 from config.config import settings
 from logger.logger import AppLogger
+from trading_account.batch_order_executor import BatchOrderExecutor, OrderSubmissionResult
+from trading_account.portfolio_observation_builder import PortfolioObservationBuilder
+from trading_account.portfolio_state_cache import PortfolioStateCache
+from trading_account.target_weight_rebalancer import RebalanceOrderPlan, TargetWeightRebalancer
+from utils.alpaca_client_factory import AlpacaClientFactory
 from utils.constants import Constants
 from utils.trading_activity_csv_writer import TradingActivityCsvWriter
 
 
 class AlpacaTradingPortfolio:
 
-    def __init__(self, device, trading_client: TradingClient) -> None:
+    def __init__(self, device, trading_client: TradingClient,
+                 portfolio_state_cache: PortfolioStateCache | None = None,
+                 target_weight_rebalancer: TargetWeightRebalancer | None = None,
+                 sell_fill_timeout_seconds: float = 5.0) -> None:
         self._device = device
         self._cost_coefficient: float = 0.001
         self._base_directory: Path = Path.cwd()
         self._api_key_ppo: str = settings.api_key_ppo
-        self._bar_queue: queue.Queue[dict] = queue.Queue()
-        self._bar_history: deque[dict] = deque(maxlen=5000)
-        self._latest_bar_dict: dict[str, Any] | None = None
         self._trading_client: TradingClient = trading_client
+        self._portfolio_state_cache: PortfolioStateCache = portfolio_state_cache or PortfolioStateCache(
+            trading_client=trading_client)
+        self._portfolio_observation_builder: PortfolioObservationBuilder = PortfolioObservationBuilder()
+        self._batch_order_executor: BatchOrderExecutor = BatchOrderExecutor(trading_client=trading_client)
+        self._target_weight_rebalancer: TargetWeightRebalancer = target_weight_rebalancer or TargetWeightRebalancer(
+            min_trade_value=1.0, lot_size=1.0)
+        self._sell_fill_timeout_seconds: float = sell_fill_timeout_seconds
+        self._ticker_symbol_to_index_dict: dict[str, int] = {ticker_symbol: ticker_index for ticker_index, ticker_symbol
+                                                             in enumerate(Constants.TICKER_SYMBOL_LIST)}
         self._action_space: list[str] = Constants.ACTIONS_LIST
         self._first_bar_event: asyncio.Event = asyncio.Event()
         self._close_of_market_time: time = time(16, 0)
         self._api_secret_key_ppo: str = settings.api_secret_key_ppo
         self._trading_csv_writer: TradingActivityCsvWriter = TradingActivityCsvWriter(_base_dir=self._base_directory)
 
-        self._historical_trading_client: StockHistoricalDataClient = StockHistoricalDataClient(
-            api_key=self._api_key_ppo,
-            secret_key=self._api_secret_key_ppo)
+        self._historical_trading_client: StockHistoricalDataClient = AlpacaClientFactory.get_stock_historical_data_client(
+            api_key=self._api_key_ppo, secret_key=self._api_secret_key_ppo)
         self.logger = AppLogger.get_logger(self.__class__.__name__)
 
     def get_portfolio_weights_tensor(self, per_ticker_array: np.ndarray) -> Tensor:
@@ -57,12 +67,8 @@ class AlpacaTradingPortfolio:
     def get_observation_tensor(self, all_positions_list: list[Position],
                                account_dict: dict[str, float]) -> Tensor:
 
-        matrix_list: list[list[float]] = self._get_matrix_list(all_positions_list_t=all_positions_list,
-                                                               account_dict_t=account_dict)
-
-        matrix_tensor: Tensor = torch.tensor(matrix_list)
-
-        observation_tensor: Tensor = matrix_tensor.view(-1)
+        observation_tensor: Tensor = self._portfolio_observation_builder.get_observation_tensor(
+            all_positions_list=all_positions_list, account_dict=account_dict).to(device=self._device, copy=True)
 
         return observation_tensor
 
@@ -83,25 +89,79 @@ class AlpacaTradingPortfolio:
     #     return observation_tensor, per_ticker_array
 
     def get_account_dict(self) -> dict[str, Any]:
+        return self._portfolio_state_cache.get_account_dict()
+
+    def get_all_positions(self) -> list[Position]:
+        return self._portfolio_state_cache.get_all_positions()
+
+    def rebalance_to_target_weights(self, target_weights_array: np.ndarray,
+                                    current_prices_array: np.ndarray) -> list[OrderSubmissionResult]:
+
+        account_dict: dict[str, float] = self.get_account_dict()
+        holdings_array: np.ndarray = np.zeros(len(Constants.TICKER_SYMBOL_LIST), dtype=np.float64)
+
+        for position_obj in self.get_all_positions():
+            ticker_index: int | None = self._ticker_symbol_to_index_dict.get(position_obj.symbol)
+
+            if ticker_index is not None:
+                holdings_array[ticker_index] = float(position_obj.qty)
+
+        rebalance_order_plan: RebalanceOrderPlan = self._target_weight_rebalancer.get_order_plan(
+            holdings_array=holdings_array, prices_array=current_prices_array,
+            target_weights_array=target_weights_array, cash=account_dict.get("cash", 0.0))
+
+        order_submission_result_list: list[OrderSubmissionResult] = self._submit_market_orders(
+            order_quantity_array=rebalance_order_plan.order_quantity_array,
+            order_index_array=rebalance_order_plan.sell_index_array)
 
-        account_dict: dict[str, Any] = self._trading_client.get_account().model_dump()
+        if not len(rebalance_order_plan.buy_index_array):
+            return order_submission_result_list
 
-        result_dict: dict[str, Any] = {
+        # An acknowledged sell has not filled yet, so buys wait for the fills and are then budgeted against the cash
+        # the account actually holds, which leaves out the proceeds of any sell still open when the wait times out
+        sell_order_id_list: list[str] = [str(order_submission_result.order.id) for order_submission_result in
+                                         order_submission_result_list if order_submission_result.is_successful]
 
-            "cash": float(account_dict.get("cash", 0.0)),
-            "equity": float(account_dict.get("equity", 0.0)),
-            "buying_power": float(account_dict.get("buying_power", 0.0)),
-            "portfolio_value": float(account_dict.get("portfolio_value", 0.0)),
-            "daytrading_buying_power": float(account_dict.get("daytrading_buying_power", 0.0))
+        if sell_order_id_list and not self._portfolio_state_cache.wait_for_orders_closed(
+                order_id_list=sell_order_id_list, timeout_seconds=self._sell_fill_timeout_seconds):
+            self.logger.warning(f"Sell orders still open after {self._sell_fill_timeout_seconds:,.1f}s, "
+                                f"budgeting buys without their proceeds")
 
-        }
+        account_dict = self.get_account_dict()
+        buy_quantity_array: np.ndarray = self._target_weight_rebalancer.fit_buys_to_cash(
+            order_quantity_array=np.where(rebalance_order_plan.order_quantity_array > 0,
+                                          rebalance_order_plan.order_quantity_array, 0.0),
+            prices_array=np.where(rebalance_order_plan.order_quantity_array > 0, current_prices_array, 1.0),
+            available_cash=min(account_dict.get("cash", 0.0), account_dict.get("buying_power", 0.0)))
 
-        return result_dict
+        order_submission_result_list.extend(self._submit_market_orders(
+            order_quantity_array=buy_quantity_array, order_index_array=np.flatnonzero(buy_quantity_array > 0)))
+
+        return order_submission_result_list
+
+    def _submit_market_orders(self, order_quantity_array: np.ndarray,
+                              order_index_array: np.ndarray) -> list[OrderSubmissionResult]:
+
+        market_order_request_list: list[MarketOrderRequest] = [
+            MarketOrderRequest(
+                symbol=Constants.TICKER_SYMBOL_LIST[order_index],
+                qty=abs(float(order_quantity_array[order_index])),
+                side=OrderSide.BUY if order_quantity_array[order_index] > 0 else OrderSide.SELL,
+                order_type=OrderType.MARKET,
+                time_in_force=TimeInForce.DAY
+            )
+            for order_index in order_index_array
+        ]
+
+        if not market_order_request_list:
+            return []
+
+        return self._batch_order_executor.submit_orders(order_request_list=market_order_request_list)
 
     def balance_empty_portfolio(self) -> None:
 
         account_dict: dict[str, float] = self.get_account_dict()
-        all_positions_list: list[Position] = self._trading_client.get_all_positions()
+        all_positions_list: list[Position] = self.get_all_positions()
 
         try:
 
@@ -118,123 +178,28 @@ class AlpacaTradingPortfolio:
                 portfolio_value: float = account_dict.get("portfolio_value", 0.0)
                 investment_per_ticker_symbol: float = portfolio_value * 0.01
 
+                market_order_request_list: list[MarketOrderRequest] = []
+
                 for ticker_symbol_str in Constants.TICKER_SYMBOL_LIST:
                     stock_bid_price: float = float(latest_quotes[ticker_symbol_str].bid_price)
 
                     num_shares: float = investment_per_ticker_symbol / stock_bid_price
 
-                    market_order_request: MarketOrderRequest = MarketOrderRequest(
+                    market_order_request_list.append(MarketOrderRequest(
                         symbol=ticker_symbol_str,
                         qty=num_shares,
                         side=OrderSide.BUY,
                         order_type=OrderType.MARKET,
                         time_in_force=TimeInForce.DAY
-                    )
+                    ))
 
-                    market_order: Order = self._trading_client.submit_order(
-                        order_data=market_order_request
-                    )
+                self._batch_order_executor.submit_orders(order_request_list=market_order_request_list)
 
-                    self.logger.info(
-                        f"Successfully {market_order.side.name} {float(market_order.qty):,.2f} share(s) of {market_order.symbol}")
+                # Newly opened positions are not in the cached snapshot yet
+                self._portfolio_state_cache.invalidate()
 
         except Exception as e:
             self.logger.warning(f"Exception Thrown: {e}")
 
-    def _get_matrix_list(self, all_positions_list_t: list[Position], account_dict_t: dict[str, float]) -> list[
-        list[float]]:
-
-        matrix_list: list[list[float]] = []
-        ticker_features_list: list[str] = Constants.TICKER_FEATURES_LIST
-        positions_dict: dict[int, dict[str, float]] = self._get_positions_dict(
-            all_positions_list=all_positions_list_t, account_dict=account_dict_t)
-
-        for ticker_id_num in Constants.TICKER_SYMBOL_TO_ID.values():
-            ticker_dict: dict[str, float] = positions_dict.get(ticker_id_num, {})
-
-            matrix_row_list: list[float] = []
-
-            for feature_str in ticker_features_list:
-                feature_value: float | Any = ticker_dict.get(feature_str, 0.0)
-                matrix_row_list.append(float(feature_value))
-
-            matrix_list.append(matrix_row_list)
-
-        return matrix_list
-
-    def _get_positions_dict(self, all_positions_list: list[Position], account_dict: dict[str, float]) -> dict[
-        int, dict[str, float]]:
-
-        positions_dict: dict[int, dict[str, float]] = {}
-
-        self._populate_missing_ticker_entries(all_positions_list=all_positions_list, account_dict=account_dict,
-                                              positions_dict=positions_dict)
-
-        for position_obj in all_positions_list:
-            ticker_symbol_str: str = position_obj.symbol
-
-            ticker_symbol_id: int = Constants.TICKER_SYMBOL_TO_ID.get(ticker_symbol_str, 99_999)
-
-            cash: float = account_dict.get("cash", 0.0)
-            buying_power: float = account_dict.get("buying_power", 0.0)
-            portfolio_value: float = account_dict.get("portfolio_value", 0.0)
-
-            market_value: float = float(position_obj.market_value)
-            qty_available: float = float(position_obj.qty_available)
-
-            cash_to_portfolio_value: float = cash / portfolio_value
-            portfolio_weight: float = market_value / portfolio_value
-            buying_power_to_portfolio_value: float = buying_power / portfolio_value
-            cost_basis_to_portfolio_value: float = float(position_obj.cost_basis) / portfolio_value
-            unrealized_pl_to_portfolio_value: float = float(position_obj.unrealized_pl) / portfolio_value
-
-            ticker_dict: dict[str, float] = {
-                "qty_available": qty_available,
-                "portfolio_value": portfolio_value,
-                "portfolio_weight": portfolio_weight,
-                "cash_to_portfolio_value": cash_to_portfolio_value,
-                "cost_basis_to_portfolio_value": cost_basis_to_portfolio_value,
-                "buying_power_to_portfolio_value": buying_power_to_portfolio_value,
-                "unrealized_pl_to_portfolio_value": unrealized_pl_to_portfolio_value,
-                "change_today": float(position_obj.change_today),
-            }
-
-            positions_dict[ticker_symbol_id] = ticker_dict
-
-        return positions_dict
-
-    def _populate_missing_ticker_entries(self, all_positions_list: list[Position], account_dict: dict[str, float],
-                                         positions_dict: dict[int, dict[str, float]]) -> None:
-
-        full_ticker_symbol_list: list[str] = Constants.TICKER_SYMBOL_LIST
-        positions_str_list: list[str] = self._get_positions_str_list(all_positions_list=all_positions_list)
-
-        for ticker_symbol_str in full_ticker_symbol_list:
-
-            if ticker_symbol_str not in positions_str_list:
-                ticker_symbol_id: int = Constants.TICKER_SYMBOL_TO_ID.get(ticker_symbol_str, 99_999)
-
-                cash: float = account_dict.get("cash", 0.0)
-                buying_power: float = account_dict.get("buying_power", 0.0)
-                portfolio_value: float = account_dict.get("portfolio_value", 0.0)
-
-                cash_to_portfolio_value: float = cash / portfolio_value
-                buying_power_to_portfolio_value: float = buying_power / portfolio_value
-
-                ticker_dict: dict[str, float] = {
-                    "qty_available": 0.0,
-                    "position_value": 0.0,
-                    "portfolio_weight": 0.0,
-                    "portfolio_value": portfolio_value,
-                    "cost_basis_to_portfolio_value": 0.0,
-                    "unrealized_pl_to_portfolio_value": 0.0,
-                    "cash_to_portfolio_value": cash_to_portfolio_value,
-                    "buying_power_to_portfolio_value": buying_power_to_portfolio_value,
-                    "change_today": 0.0,
-                }
-
-                positions_dict[ticker_symbol_id] = ticker_dict
-
-    def _get_positions_str_list(self, all_positions_list: list[Position]) -> list[str]:
-        positions_str_list: list[str] = [x.symbol for x in all_positions_list]
-        return positions_str_list
+    def close(self) -> None:
+        self._batch_order_executor.shutdown()
@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from alpaca.trading.client import TradingClient
+from alpaca.trading.models import Order
+from alpaca.trading.requests import OrderRequest
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+from logger.logger import AppLogger
+
+
+@dataclass(frozen=True)
+class OrderSubmissionResult:
+    order_request: OrderRequest
+    order: Order | None
+    error: Exception | None
+    latency_seconds: float
+
+    @property
+    def is_successful(self) -> bool:
+        return self.error is None
+
+
+class BatchOrderExecutor:
+    """
+    Submits every order for a step at once from a thread pool sharing the TradingClient's pooled HTTP session.
+    Each order succeeds or fails on its own and reports its submit-to-ack latency.
+    """
+
+    def __init__(self, trading_client: TradingClient, max_workers: int = 8) -> None:
+        self._trading_client: TradingClient = trading_client
+        self._max_workers: int = max_workers
+        self._thread_pool_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers,
+                                                                            thread_name_prefix="BatchOrderExecutor")
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+        self._resize_connection_pool()
+
+    def submit_orders(self, order_request_list: list[OrderRequest]) -> list[OrderSubmissionResult]:
+
+        order_submission_result_list: list[OrderSubmissionResult] = list(
+            self._thread_pool_executor.map(self._submit_order, order_request_list))
+
+        for order_submission_result in order_submission_result_list:
+            order_request: OrderRequest = order_submission_result.order_request
+
+            if order_submission_result.is_successful:
+                self.logger.info(
+                    f"Successfully {order_request.side.name} {float(order_request.qty):,.2f} share(s) of "
+                    f"{order_request.symbol} -> acknowledged in {order_submission_result.latency_seconds * 1e3:,.1f}ms")
+            else:
+                self.logger.warning(f"Exception Thrown: {order_request.side.name} {order_request.symbol} -> "
+                                    f"{order_submission_result.error}")
+
+        return order_submission_result_list
+
+    def shutdown(self) -> None:
+        self._thread_pool_executor.shutdown(wait=True)
+
+    def _resize_connection_pool(self) -> None:
+        """
+        requests keeps 10 connections per host by default, so more workers than that would queue on the pool.
+        alpaca-py exposes no public hook for its requests.Session, so this is the one place that reaches into the
+        private TradingClient._session; without it the executor still works with the default pool size.
+        """
+
+        session: Session | None = getattr(self._trading_client, "_session", None)
+
+        if not isinstance(session, Session):
+            self.logger.warning("TradingClient has no requests session to resize, using its default connection pool")
+            return
+
+        http_adapter: HTTPAdapter = HTTPAdapter(pool_connections=self._max_workers, pool_maxsize=self._max_workers)
+        session.mount("https://", http_adapter)
+        session.mount("http://", http_adapter)
+
+    def _submit_order(self, order_request: OrderRequest) -> OrderSubmissionResult:
+
+        start_time: float = time.perf_counter()
+
+        try:
+            order: Order = self._trading_client.submit_order(order_data=order_request)
+            return OrderSubmissionResult(order_request=order_request, order=order, error=None,
+                                         latency_seconds=time.perf_counter() - start_time)
+
+        except Exception as e:
+            return OrderSubmissionResult(order_request=order_request, order=None, error=e,
+                                         latency_seconds=time.perf_counter() - start_time)
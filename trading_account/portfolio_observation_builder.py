@@ -0,0 +1,42 @@
+import numpy as np
+import torch
+from alpaca.trading import Position
+from torch import Tensor
+
+from utils.constants import Constants
+
+
+class PortfolioObservationBuilder:
+    """
+    Writes the per-ticker observation features straight into a reused [num_tickers, num_features] buffer, with rows
+    addressed through a symbol to row map. Tickers without an open position keep zero rows.
+    """
+
+    def __init__(self, ticker_symbol_list: list[str] | None = None) -> None:
+        self._ticker_symbol_list: list[str] = ticker_symbol_list or Constants.TICKER_SYMBOL_LIST
+        self._ticker_symbol_to_row_dict: dict[str, int] = {ticker_symbol: row for row, ticker_symbol in
+                                                           enumerate(self._ticker_symbol_list)}
+        self._observation_array: np.ndarray = np.zeros(
+            (len(self._ticker_symbol_list), len(Constants.TICKER_FEATURES_LIST)), dtype=np.float32)
+        self._observation_tensor: Tensor = torch.from_numpy(self._observation_array).view(-1)
+
+    def get_observation_tensor(self, all_positions_list: list[Position], account_dict: dict[str, float]) -> Tensor:
+        """
+        Returns a flat view over the shared buffer, so the result is only valid until the next call.
+        """
+
+        inverse_portfolio_value: float = 1.0 / account_dict.get("portfolio_value", 0.0)
+        self._observation_array.fill(0.0)
+
+        for position_obj in all_positions_list:
+            row_index: int | None = self._ticker_symbol_to_row_dict.get(position_obj.symbol)
+
+            if row_index is None:
+                continue
+
+            self._observation_array[row_index, :] = (float(position_obj.market_value) * inverse_portfolio_value,
+                                                     float(position_obj.cost_basis) * inverse_portfolio_value,
+                                                     float(position_obj.unrealized_pl) * inverse_portfolio_value,
+                                                     float(position_obj.change_today))
+
+        return self._observation_tensor
@@ -0,0 +1,296 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from alpaca.data.models.bars import Bar
+from alpaca.trading import Position
+from alpaca.trading.client import TradingClient
+from alpaca.trading.enums import OrderSide, TradeEvent
+from alpaca.trading.models import TradeUpdate
+from alpaca.trading.stream import TradingStream
+
+from logger.logger import AppLogger
+
+
+class PortfolioStateCache:
+    """
+    In-memory copy of the Alpaca account and its positions. It is seeded from one REST snapshot, kept current from
+    trade update fills and bar marks, and falls back to REST once the snapshot is older than max_staleness_seconds.
+
+    The stream handlers only queue their updates, which readers apply under the lock, so a REST refresh never stalls
+    the market data or trade update event loops. Each snapshot records the window its requests were made in: fills
+    timestamped before it are already reflected and skipped, and fills inside it are ambiguous and force a new one.
+    """
+
+    ACCOUNT_FIELD_LIST: list[str] = ["cash", "equity", "buying_power", "portfolio_value", "daytrading_buying_power"]
+    FILL_EVENT_LIST: list[TradeEvent] = [TradeEvent.FILL, TradeEvent.PARTIAL_FILL]
+    CLOSED_ORDER_EVENT_LIST: list[TradeEvent] = [TradeEvent.FILL, TradeEvent.CANCELED, TradeEvent.EXPIRED,
+                                                 TradeEvent.REJECTED, TradeEvent.REPLACED]
+    MAX_CLOSED_ORDER_IDS: int = 1_000
+
+    def __init__(self, trading_client: TradingClient, trading_stream: TradingStream | None = None,
+                 max_staleness_seconds: float = 300.0) -> None:
+        self._trading_client: TradingClient = trading_client
+        self._trading_stream: TradingStream | None = trading_stream
+        self._max_staleness_seconds: float = max_staleness_seconds
+        self._account_dict: dict[str, float] = {}
+        self._position_dict: dict[str, Position] = {}
+        self._held_sell_quantity_dict: dict[str, tuple[str, float]] = {}
+        self._pending_trade_update_deque: deque[TradeUpdate] = deque()
+        self._closed_order_id_deque: deque[str] = deque(maxlen=self.MAX_CLOSED_ORDER_IDS)
+        self._latest_close_price_dict: dict[str, float] = {}
+        self._applied_execution_id_set: set[str] = set()
+        self._snapshot_window: tuple[datetime, datetime] | None = None
+        self._lock: threading.RLock = threading.RLock()
+        self._last_refresh_monotonic: float | None = None
+        self._is_invalidated: bool = False
+        self._stream_thread: threading.Thread | None = None
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+        self.num_rest_refreshes: int = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._stream_thread is not None and self._stream_thread.is_alive()
+
+    @property
+    def is_stale(self) -> bool:
+
+        if self._last_refresh_monotonic is None or self._is_invalidated:
+            return True
+
+        # Without a live trade update feed fills are invisible, so every read has to go back to REST
+        if not self.is_running:
+            return True
+
+        return time.monotonic() - self._last_refresh_monotonic > self._max_staleness_seconds
+
+    def start(self) -> None:
+
+        with self._lock:
+            if self.is_running or self._trading_stream is None:
+                return
+
+            self._trading_stream.subscribe_trade_updates(self.handle_trade_update)
+
+            self._stream_thread = threading.Thread(target=self._trading_stream.run, name="PortfolioStateCache",
+                                                   daemon=True)
+            self._stream_thread.start()
+
+        self.logger.info("Trade update stream started")
+
+    def stop(self) -> None:
+
+        if not self.is_running:
+            return
+
+        self._trading_stream.stop()
+        self._stream_thread.join(timeout=10)
+        self._stream_thread = None
+
+        self.logger.info("Trade update stream stopped")
+
+    def invalidate(self) -> None:
+        self._is_invalidated = True
+
+    def refresh(self) -> None:
+
+        # Cleared before the requests so an invalidation that lands while they are in flight is kept
+        self._is_invalidated = False
+        request_start_datetime: datetime = datetime.now(timezone.utc)
+
+        try:
+            account_dict: dict[str, Any] = self._trading_client.get_account().model_dump()
+            all_positions_list: list[Position] = self._trading_client.get_all_positions()
+
+        except Exception:
+            self._is_invalidated = True
+            raise
+
+        request_end_datetime: datetime = datetime.now(timezone.utc)
+
+        with self._lock:
+            self._account_dict = {field: float(account_dict.get(field) or 0.0) for field in self.ACCOUNT_FIELD_LIST}
+            self._position_dict = {position.symbol: position for position in all_positions_list}
+            self._snapshot_window = (request_start_datetime, request_end_datetime)
+            self._applied_execution_id_set.clear()
+            self._last_refresh_monotonic = time.monotonic()
+            self.num_rest_refreshes += 1
+
+    def get_account_dict(self) -> dict[str, float]:
+
+        if self.is_stale:
+            self.refresh()
+
+        with self._lock:
+            self._apply_pending_updates()
+
+            return dict(self._account_dict)
+
+    def get_all_positions(self) -> list[Position]:
+
+        if self.is_stale:
+            self.refresh()
+
+        with self._lock:
+            self._apply_pending_updates()
+
+            return list(self._position_dict.values())
+
+    def wait_for_orders_closed(self, order_id_list: list[str], timeout_seconds: float) -> bool:
+        """
+        Blocks until the trade update stream has reported every order as filled, canceled, expired, rejected or
+        replaced, and returns False if that does not happen within timeout_seconds or the stream is not running.
+        """
+
+        deadline_monotonic: float = time.monotonic() + timeout_seconds
+
+        while self.is_running:
+            if set(order_id_list).issubset(self._closed_order_id_deque):
+                return True
+
+            if time.monotonic() >= deadline_monotonic:
+                return False
+
+            time.sleep(0.005)
+
+        return False
+
+    async def handle_trade_update(self, trade_update: TradeUpdate) -> None:
+
+        if trade_update.event in self.CLOSED_ORDER_EVENT_LIST:
+            self._closed_order_id_deque.append(str(trade_update.order.id))
+
+        self._pending_trade_update_deque.append(trade_update)
+
+    async def handle_bar(self, bar: Bar) -> None:
+        self._latest_close_price_dict[bar.symbol] = float(bar.close)
+
+    def _apply_pending_updates(self) -> None:
+
+        while self._pending_trade_update_deque:
+            trade_update: TradeUpdate = self._pending_trade_update_deque.popleft()
+
+            self._update_held_sell_quantity(trade_update=trade_update)
+
+            if trade_update.event in self.FILL_EVENT_LIST and self._is_fill_unapplied(trade_update=trade_update):
+                self._apply_fill(trade_update=trade_update)
+
+        for symbol in list(self._latest_close_price_dict):
+            current_price: float = self._latest_close_price_dict.pop(symbol)
+
+            if symbol in self._position_dict:
+                self._mark_position(symbol=symbol, current_price=current_price)
+
+        self._update_portfolio_value()
+
+    def _is_fill_unapplied(self, trade_update: TradeUpdate) -> bool:
+
+        execution_id_str: str = str(trade_update.execution_id)
+
+        if trade_update.execution_id is not None and execution_id_str in self._applied_execution_id_set:
+            return False
+
+        if self._snapshot_window is not None:
+            request_start_datetime, request_end_datetime = self._snapshot_window
+
+            if trade_update.timestamp < request_start_datetime:
+                return False
+
+            # The snapshot may or may not include a fill made while it was being taken, so take a new one
+            if trade_update.timestamp <= request_end_datetime:
+                self.invalidate()
+                return False
+
+        if trade_update.execution_id is not None:
+            self._applied_execution_id_set.add(execution_id_str)
+
+        return True
+
+    def _apply_fill(self, trade_update: TradeUpdate) -> None:
+
+        symbol: str = trade_update.order.symbol
+        position: Position | None = self._position_dict.get(symbol)
+
+        if position is None or trade_update.price is None or trade_update.qty is None:
+            # Opening a position needs asset details the fill does not carry, the next read takes a new snapshot
+            self.invalidate()
+            return
+
+        fill_price: float = float(trade_update.price)
+        fill_quantity: float = float(trade_update.qty)
+        signed_fill_quantity: float = fill_quantity if trade_update.order.side == OrderSide.BUY else -fill_quantity
+
+        previous_quantity: float = float(position.qty)
+        new_quantity: float = float(trade_update.position_qty) if trade_update.position_qty is not None else (
+                previous_quantity + signed_fill_quantity)
+
+        if new_quantity == 0.0:
+            del self._position_dict[symbol]
+
+        else:
+            # Buys add their fill cost, sells release cost basis in proportion to the shares sold
+            cost_basis: float = float(position.cost_basis) + signed_fill_quantity * fill_price \
+                if signed_fill_quantity > 0 else float(position.cost_basis) * new_quantity / previous_quantity
+
+            self._position_dict[symbol] = position.model_copy(update={
+                "qty": str(new_quantity),
+                "cost_basis": str(cost_basis),
+                "avg_entry_price": str(cost_basis / new_quantity),
+            })
+
+            self._mark_position(symbol=symbol, current_price=fill_price)
+
+        cash_delta: float = -signed_fill_quantity * fill_price
+
+        for account_field in ["cash", "buying_power", "daytrading_buying_power"]:
+            self._account_dict[account_field] = self._account_dict.get(account_field, 0.0) + cash_delta
+
+    def _mark_position(self, symbol: str, current_price: float) -> None:
+
+        position: Position = self._position_dict[symbol]
+
+        quantity: float = float(position.qty)
+        cost_basis: float = float(position.cost_basis)
+        market_value: float = quantity * current_price
+        lastday_price: float = float(position.lastday_price or current_price)
+
+        held_sell_quantity: float = sum(held_quantity for held_symbol, held_quantity in
+                                        self._held_sell_quantity_dict.values() if held_symbol == symbol)
+
+        self._position_dict[symbol] = position.model_copy(update={
+            "current_price": str(current_price),
+            "market_value": str(market_value),
+            "unrealized_pl": str(market_value - cost_basis),
+            "unrealized_plpc": str((market_value - cost_basis) / cost_basis if cost_basis else 0.0),
+            "change_today": str(current_price / lastday_price - 1.0 if lastday_price else 0.0),
+            "qty_available": str(quantity - held_sell_quantity),
+        })
+
+    def _update_held_sell_quantity(self, trade_update: TradeUpdate) -> None:
+
+        order_id_str: str = str(trade_update.order.id)
+
+        # Open sell orders hold their unfilled shares, which is what separates qty_available from qty
+        if trade_update.event in self.CLOSED_ORDER_EVENT_LIST or trade_update.order.side != OrderSide.SELL:
+            self._held_sell_quantity_dict.pop(order_id_str, None)
+
+        else:
+            unfilled_quantity: float = float(trade_update.order.qty or 0.0) - float(
+                trade_update.order.filled_qty or 0.0)
+            self._held_sell_quantity_dict[order_id_str] = (trade_update.order.symbol, unfilled_quantity)
+
+        position: Position | None = self._position_dict.get(trade_update.order.symbol)
+
+        if trade_update.event not in self.FILL_EVENT_LIST and position is not None and position.current_price:
+            self._mark_position(symbol=position.symbol, current_price=float(position.current_price))
+
+    def _update_portfolio_value(self) -> None:
+
+        long_market_value: float = sum(float(position.market_value or 0.0) for position in self._position_dict.values())
+        portfolio_value: float = self._account_dict.get("cash", 0.0) + long_market_value
+
+        self._account_dict["equity"] = portfolio_value
+        self._account_dict["portfolio_value"] = portfolio_value
@@ -0,0 +1,155 @@
+from typing import Any
+
+import numpy as np
+import torch
+from torch import Tensor
+
+from data_extraction.historical_stock_data_loader import HistoricalMarketData
+from logger.logger import AppLogger
+from trading_account.target_weight_rebalancer import RebalanceOrderPlan, TargetWeightRebalancer
+from utils.constants import Constants
+
+
+class SimulatedTradingPortfolio:
+    """
+    Local stand-in for the Alpaca paper account that fills orders at the replayed close price.
+    """
+
+    def __init__(self, device, market_data: HistoricalMarketData, initial_cash: float,
+                 target_weight_rebalancer: TargetWeightRebalancer | None = None) -> None:
+        self._device = device
+        self._market_data: HistoricalMarketData = market_data
+        self._initial_cash: float = initial_cash
+        self._num_tickers: int = market_data.num_tickers
+        self._num_features: int = len(Constants.TICKER_FEATURES_LIST)
+
+        self._cash: float = initial_cash
+        self._current_index: int = 0
+        self._holdings_array: np.ndarray = np.zeros(self._num_tickers, dtype=np.float64)
+        self._cost_basis_array: np.ndarray = np.zeros(self._num_tickers, dtype=np.float64)
+        self._observation_array: np.ndarray = np.zeros((self._num_tickers, self._num_features), dtype=np.float32)
+        # Fractional, frictionless fills by default, transaction costs are charged through the reward instead
+        self._target_weight_rebalancer: TargetWeightRebalancer = target_weight_rebalancer or TargetWeightRebalancer()
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    @property
+    def current_index(self) -> int:
+        return self._current_index
+
+    @property
+    def cash(self) -> float:
+        return self._cash
+
+    @property
+    def holdings_array(self) -> np.ndarray:
+        return self._holdings_array
+
+    @property
+    def cost_basis_array(self) -> np.ndarray:
+        return self._cost_basis_array
+
+    def reset(self, start_index: int) -> None:
+        self._cash = self._initial_cash
+        self._current_index = start_index
+        self._holdings_array.fill(0.0)
+        self._cost_basis_array.fill(0.0)
+
+    def get_state_dict(self) -> dict[str, Any]:
+        return {
+            "cash": self._cash,
+            "current_index": self._current_index,
+            "holdings_array": self._holdings_array.copy(),
+            "cost_basis_array": self._cost_basis_array.copy(),
+        }
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        self._cash = float(state_dict["cash"])
+        self._current_index = int(state_dict["current_index"])
+        self._holdings_array = np.array(state_dict["holdings_array"], dtype=np.float64)
+        self._cost_basis_array = np.array(state_dict["cost_basis_array"], dtype=np.float64)
+
+    def get_current_prices(self) -> np.ndarray:
+        return self._market_data.close_prices[self._current_index]
+
+    def get_portfolio_value(self) -> float:
+        return self._cash + float(self._holdings_array @ self.get_current_prices())
+
+    def get_account_dict(self) -> dict[str, Any]:
+
+        portfolio_value: float = self.get_portfolio_value()
+
+        result_dict: dict[str, Any] = {
+
+            "cash": self._cash,
+            "equity": portfolio_value,
+            "buying_power": self._cash,
+            "portfolio_value": portfolio_value,
+            "daytrading_buying_power": self._cash
+
+        }
+
+        return result_dict
+
+    def rebalance_to_target_weights(self, target_weights_array: np.ndarray) -> None:
+
+        current_prices: np.ndarray = self.get_current_prices()
+
+        rebalance_order_plan: RebalanceOrderPlan = self._target_weight_rebalancer.get_order_plan(
+            holdings_array=self._holdings_array, prices_array=current_prices,
+            target_weights_array=target_weights_array, cash=self._cash)
+
+        self._apply_fills(delta_holdings_array=rebalance_order_plan.order_quantity_array,
+                          fill_prices_array=current_prices)
+
+    def fill_order(self, ticker_index: int, quantity: float) -> float:
+        """
+        Fills a signed share quantity for one ticker at the replayed close and returns the fill price.
+        """
+
+        current_prices: np.ndarray = self.get_current_prices()
+        delta_holdings_array: np.ndarray = np.zeros(self._num_tickers, dtype=np.float64)
+        delta_holdings_array[ticker_index] = quantity
+
+        self._apply_fills(delta_holdings_array=delta_holdings_array, fill_prices_array=current_prices)
+
+        return float(current_prices[ticker_index])
+
+    def _apply_fills(self, delta_holdings_array: np.ndarray, fill_prices_array: np.ndarray) -> None:
+
+        target_holdings_array: np.ndarray = self._holdings_array + delta_holdings_array
+
+        # Buys add their fill cost, sells release cost basis in proportion to the shares sold
+        is_buy_array: np.ndarray = delta_holdings_array > 0
+        remaining_fraction_array: np.ndarray = np.divide(target_holdings_array, self._holdings_array,
+                                                         out=np.ones_like(target_holdings_array),
+                                                         where=self._holdings_array > 0)
+
+        self._cost_basis_array = np.where(is_buy_array,
+                                          self._cost_basis_array + delta_holdings_array * fill_prices_array,
+                                          self._cost_basis_array * remaining_fraction_array)
+
+        self._cash -= float(delta_holdings_array @ fill_prices_array)
+        self._holdings_array = target_holdings_array
+
+    def advance_market(self) -> None:
+        self._current_index += 1
+
+    def get_observation_tensor(self) -> Tensor:
+
+        current_prices: np.ndarray = self.get_current_prices()
+        portfolio_value: float = max(self.get_portfolio_value(), 1e-12)
+        market_value_array: np.ndarray = self._holdings_array * current_prices
+
+        is_held_array: np.ndarray = self._holdings_array > 0
+        change_today_array: np.ndarray = current_prices / self._market_data.previous_session_close_prices[
+            self._current_index] - 1.0
+
+        self._observation_array[:, 0] = market_value_array / portfolio_value
+        self._observation_array[:, 1] = self._cost_basis_array / portfolio_value
+        self._observation_array[:, 2] = (market_value_array - self._cost_basis_array) / portfolio_value
+        self._observation_array[:, 3] = np.where(is_held_array, change_today_array, 0.0)
+
+        observation_tensor: Tensor = torch.from_numpy(self._observation_array.reshape(-1)).to(
+            device=self._device, copy=True)
+
+        return observation_tensor
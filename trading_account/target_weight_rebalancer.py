@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RebalanceOrderPlan:
+    """
+    Signed share deltas per ticker and the ticker indices in submission order, sells ahead of buys.
+    """
+    order_quantity_array: np.ndarray
+    order_index_array: np.ndarray
+    num_sell_orders: int
+
+    @property
+    def sell_index_array(self) -> np.ndarray:
+        return self.order_index_array[:self.num_sell_orders]
+
+    @property
+    def buy_index_array(self) -> np.ndarray:
+        return self.order_index_array[self.num_sell_orders:]
+
+
+class TargetWeightRebalancer:
+    """
+    Nets current holdings against target portfolio weights in one vectorized pass. Deltas are rounded toward zero
+    to whole lots, trades worth less than min_trade_value are dropped, and buys are scaled down when cash plus sell
+    proceeds cannot cover them. A lot_size of 0 trades fractional shares.
+    """
+
+    def __init__(self, min_trade_value: float = 0.0, lot_size: float = 0.0) -> None:
+        self._min_trade_value: float = min_trade_value
+        self._lot_size: float = lot_size
+
+    def get_order_plan(self, holdings_array: np.ndarray, prices_array: np.ndarray, target_weights_array: np.ndarray,
+                       cash: float) -> RebalanceOrderPlan:
+
+        # Tickers without a usable price are left untouched and contribute nothing to the portfolio value
+        is_tradeable_array: np.ndarray = np.isfinite(prices_array) & (prices_array > 0)
+        safe_prices_array: np.ndarray = np.where(is_tradeable_array, prices_array, 1.0)
+        market_value_array: np.ndarray = np.where(is_tradeable_array, holdings_array * safe_prices_array, 0.0)
+
+        portfolio_value: float = cash + float(market_value_array.sum())
+
+        target_holdings_array: np.ndarray = target_weights_array * portfolio_value / safe_prices_array
+        order_quantity_array: np.ndarray = self._get_tradeable_quantity_array(
+            quantity_array=np.where(is_tradeable_array, target_holdings_array - holdings_array, 0.0),
+            prices_array=safe_prices_array)
+
+        is_sell_array: np.ndarray = order_quantity_array < 0
+        available_cash: float = cash - float(order_quantity_array[is_sell_array] @ safe_prices_array[is_sell_array])
+        order_quantity_array = self.fit_buys_to_cash(order_quantity_array=order_quantity_array,
+                                                     prices_array=safe_prices_array, available_cash=available_cash)
+
+        sell_index_array: np.ndarray = np.flatnonzero(order_quantity_array < 0)
+        buy_index_array: np.ndarray = np.flatnonzero(order_quantity_array > 0)
+
+        return RebalanceOrderPlan(order_quantity_array=order_quantity_array,
+                                  order_index_array=np.concatenate([sell_index_array, buy_index_array]),
+                                  num_sell_orders=len(sell_index_array))
+
+    def fit_buys_to_cash(self, order_quantity_array: np.ndarray, prices_array: np.ndarray,
+                         available_cash: float) -> np.ndarray:
+        """
+        Scales the buys of a plan down to whole lots that available_cash can cover, leaving its sells unchanged.
+        """
+
+        is_buy_array: np.ndarray = order_quantity_array > 0
+        buy_cost: float = float(order_quantity_array[is_buy_array] @ prices_array[is_buy_array])
+
+        if buy_cost <= available_cash:
+            return order_quantity_array
+
+        buy_scale: float = max(available_cash, 0.0) / buy_cost
+
+        return np.where(is_buy_array, self._get_tradeable_quantity_array(
+            quantity_array=order_quantity_array * buy_scale, prices_array=prices_array), order_quantity_array)
+
+    def _get_tradeable_quantity_array(self, quantity_array: np.ndarray, prices_array: np.ndarray) -> np.ndarray:
+
+        if self._lot_size > 0:
+            quantity_array = np.trunc(quantity_array / self._lot_size) * self._lot_size
+
+        return np.where(np.abs(quantity_array) * prices_array < self._min_trade_value, 0.0, quantity_array)
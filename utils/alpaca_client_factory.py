@@ -0,0 +1,43 @@
+from alpaca.data.historical import StockHistoricalDataClient
+from alpaca.data.live import StockDataStream
+from alpaca.trading.client import TradingClient
+from alpaca.trading.stream import TradingStream
+
+from config.config import settings
+
+
+class AlpacaClientFactory:
+    """
+    Builds the Alpaca clients against the real endpoints, or against the URL overrides in config.settings when they
+    are set, so the whole application can be pointed at a LocalAlpacaServer.
+    """
+
+    @staticmethod
+    def get_trading_client(api_key: str, secret_key: str) -> TradingClient:
+        return TradingClient(api_key=api_key, secret_key=secret_key, paper=True,
+                             url_override=settings.alpaca_url_override)
+
+    @staticmethod
+    def get_stock_historical_data_client(api_key: str, secret_key: str) -> StockHistoricalDataClient:
+        return StockHistoricalDataClient(api_key=api_key, secret_key=secret_key,
+                                         url_override=settings.alpaca_url_override)
+
+    @staticmethod
+    def get_trading_stream(api_key: str, secret_key: str) -> TradingStream:
+
+        url_override: str | None = None
+
+        if settings.alpaca_stream_url_override is not None:
+            url_override = f"{settings.alpaca_stream_url_override}/stream"
+
+        return TradingStream(api_key=api_key, secret_key=secret_key, paper=True, url_override=url_override)
+
+    @staticmethod
+    def get_stock_data_stream(api_key: str, secret_key: str) -> StockDataStream:
+
+        url_override: str | None = None
+
+        if settings.alpaca_stream_url_override is not None:
+            url_override = f"{settings.alpaca_stream_url_override}/v2/iex"
+
+        return StockDataStream(api_key=api_key, secret_key=secret_key, url_override=url_override)
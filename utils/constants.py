@@ -30,4 +30,5 @@ class Constants:
     ]
 
     TICKER_SYMBOL_LIST: list[str] = ["AAPL", "AMZN", "GOOGL", "META", "MSFT", "NVDA", "TSLA"]
-    CSV_OUTPUT_COLUMNS_LIST: list[str] = ["Timestep", "Timestamp", "Portfolio Equity", "Portfolio Cash Available"] + TICKER_SYMBOL_LIST
+    CSV_ACCOUNT_COLUMNS_LIST: list[str] = ["Timestep", "Timestamp", "Portfolio Equity", "Portfolio Cash Available"]
+    CSV_OUTPUT_COLUMNS_LIST: list[str] = CSV_ACCOUNT_COLUMNS_LIST + TICKER_SYMBOL_LIST
@@ -1,7 +1,9 @@
 import csv
-from dataclasses import dataclass
-from datetime import datetime
+import importlib.util
+import time
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, TextIO
 
 from alpaca.trading import Position
 
@@ -9,77 +11,180 @@ from logger.logger import AppLogger
 from utils.constants import Constants
 
 
-@dataclass
 class TradingActivityCsvWriter:
-    _base_dir: Path
-    _csv_path: Path | None = None
-    _logger = AppLogger.get_logger(__name__)
+    """
+    Trading activity log with a row per step holding the account values and the quantity of every ticker. Rows are
+    buffered and written through a file handle kept open, once flush_every_rows rows are pending or
+    flush_interval_seconds have passed since the last write, and on flush() or close().
+
+    The "arrow" (IPC stream) and "parquet" output formats write every flush as one record batch or row group and need
+    pyarrow installed.
+    """
+
+    OUTPUT_FORMAT_SUFFIX_DICT: dict[str, str] = {"csv": ".csv", "arrow": ".arrow", "parquet": ".parquet"}
+
+    def __init__(self, _base_dir: Path, output_format: str = "csv", ticker_symbol_list: list[str] | None = None,
+                 flush_every_rows: int = 100, flush_interval_seconds: float = 5.0) -> None:
+
+        if output_format not in self.OUTPUT_FORMAT_SUFFIX_DICT:
+            raise ValueError(f"Unsupported output format: {output_format}")
+
+        if output_format != "csv" and importlib.util.find_spec("pyarrow") is None:
+            raise ImportError(f"Trading activity {output_format} output requires pyarrow")
+
+        self._base_dir: Path = _base_dir
+        self._output_format: str = output_format
+        self._ticker_symbol_list: list[str] = ticker_symbol_list or Constants.TICKER_SYMBOL_LIST
+        self._column_list: list[str] = Constants.CSV_ACCOUNT_COLUMNS_LIST + self._ticker_symbol_list
+        self._ticker_symbol_to_index_dict: dict[str, int] = {ticker_symbol: ticker_index for ticker_index, ticker_symbol
+                                                             in enumerate(self._ticker_symbol_list)}
+        self._flush_every_rows: int = flush_every_rows
+        self._flush_interval_seconds: float = flush_interval_seconds
+        self._output_path: Path | None = None
+        self._csv_file: TextIO | None = None
+        self._csv_writer: Any = None
+        self._arrow_writer: Any = None
+        self._arrow_schema: Any = None
+        self._row_buffer_list: list[tuple] = []
+        self._last_flush_time: float = time.monotonic()
+        self.logger = AppLogger.get_logger(self.__class__.__name__)
+
+    @property
+    def output_path(self) -> Path | None:
+        return self._output_path
+
+    @property
+    def num_buffered_rows(self) -> int:
+        return len(self._row_buffer_list)
+
+    def __enter__(self) -> "TradingActivityCsvWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
 
-    def _ensure_directory_creation(self, logs_directory_path: Path) -> Path:
-        if self._csv_path is not None:
-            return self._csv_path
+    def append_row_to_csv(self, *, logs_directory_path: Path, timestep: int, current_datetime: datetime,
+                          portfolio_equity: float,
+                          portfolio_cash_available: float, all_positions_list: list[Position]) -> None:
+
+        if self._output_path is None:
+            self._open_output(logs_directory_path=logs_directory_path)
+
+        self._row_buffer_list.append((timestep, current_datetime, float(portfolio_equity),
+                                      float(portfolio_cash_available),
+                                      *self._get_quantity_list(all_positions_list=all_positions_list)))
+
+        if (len(self._row_buffer_list) >= self._flush_every_rows
+                or time.monotonic() - self._last_flush_time >= self._flush_interval_seconds):
+            self.flush()
+
+    def flush(self) -> None:
+
+        self._last_flush_time = time.monotonic()
+
+        if not self._row_buffer_list:
+            return
+
+        if self._output_format == "csv":
+            self._csv_writer.writerows(
+                (timestep, current_datetime.isoformat(), f"{portfolio_equity:.2f}", f"{portfolio_cash_available:.2f}",
+                 *quantity_tuple)
+                for timestep, current_datetime, portfolio_equity, portfolio_cash_available, *quantity_tuple in
+                self._row_buffer_list)
+            self._csv_file.flush()
+
+        else:
+            self._arrow_writer.write_batch(self._get_record_batch())
+
+        self._row_buffer_list.clear()
+
+    def close(self) -> None:
+        """
+        Writes any buffered rows and closes the file. The next appended row starts a new file.
+        """
+
+        if self._output_path is None:
+            return
+
+        try:
+            self.flush()
+
+        finally:
+            if self._csv_file is not None:
+                self._csv_file.close()
+
+            if self._arrow_writer is not None:
+                self._arrow_writer.close()
+
+            self._csv_file = None
+            self._csv_writer = None
+            self._arrow_writer = None
+            self._arrow_schema = None
+            self._output_path = None
+
+    def _open_output(self, logs_directory_path: Path) -> None:
 
         current_datetime: datetime = datetime.now()
 
-        file_name: str = current_datetime.strftime("trading_activity_%Y_%m_%d_%H_%M_%S.csv")
+        file_name: str = current_datetime.strftime("trading_activity_%Y_%m_%d_%H_%M_%S") + \
+                         self.OUTPUT_FORMAT_SUFFIX_DICT[self._output_format]
 
         logs_directory_path.mkdir(parents=True, exist_ok=True)
 
-        self._csv_path = logs_directory_path / file_name
+        self._output_path = logs_directory_path / file_name
+        self._last_flush_time = time.monotonic()
 
-        with self._csv_path.open(mode="w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            columns_list: list[str] = Constants.CSV_OUTPUT_COLUMNS_LIST
-            writer.writerow(columns_list)
+        if self._output_format == "csv":
+            self._csv_file = self._output_path.open(mode="w", newline="", encoding="utf-8")
+            self._csv_writer = csv.writer(self._csv_file)
+            self._csv_writer.writerow(self._column_list)
+            return
 
-        return self._csv_path
+        import pyarrow as pa
+        import pyarrow.parquet as pq
 
-    def append_row_to_csv(self, *, logs_directory_path: Path, timestep: int, current_datetime: datetime,
-                          portfolio_equity: float,
-                          portfolio_cash_available: float, all_positions_list: list[Position]) -> None:
-        csv_path: Path = self._ensure_directory_creation(logs_directory_path=logs_directory_path)
-
-        positions_dict: dict[str, int] = self._get_positions_dict(all_positions_list=all_positions_list)
-
-        apple_stock_quantity: float = positions_dict.get("AAPL", 0)
-        amazon_stock_quantity: float = positions_dict.get("AMZN", 0)
-        google_stock_quantity: float = positions_dict.get("GOOGL", 0)
-        meta_stock_quantity: float = positions_dict.get("META", 0)
-        nvidia_stock_quantity: float = positions_dict.get("NVDA", 0)
-        microsoft_stock_quantity: float = positions_dict.get("MSFT", 0)
-        tesla_stock_quantity: float = positions_dict.get("TSLA", 0)
-
-        with csv_path.open(mode="a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                [
-                    timestep,
-                    current_datetime.isoformat(),
-                    f"{portfolio_equity:.2f}",
-                    f"{portfolio_cash_available:.2f}",
-                    f"{apple_stock_quantity}",
-                    f"{amazon_stock_quantity}",
-                    f"{google_stock_quantity}",
-                    f"{meta_stock_quantity}",
-                    f"{nvidia_stock_quantity}",
-                    f"{microsoft_stock_quantity}",
-                    f"{tesla_stock_quantity}",
-                ]
-            )
-
-    def _get_positions_dict(self, all_positions_list: list[Position]) -> dict[str, int]:
-
-        positions_dict: dict[str, int] = {}
+        self._arrow_schema = pa.schema([
+            pa.field(self._column_list[0], pa.int64()),
+            pa.field(self._column_list[1], pa.timestamp("us", tz="UTC")),
+            *[pa.field(column, pa.float64()) for column in self._column_list[2:]],
+        ])
+
+        if self._output_format == "arrow":
+            self._arrow_writer = pa.ipc.new_stream(str(self._output_path), self._arrow_schema)
+
+        else:
+            self._arrow_writer = pq.ParquetWriter(str(self._output_path), self._arrow_schema)
+
+    def _get_record_batch(self) -> Any:
+
+        import pyarrow as pa
+
+        column_tuple_list: list[tuple] = list(zip(*self._row_buffer_list))
+        column_tuple_list[1] = tuple(current_datetime.astimezone(timezone.utc) for current_datetime in
+                                     column_tuple_list[1])
+
+        return pa.RecordBatch.from_arrays(
+            [pa.array(column_tuple, type=field.type) for column_tuple, field in
+             zip(column_tuple_list, self._arrow_schema)],
+            schema=self._arrow_schema)
+
+    def _get_quantity_list(self, all_positions_list: list[Position]) -> list[float]:
+
+        quantity_list: list[float | None] = [None] * len(self._ticker_symbol_list)
 
         for position_obj in all_positions_list:
 
-            ticker_symbol_str: str = position_obj.symbol
+            ticker_index: int | None = self._ticker_symbol_to_index_dict.get(position_obj.symbol)
+
+            if ticker_index is None:
+                continue
 
-            if ticker_symbol_str not in positions_dict:
-                positions_dict[ticker_symbol_str] = int(position_obj.qty)
+            if quantity_list[ticker_index] is None:
+                # Quantities arrive as decimal strings such as "12.0" or fractional shares
+                quantity_list[ticker_index] = float(position_obj.qty)
 
             else:
 
-                self._logger.error(f"Duplicate instance of {ticker_symbol_str} ticker in positions list")
+                self.logger.error(f"Duplicate instance of {position_obj.symbol} ticker in positions list")
 
-        return positions_dict
+        return [0.0 if quantity is None else quantity for quantity in quantity_list]